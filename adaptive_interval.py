@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Adaptive probe intervals for the Network Ping Monitor
+Stable devices back off gradually towards a maximum interval; a failure or
+high RTT variance snaps a device back to the fastest interval. The combined
+probe rate is kept within a global probes-per-second budget
+"""
+
+import collections
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# RFC 6298 smoothing factors for the RTT and RTT variance estimates
+RTT_ALPHA = 0.125
+RTT_BETA = 0.25
+
+
+class AdaptiveIntervalController:
+    """
+    Per-device probe interval that follows each device's stability
+
+    After stable_probes consecutive answered probes with an RTT variance
+    (RFC 6298 RTTVAR) under max_rttvar_ms, a device's interval is multiplied
+    by backoff, up to max_interval. Any failed probe or variance above the
+    limit resets it to min_interval. Results may be reported from several
+    threads; the interval table is guarded by a lock.
+    """
+
+    def __init__(self, devices: Iterable[Hashable], min_interval: float, max_interval: float,
+                 backoff: float = 1.5, stable_probes: int = 10, max_rttvar_ms: Optional[float] = 50,
+                 probe_budget: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the controller
+
+        Args:
+            devices: Devices whose interval adapts
+            min_interval: Fastest interval in seconds (the fixed-rate interval)
+            max_interval: Slowest interval in seconds for a stable device
+            backoff: Factor applied to the interval of a device that stayed stable
+            stable_probes: Consecutive good probes before backing off one step
+            max_rttvar_ms: RTT variance in ms above which a device counts as unstable (None = ignore)
+            probe_budget: Most probes per second across all devices (None = unlimited)
+            clock: Monotonic time source
+        """
+        self.devices = list(devices)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = max(1.0, backoff)
+        self.stable_probes = max(1, stable_probes)
+        self.max_rttvar_ms = max_rttvar_ms
+        self.probe_budget = probe_budget
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        # Start every device at the fastest interval the budget allows
+        start = min_interval
+        if probe_budget and self.devices:
+            start = min(self.max_interval, max(start, len(self.devices) / probe_budget))
+            if len(self.devices) / self.max_interval > probe_budget:
+                print(f"⚠️  Probe budget of {probe_budget}/s cannot cover {len(self.devices)} devices "
+                      f"even at the {self.max_interval:g}s maximum interval")
+        self.intervals = {key: start for key in self.devices}
+        self.rate = sum(1 / interval for interval in self.intervals.values())  # probes per second
+        self.stable_counts = {key: 0 for key in self.devices}
+        self.srtt = {}  # key -> smoothed RTT in ms
+        self.rttvar = {}  # key -> RTT variance in ms
+        self.last_probe = {}  # key -> clock value of the last probe
+        self.changes = collections.deque()  # (key, interval) since the last pop_changes()
+        self.probes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.intervals
+
+    def interval(self, key: Hashable) -> float:
+        return self.intervals.get(key, self.min_interval)
+
+    def update(self, key: Hashable, success: bool, rtt: float = None) -> float:
+        """
+        Feed one probe result and return the device's new interval
+
+        Args:
+            key: Device that was probed
+            success: Whether the probe was answered
+            rtt: Round-trip time in seconds, when known
+        """
+        if key not in self.intervals:
+            return self.min_interval
+        with self.lock:
+            return self._update(key, success, rtt)
+
+    def update_many(self, results: Iterable[Tuple[Hashable, bool, Optional[float]]]):
+        """Feed a whole round of (key, success, rtt) results under one lock acquisition"""
+        intervals = self.intervals
+        with self.lock:
+            for key, success, rtt in results:
+                if key in intervals:
+                    self._update(key, success, rtt)
+
+    def _update(self, key: Hashable, success: bool, rtt: Optional[float]) -> float:
+        """update() with the lock held"""
+        self.probes += 1
+        stable = success
+        if success and rtt is not None:
+            rtt_ms = rtt * 1000
+            if key not in self.srtt:
+                self.srtt[key] = rtt_ms
+                self.rttvar[key] = rtt_ms / 2
+            else:
+                self.rttvar[key] += RTT_BETA * (abs(self.srtt[key] - rtt_ms) - self.rttvar[key])
+                self.srtt[key] += RTT_ALPHA * (rtt_ms - self.srtt[key])
+            if self.max_rttvar_ms is not None and self.rttvar[key] > self.max_rttvar_ms:
+                stable = False
+
+        interval = self.intervals[key]
+        if not stable:
+            self.stable_counts[key] = 0
+            if interval > self.min_interval:
+                self._set(key, self.min_interval)
+        else:
+            self.stable_counts[key] += 1
+            if self.stable_counts[key] >= self.stable_probes and interval < self.max_interval:
+                self.stable_counts[key] = 0
+                self._set(key, min(self.max_interval, interval * self.backoff))
+        return self.intervals[key]
+
+    def _set(self, key: Hashable, interval: float):
+        """Change an interval, slowing it down if the budget cannot afford it (lock held)"""
+        old = self.intervals[key]
+        if self.probe_budget:
+            available = self.probe_budget - (self.rate - 1 / old)
+            if available <= 0:
+                interval = max(interval, self.max_interval)
+            elif 1 / interval > available:
+                interval = min(self.max_interval, max(interval, 1 / available))
+        if interval == old:
+            return
+        self.rate += 1 / interval - 1 / old
+        self.intervals[key] = interval
+        self.changes.append((key, interval))
+
+    def due(self, keys: Iterable[Hashable], now: float = None) -> List[Hashable]:
+        """
+        Devices whose interval has elapsed since their last probe, marked as probed
+
+        Devices that do not adapt are always due. A tenth of min_interval is
+        allowed as slack so a fixed-period cycle loop does not miss a device
+        by a few milliseconds.
+
+        Args:
+            keys: Candidate devices
+            now: Current clock value
+        """
+        now = self.clock() if now is None else now
+        slack = self.min_interval * 0.1
+        result = []
+        with self.lock:
+            for key in keys:
+                interval = self.intervals.get(key)
+                if interval is not None:
+                    last = self.last_probe.get(key)
+                    if last is not None and now - last < interval - slack:
+                        continue
+                    self.last_probe[key] = now
+                result.append(key)
+        return result
+
+    def pop_changes(self) -> List[Tuple[Hashable, float]]:
+        """Interval changes since the last call, oldest first"""
+        changes = []
+        while self.changes:
+            changes.append(self.changes.popleft())
+        return changes
+
+    def stats(self) -> Dict[str, float]:
+        """Current probe rate compared with probing every device at min_interval"""
+        with self.lock:
+            per_hour = self.rate * 3600
+            fixed_per_hour = len(self.devices) / self.min_interval * 3600
+            return {
+                'devices': len(self.devices),
+                'backed_off': sum(1 for interval in self.intervals.values() if interval > self.min_interval),
+                'probes_per_hour': per_hour,
+                'fixed_probes_per_hour': fixed_per_hour,
+                'saved_per_hour': fixed_per_hour - per_hour,
+                'saved_pct': 100.0 * (fixed_per_hour - per_hour) / fixed_per_hour if fixed_per_hour else 0.0,
+                'probes': self.probes,
+            }
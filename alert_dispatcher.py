@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Background alert dispatcher for the Network Ping Monitor
+Queues alert emails so SMTP latency never reaches the ping loop, retries
+failed sends with exponential backoff and keeps undelivered alerts in an
+on-disk outbox across restarts. AlertCoalescer sits in front of it and merges
+alerts raised close together into one digest per recipient.
+"""
+
+import email
+import email.policy
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Sequence
+
+# One device alert waiting to be emailed
+AlertRecord = namedtuple('AlertRecord', 'timestamp ip_address device_name event_type failed_count duration_minutes')
+
+
+class QueuedAlert:
+    """One alert message and its delivery state"""
+
+    __slots__ = ('message', 'label', 'records', 'attempts', 'path')
+
+    def __init__(self, message: EmailMessage, label: str, path: str = None, records: Sequence[AlertRecord] = ()):
+        self.message = message
+        self.label = label
+        self.records = tuple(records)  # device alerts the message covers (empty for outbox reloads)
+        self.attempts = 0
+        self.path = path  # outbox file, once persisted
+
+
+class AlertDispatcher:
+    """
+    Background threads that deliver queued alert emails
+
+    submit() only appends to a deque, so producers (ping workers, the asyncio
+    loop) never wait on SMTP. A failed send is written to the outbox
+    directory as an .eml file and retried after backoff * 2**(attempts-1)
+    seconds (capped at backoff_max, +/-10% jitter). After max_retries the
+    alert stays in the outbox and is retried on the next start. Alerts still
+    queued at close() are persisted as well.
+
+    Queuing is not delivery: on_result is told the final outcome of every
+    alert, so callers can record it separately from the enqueue.
+    """
+
+    def __init__(self, send: Callable[[EmailMessage], None], outbox_dir: str = None,
+                 max_retries: int = 5, backoff: float = 30.0, backoff_max: float = 900.0,
+                 workers: int = 1, name: str = 'alert-dispatcher',
+                 on_result: Callable[[QueuedAlert, bool, str], None] = None):
+        """
+        Initialize the dispatcher (the threads start on first submit)
+
+        Args:
+            send: Delivers one message; raises on failure
+            outbox_dir: Directory for undelivered alerts (None = keep them in memory only)
+            max_retries: Retries after the first failed attempt before giving up until restart
+            backoff: Delay before the first retry in seconds
+            backoff_max: Longest delay between retries
+            workers: Sender threads (more than one only helps with a pooled send)
+            name: Thread name prefix
+            on_result: Called with (alert, delivered, detail) once an alert is sent, or
+                       given up on until the next start (on a sender thread or in close())
+        """
+        self.send = send
+        self.on_result = on_result
+        self.outbox_dir = outbox_dir
+        self.max_retries = max(0, int(max_retries))
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.workers = max(1, int(workers))
+        self.name = name
+        self.ready = deque()
+        self.retries = []  # (due_time, seq, QueuedAlert)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.threads = []
+        self.closing = False
+        self.random = random.Random()
+
+        # Metrics
+        self.submitted = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.gave_up = 0
+
+    def start(self):
+        with self.condition:
+            if self.threads or self.closing:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"{self.name}-{i + 1}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, message: EmailMessage, label: str = '', records: Sequence[AlertRecord] = ()) -> bool:
+        """
+        Queue a message for delivery
+
+        Args:
+            message: Email to send
+            label: Name of the alert in console output (default: the subject)
+            records: Device alerts the message covers, handed back to on_result
+
+        Returns:
+            bool: True if the alert was queued, False if the dispatcher is closed
+        """
+        if self.closing:
+            return False
+        self.start()
+        alert = QueuedAlert(message, label or message.get('Subject', ''), records=records)
+        with self.condition:
+            self.ready.append(alert)
+            self.submitted += 1
+            self.condition.notify()
+        return True
+
+    def load_outbox(self) -> int:
+        """Queue the alerts left in the outbox by earlier runs; returns how many"""
+        if not self.outbox_dir or not os.path.isdir(self.outbox_dir):
+            return 0
+        count = 0
+        for filename in sorted(os.listdir(self.outbox_dir)):
+            if not filename.endswith('.eml'):
+                continue
+            path = os.path.join(self.outbox_dir, filename)
+            try:
+                with open(path, 'rb') as f:
+                    message = email.message_from_binary_file(f, policy=email.policy.default)
+            except OSError as e:
+                print(f"❌ Failed to read outbox alert {path}: {e}")
+                continue
+            alert = QueuedAlert(message, message.get('Subject', filename), path)
+            with self.condition:
+                self.ready.append(alert)
+                self.submitted += 1
+            count += 1
+        if count:
+            self.start()
+            with self.condition:
+                self.condition.notify_all()
+        return count
+
+    def _persist(self, alert: QueuedAlert):
+        """Write the alert to the outbox (atomically) unless it is already there"""
+        if not self.outbox_dir or alert.path:
+            return
+        path = os.path.join(self.outbox_dir, f"{time.time():.6f}_{next(self.sequence)}.eml")
+        try:
+            os.makedirs(self.outbox_dir, exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(alert.message.as_bytes(policy=email.policy.SMTP))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + '.tmp', path)
+            alert.path = path
+        except OSError as e:
+            print(f"❌ Failed to save alert to outbox {path}: {e}")
+
+    def _report(self, alert: QueuedAlert, delivered: bool, detail: str):
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(alert, delivered, detail)
+        except Exception as e:
+            print(f"❌ Failed to record the outcome of email alert {alert.label}: {e}")
+
+    def _next_alert(self) -> Optional[QueuedAlert]:
+        """Wait for the next alert that is due; None once closing and idle"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.retries and self.retries[0][0] <= now:
+                    return heapq.heappop(self.retries)[2]
+                if self.ready:
+                    return self.ready.popleft()
+                if self.closing:
+                    return None
+                timeout = self.retries[0][0] - now if self.retries else None
+                self.condition.wait(timeout)
+
+    def _run(self):
+        while True:
+            alert = self._next_alert()
+            if alert is None:
+                return
+            try:
+                self.send(alert.message)
+            except Exception as e:
+                self._handle_failure(alert, e)
+                continue
+            with self.condition:
+                self.sent += 1
+            if alert.path:
+                try:
+                    os.remove(alert.path)
+                except OSError:
+                    pass
+            print(f"📧 Email alert sent: {alert.label}")
+            self._report(alert, True, f"delivered after {alert.attempts + 1} attempt(s)")
+
+    def _handle_failure(self, alert: QueuedAlert, error: Exception):
+        alert.attempts += 1
+        self._persist(alert)
+        with self.condition:
+            self.failed_attempts += 1
+            give_up = alert.attempts > self.max_retries or self.closing
+            if give_up:
+                self.gave_up += 1
+            else:
+                delay = min(self.backoff * 2 ** (alert.attempts - 1), self.backoff_max)
+                delay *= self.random.uniform(0.9, 1.1)
+                heapq.heappush(self.retries, (time.monotonic() + delay, next(self.sequence), alert))
+                self.condition.notify()
+        if give_up:
+            kept = f"; kept in {alert.path}" if alert.path else ''
+            print(f"❌ Failed to send email alert {alert.label} after {alert.attempts} attempt(s): {error}{kept}")
+            self._report(alert, False, f"failed after {alert.attempts} attempt(s): {error}{kept}")
+            return
+        print(f"⚠️  Email alert {alert.label} failed ({error}); retrying in {delay:.1f}s")
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of queue depth and delivery counters"""
+        with self.condition:
+            return {
+                'queued': len(self.ready),
+                'retrying': len(self.retries),
+                'submitted': self.submitted,
+                'sent': self.sent,
+                'failed_attempts': self.failed_attempts,
+                'gave_up': self.gave_up,
+            }
+
+    def close(self, timeout: float = 10.0):
+        """
+        Deliver what is already queued within timeout, then stop
+
+        Alerts waiting for a retry or still queued when the timeout expires
+        are saved to the outbox for the next run.
+        """
+        with self.condition:
+            if self.closing:
+                return
+            self.closing = True
+            self.condition.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self.condition:
+            leftover = list(self.ready) + [item[2] for item in self.retries]
+            self.ready.clear()
+            self.retries = []
+        for alert in leftover:
+            self._persist(alert)
+            kept = f"; kept in {alert.path}" if alert.path else ''
+            self._report(alert, False, f"not sent before shutdown{kept}")
+        if leftover and self.outbox_dir:
+            print(f"📥 {len(leftover)} undelivered alert(s) saved to {self.outbox_dir}")
+        elif leftover:
+            print(f"❌ {len(leftover)} undelivered alert(s) dropped (no outbox directory)")
+
+
+class AlertCoalescer:
+    """
+    Merges alerts raised within a window into one message per recipient group
+
+    The first alert after a quiet period is sent at once and opens a window
+    of window seconds; every OUTAGE_ALERT and RECOVERY_ALERT raised before it
+    closes goes into one follow-up message, so a switch failure that takes
+    down fifty devices produces the first alert plus one digest instead of
+    fifty emails, and a lone alert is never delayed. Each recipient also has a
+    token bucket of rate_limit messages per rate_period seconds; alerts for a
+    recipient without a token stay pending and are merged into that
+    recipient's next message. Recipients with identical pending alerts share
+    one message.
+    """
+
+    def __init__(self, render: Callable[[List[AlertRecord], List[str]], EmailMessage],
+                 dispatcher: AlertDispatcher, window: float = 30.0, rate_limit: int = 0,
+                 rate_period: float = 3600.0, name: str = 'alert-coalescer'):
+        """
+        Initialize the coalescer (the thread starts on first submit)
+
+        Args:
+            render: Builds the message for (alerts, recipients); a single alert
+                    gets the regular per-device message, several get a digest
+            dispatcher: Delivers the rendered messages
+            window: Seconds after a message during which further alerts are collected
+                    into the next one (0 = send every alert at once)
+            rate_limit: Messages per recipient per rate_period (0 = unlimited)
+            rate_period: Length of the rate limit period in seconds
+            name: Thread name
+        """
+        self.render = render
+        self.dispatcher = dispatcher
+        self.window = max(0.0, window)
+        self.rate_limit = max(0, int(rate_limit))
+        self.rate_period = rate_period
+        self.name = name
+        self.pending = {}  # recipient -> [AlertRecord]
+        self.tokens = {}  # recipient -> (tokens, last refill time)
+        self.flush_at = None
+        self.last_flush = float('-inf')  # When the last message went out
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closing = False
+
+        # Metrics
+        self.alerts = 0
+        self.messages = 0
+        self.digests = 0
+        self.rate_limited = 0
+
+    def submit(self, record: AlertRecord, recipients: Sequence[str]) -> bool:
+        """
+        Add an alert to the current window
+
+        Returns:
+            bool: True if the alert was queued, False if the coalescer is closed
+        """
+        with self.condition:
+            if self.closing:
+                return False
+            for recipient in recipients:
+                self.pending.setdefault(recipient, []).append(record)
+            self.alerts += 1
+            if self.flush_at is None:
+                # Right away after a quiet window; otherwise with the alerts that follow
+                self.flush_at = max(time.monotonic(), self.last_flush + self.window)
+            self.condition.notify()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+        return True
+
+    def _take_token(self, recipient: str, now: float) -> bool:
+        if not self.rate_limit:
+            return True
+        tokens, last = self.tokens.get(recipient, (float(self.rate_limit), now))
+        tokens = min(float(self.rate_limit), tokens + (now - last) * self.rate_limit / self.rate_period)
+        if tokens >= 1:
+            self.tokens[recipient] = (tokens - 1, now)
+            return True
+        self.tokens[recipient] = (tokens, now)
+        return False
+
+    def _next_token_time(self, recipient: str, now: float) -> float:
+        tokens, _ = self.tokens.get(recipient, (0.0, now))
+        return now + (1 - tokens) * self.rate_period / self.rate_limit
+
+    def _take_ready(self, now: float, ignore_limit: bool = False) -> Dict[tuple, List[str]]:
+        """Remove the alerts of every recipient allowed to receive a message now"""
+        groups = {}  # tuple of alerts -> recipients
+        for recipient in list(self.pending):
+            if ignore_limit or self._take_token(recipient, now):
+                records = tuple(self.pending.pop(recipient))
+                groups.setdefault(records, []).append(recipient)
+            else:
+                self.rate_limited += 1
+        if groups:
+            self.last_flush = now
+        if self.pending:
+            self.flush_at = max(now + self.window,
+                                min(self._next_token_time(recipient, now) for recipient in self.pending))
+        else:
+            self.flush_at = None
+        return groups
+
+    def _send(self, groups: Dict[tuple, List[str]]):
+        for records, recipients in groups.items():
+            try:
+                message = self.render(list(records), recipients)
+            except Exception as e:
+                print(f"❌ Failed to build alert email for {', '.join(recipients)}: {e}")
+                continue
+            if len(records) == 1:
+                record = records[0]
+                label = f"{record.device_name} ({record.ip_address}) - {record.event_type}"
+            else:
+                label = f"digest of {len(records)} alerts to {', '.join(recipients)}"
+            with self.condition:
+                self.messages += 1
+                self.digests += len(records) > 1
+            self.dispatcher.submit(message, label, records)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closing and (self.flush_at is None or time.monotonic() < self.flush_at):
+                    self.condition.wait(None if self.flush_at is None else self.flush_at - time.monotonic())
+                if self.closing:
+                    return
+                groups = self._take_ready(time.monotonic())
+            self._send(groups)
+
+    def stats(self) -> Dict[str, int]:
+        with self.condition:
+            return {
+                'alerts': self.alerts,
+                'messages': self.messages,
+                'digests': self.digests,
+                'rate_limited': self.rate_limited,
+                'pending_recipients': len(self.pending),
+            }
+
+    def close(self, timeout: float = 5.0):
+        """Send everything still pending now, ignoring the window and rate limit"""
+        with self.condition:
+            if self.closing:
+                return
+            self.closing = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        with self.condition:
+            groups = self._take_ready(time.monotonic(), ignore_limit=True)
+        self._send(groups)
@@ -9,14 +9,63 @@ DEVICES = {
     "192.168.200.5": "Building 200 P2P"
 }
 
+# Optional topology: {child_ip: parent_ip} for devices reached through another monitored device.
+# While a parent is down its children are probed every SUPPRESSED_PROBE_INTERVAL seconds and
+# do not alert; the parent is logged once as the root cause. Example:
+#   DEVICE_PARENTS = {"192.168.200.5": "192.168.200.102"}
+DEVICE_PARENTS = {}
+SUPPRESSED_PROBE_INTERVAL = 30  # seconds between probes of a device whose upstream parent is down
+
 # Monitoring Settings
 PING_INTERVAL = 1  # seconds between ping attempts (fast monitoring like continuous ping)
 PING_TIMEOUT = 4   # ping timeout in seconds (matches Windows default -w 4000ms)
+PING_BACKEND = "auto"  # "icmp" (in-process ICMP socket), "subprocess" (system ping command) or "auto"
+MONITOR_MODE = "threaded"  # "threaded" (thread per device check) or "async" (asyncio coroutine per device)
+PING_MULTIPLEX = True  # With the icmp backend, ping every device per cycle from one socket instead of one thread each
+SCHEDULING_MODE = "cycle"  # "cycle" (all devices together every PING_INTERVAL) or "per_device" (independent timers)
+DEVICE_INTERVALS = {}  # Per-device probe interval override in seconds for "per_device" mode, e.g. {"192.168.200.4": 1}
+SCHEDULE_JITTER = 0.1  # Random +/- fraction of each device's interval applied to its due times in "per_device" mode
+WORKER_POOL_SIZE = 32  # Persistent worker threads used when devices are pinged one per call (subprocess backend)
+SWEEP_WORKERS = 256  # Threads pinging devices for the start and stop status checks (subprocess backend)
 
 # Logging Settings
 LOG_DIRECTORY = "logs"  # Directory to store log files (optional)
 LOG_PERIODIC_STATUS = True  # Log periodic status checks for online devices
 PERIODIC_LOG_INTERVAL = 3600  # seconds (1 hour)
+LATENCY_EWMA_ALPHA = 0.1  # Weight of the newest RTT in the smoothed latency shown on periodic status rows
+BURST_COUNT = 1  # Packets per check; above 1, devices are judged by loss ratio and jitter over the burst
+BURST_SPACING = 0.1  # seconds between the packets of a burst
+BURST_REPLY_TIMEOUT = 0.5  # seconds to wait for replies after the last packet of a burst
+BURST_MAX_LOSS = 0.5  # a burst losing more than this fraction of packets counts as a failed ping
+BURST_MAX_JITTER_MS = None  # ...as does one whose jitter exceeds this many ms (None = ignore jitter)
+DEVICE_BURST_THRESHOLDS = {}  # per-device overrides, e.g. {"192.168.200.9": {"max_loss": 0.8, "max_jitter_ms": 30}}
+ADAPTIVE_INTERVALS = False  # Back off stable devices towards ADAPTIVE_MAX_INTERVAL; failures snap back to PING_INTERVAL
+ADAPTIVE_MAX_INTERVAL = 60  # seconds between probes of a device that has been stable for a long time
+ADAPTIVE_BACKOFF = 1.5  # interval multiplier after each run of ADAPTIVE_STABLE_PROBES good probes
+ADAPTIVE_STABLE_PROBES = 10  # consecutive good probes before backing off one step
+ADAPTIVE_MAX_RTTVAR_MS = 50  # RTT variance (ms) above which a device is treated as unstable (None = ignore)
+PROBE_BUDGET = None  # most probes per second across all adaptive devices (None = unlimited)
+PROBE_RATE_LIMIT = None  # most ICMP packets per second leaving this host, spread evenly (None = unpaced)
+PROBE_SUBNET_RATE_LIMIT = None  # most packets per second into any one subnet (None = unpaced)
+PROBE_SUBNET_PREFIX = 24  # prefix length that groups devices into a subnet for PROBE_SUBNET_RATE_LIMIT
+PROBE_RATE_BURST = 1  # packets the pacer lets through back to back after an idle period
+METRICS_PORT = None  # serve Prometheus metrics on http://METRICS_HOST:METRICS_PORT/metrics (None = off), e.g. 9108
+METRICS_HOST = "127.0.0.1"  # address the metrics endpoint listens on ("0.0.0.0" for remote scrapers)
+CSV_FLUSH_ROWS = 100  # Write buffered log rows once this many are pending
+CSV_FLUSH_INTERVAL = 1.0  # ...or once the oldest pending row is this many seconds old
+CSV_FSYNC = "never"  # "never" (OS decides), "flush" (fsync every batch) or "row" (write and fsync every row)
+LOG_ROTATE_MB = 100  # Rotate the CSV log once it reaches this size in MB (0 = no size limit)
+LOG_ROTATE_DAILY = True  # Also rotate the CSV log at midnight
+LOG_COMPRESSION = "gzip"  # Compression for rotated logs: "gzip", "zstd" (needs the zstandard package) or None
+LOG_RETAIN_FILES = 30  # Rotated log files kept, counting those of earlier runs (0 = keep all)
+CSV_LOG_ENABLED = True  # Write the CSV event log (can be turned off when EVENT_DATABASE is set)
+EVENT_DATABASE = None  # SQLite file for indexed event history and outages, e.g. "events.db" (relative to the log directory)
+BINARY_EVENT_LOG = False  # Also write a compact binary event log (.pmev) next to the CSV (see event_store.py)
+LOG_QUEUE_SIZE = 10000  # Events waiting for the log writer thread before producers are held back
+LOG_QUEUE_BLOCK_TIMEOUT = 0.1  # Seconds a ping worker waits for room in a full log queue before dropping the event
+STATE_CHECKPOINT = "device_state.ckpt"  # Device state snapshot in the log directory, restored on restart (None = off)
+STATE_CHECKPOINT_INTERVAL = 10  # Seconds between state checkpoints
+STATE_CHECKPOINT_MAX_AGE = 3600  # Start fresh instead of restoring a checkpoint older than this many seconds
 
 # Email Alert Settings
 EMAIL_ALERTS_ENABLED = True
@@ -34,4 +83,12 @@ EMAIL_TO = ["garretts@stlinc.com", "DevOps@stlinc.com"]  # List of recipients
 
 # Email Content Settings
 EMAIL_SUBJECT_PREFIX = "[NETWORK ALERT]"
-SEND_RECOVERY_EMAILS = True  # Send email when device comes back online
\ No newline at end of file
+SEND_RECOVERY_EMAILS = True  # Send email when device comes back online
+ALERT_OUTBOX_DIRECTORY = "outbox"  # Undelivered alerts are kept here and retried on the next start (None = memory only)
+ALERT_MAX_RETRIES = 5  # Retries per alert before it waits in the outbox for the next start
+ALERT_RETRY_BACKOFF = 30  # Seconds before the first retry; doubles on every further failure (max 15 minutes)
+SMTP_POOL_SIZE = 2  # SMTP sessions kept open for alerts (also the number of alert sender threads)
+SMTP_KEEPALIVE_INTERVAL = 30  # Seconds between NOOPs on idle SMTP sessions
+SMTP_IDLE_TIMEOUT = 300  # Close SMTP sessions that have sent nothing for this many seconds
+ALERT_DIGEST_WINDOW = 30  # The first alert goes out at once; later ones within this many seconds share a digest (0 = send each alert right away)
+ALERT_RATE_LIMIT = 20  # Most alert emails per recipient per hour; extra alerts wait for the next digest (0 = unlimited)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Device state table for the Network Ping Monitor
+Per-device status flags, counters and timestamps in typed arrays indexed by
+a dense device number, instead of one dict (and one Python object per
+value) per field
+"""
+
+import array
+import threading
+import time
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy
+except ImportError:  # Optional: evaluate_batch() falls back to a plain loop
+    numpy = None
+
+# Event bits returned by DeviceStateTable.evaluate_batch()
+OUTAGE_START = 1
+PING_FAILED = 2
+OUTAGE_ALERT = 4  # Threshold reached with no email sent yet (the alert may still be suppressed upstream)
+OUTAGE_END = 8
+STATUS_CHECK = 16
+
+
+class DeviceStateTable:
+    """
+    Monitoring state of a fixed set of devices
+
+    Each device is mapped to a dense index once; every field is a typed array
+    of that length. Status bits are unsigned bytes, counters are 32-bit
+    integers and timestamps are float64 values of the table's monotonic
+    clock. Hot paths look the index up once and then work on the arrays
+    directly.
+
+    A device's fields are only written by the check that has claimed it:
+    claim() gives each device at most one check in flight, whichever thread
+    or scheduling mode starts it, so two checks of the same device can never
+    interleave their transitions. Claims take one of a fixed set of shard
+    locks, so unrelated devices rarely contend.
+    """
+
+    def __init__(self, devices: Iterable[Hashable], clock: Callable[[], float] = time.monotonic,
+                 shards: int = 64):
+        """
+        Initialize every device as online with no failures
+
+        Args:
+            devices: Devices to track (e.g. IP addresses)
+            clock: Monotonic time source for the status-change timestamps
+            shards: Number of locks guarding the in-flight flags
+        """
+        self.keys = list(devices)
+        self.index = {key: i for i, key in enumerate(self.keys)}  # device -> dense index
+        self.clock = clock
+        count = len(self.keys)
+        self.online = array.array('B', [1]) * count  # 1 = online, 0 = offline
+        self.email_sent = array.array('B', [0]) * count  # Alert email sent for the current outage
+        self.alert_suppressed = array.array('B', [0]) * count  # Threshold reached while upstream was down
+        self.failed = array.array('i', [0]) * count  # Consecutive failed pings
+        self.outages = array.array('i', [0]) * count  # OUTAGE_START events since start
+        self.last_change = array.array('d', [clock()]) * count  # Clock value of the last status change
+        self.in_flight = array.array('B', [0]) * count  # A check of the device is running
+        self.locks = [threading.Lock() for _ in range(max(1, shards))]
+        # Claims refused because the device already had a check in flight, per shard (each
+        # counter is only changed under its shard's lock)
+        self.shard_contended = [0] * len(self.locks)
+
+    @property
+    def contended(self) -> int:
+        """Claims refused because the device already had a check in flight"""
+        return sum(self.shard_contended)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.index
+
+    def is_online(self, key: Hashable) -> Optional[bool]:
+        """Current status of a device, None if it is not in the table"""
+        i = self.index.get(key)
+        return None if i is None else bool(self.online[i])
+
+    def failed_count(self, key: Hashable) -> int:
+        return self.failed[self.index[key]]
+
+    def claim(self, key: Hashable) -> bool:
+        """
+        Mark a check of a device as in flight
+
+        Returns:
+            bool: True if the caller now owns the device, False if another
+            check of it is still running (the caller should skip it)
+        """
+        i = self.index[key]
+        shard = i % len(self.locks)
+        with self.locks[shard]:
+            if self.in_flight[i]:
+                self.shard_contended[shard] += 1
+                return False
+            self.in_flight[i] = 1
+            return True
+
+    def claim_many(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        """Claim every device that has no check in flight; returns the ones claimed, in order"""
+        index, in_flight, shard_contended = self.index, self.in_flight, self.shard_contended
+        shards = len(self.locks)
+        claimed = []
+        # Shard locks are always taken in the same order, so this cannot deadlock with claim()
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            for key in keys:
+                i = index[key]
+                if in_flight[i]:
+                    shard_contended[i % shards] += 1
+                    continue
+                in_flight[i] = 1
+                claimed.append(key)
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
+        return claimed
+
+    def release(self, key: Hashable):
+        """End the check claimed with claim()"""
+        self.in_flight[self.index[key]] = 0
+
+    def release_many(self, keys: Iterable[Hashable]):
+        index, in_flight = self.index, self.in_flight
+        for key in keys:
+            in_flight[index[key]] = 0
+
+    def set_initial(self, key: Hashable, is_online: bool, now: float = None):
+        """Record the result of the startup check of a device"""
+        i = self.index[key]
+        self.online[i] = 1 if is_online else 0
+        self.failed[i] = 0 if is_online else 1
+        self.last_change[i] = self.clock() if now is None else now
+
+    def online_count(self) -> int:
+        return sum(self.online)
+
+    def seconds_since_change(self, key: Hashable, now: float = None) -> float:
+        now = self.clock() if now is None else now
+        return now - self.last_change[self.index[key]]
+
+    def rows(self) -> Iterator[Tuple[Hashable, bool, int, int]]:
+        """(device, online, consecutive failures, outages) for every device, in index order"""
+        return zip(self.keys, map(bool, self.online), self.failed, self.outages)
+
+    def nbytes(self) -> int:
+        """Bytes held by the typed arrays (not counting the key index)"""
+        return sum(field.itemsize * len(field) for field in (
+            self.online, self.email_sent, self.alert_suppressed, self.failed, self.outages, self.last_change,
+            self.in_flight))
+
+    def evaluate_batch(self, indices: Sequence[int], reachable: Sequence[bool], now: float = None,
+                       alert_threshold: int = 3, periodic_interval: Optional[float] = None) -> List[Tuple[int, int]]:
+        """
+        Decide which events a whole cycle of results produces, without changing state
+
+        Uses NumPy over views of the arrays when it is installed, a plain loop
+        otherwise; both give the same result. A device that stays online and
+        has no periodic check due produces nothing and needs no state update.
+
+        Args:
+            indices: Dense index of each probed device (each at most once); an
+                     array.array('i') lets NumPy use the buffer without copying
+            reachable: Whether each device answered (e.g. array.array('B'))
+            now: Clock value of the results (read when omitted)
+            alert_threshold: Consecutive failures that make an alert due
+            periodic_interval: Seconds between STATUS_CHECK rows for online devices (None = off)
+
+        Returns:
+            (index, event bits) for the devices with at least one event, in input order
+        """
+        now = self.clock() if now is None else now
+        if numpy is not None and len(indices) > 1:
+            return self._evaluate_batch_numpy(indices, reachable, now, alert_threshold, periodic_interval)
+
+        online, failed, email_sent, suppressed = self.online, self.failed, self.email_sent, self.alert_suppressed
+        last_change = self.last_change
+        events = []
+        for i, up in zip(indices, reachable):
+            if up:
+                if not online[i]:
+                    events.append((i, OUTAGE_END))
+                elif periodic_interval is not None and now - last_change[i] >= periodic_interval:
+                    events.append((i, STATUS_CHECK))
+                continue
+            bits = OUTAGE_START if online[i] else PING_FAILED
+            if (failed[i] + 1 == alert_threshold or suppressed[i]) and not email_sent[i]:
+                bits |= OUTAGE_ALERT
+            events.append((i, bits))
+        return events
+
+    def _evaluate_batch_numpy(self, indices, reachable, now, alert_threshold, periodic_interval):
+        index = numpy.asarray(indices, dtype=numpy.intp)
+        up = numpy.asarray(reachable, dtype=bool)
+        down = ~up
+        was_online = numpy.frombuffer(self.online, dtype=numpy.uint8)[index].astype(bool)
+        failed_next = numpy.frombuffer(self.failed, dtype=self.failed.typecode)[index] + 1
+        email_sent = numpy.frombuffer(self.email_sent, dtype=numpy.uint8)[index].astype(bool)
+        suppressed = numpy.frombuffer(self.alert_suppressed, dtype=numpy.uint8)[index].astype(bool)
+
+        bits = numpy.zeros(len(index), dtype=numpy.uint8)
+        bits[down & was_online] = OUTAGE_START
+        bits[down & ~was_online] = PING_FAILED
+        bits[down & ((failed_next == alert_threshold) | suppressed) & ~email_sent] |= OUTAGE_ALERT
+        bits[up & ~was_online] = OUTAGE_END
+        if periodic_interval is not None:
+            last_change = numpy.frombuffer(self.last_change, dtype=numpy.float64)[index]
+            bits[up & was_online & (now - last_change >= periodic_interval)] = STATUS_CHECK
+        hits = numpy.flatnonzero(bits)
+        return list(zip(index[hits].tolist(), bits[hits].tolist()))
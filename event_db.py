@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+SQLite event backend for the Network Ping Monitor
+Indexed event history plus a precomputed outage table, so questions such as
+"how many outages did a device have last month" need no CSV scans
+"""
+
+import datetime
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    device_name TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_minutes REAL NOT NULL DEFAULT 0,
+    failed_count INTEGER NOT NULL DEFAULT 0,
+    email_sent INTEGER,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_ip_timestamp ON events (ip, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_event_type ON events (event_type);
+CREATE TABLE IF NOT EXISTS outages (
+    id INTEGER PRIMARY KEY,
+    ip TEXT NOT NULL,
+    device_name TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT,
+    duration_minutes REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outages_ip_start ON outages (ip, start);
+CREATE INDEX IF NOT EXISTS idx_outages_open ON outages (ip) WHERE end IS NULL;
+"""
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _email_value(email_sent) -> Optional[int]:
+    if email_sent is True or email_sent is False:
+        return int(email_sent)
+    return None
+
+
+class SqliteEventStore:
+    """
+    Event log sink that writes into SQLite in WAL mode
+
+    Implements the event log sink interface (write_event, flush_if_due,
+    close). Events are buffered and committed in one transaction per batch;
+    OUTAGE_START opens a row in the outages table and OUTAGE_END closes the
+    device's open outage (or records the whole outage from its duration when
+    it began before the database saw it, e.g. a device offline at startup).
+    """
+
+    def __init__(self, filename: str, batch_rows: int = 500, flush_interval: float = 1.0):
+        """
+        Open or create the event database
+
+        Args:
+            filename: Path of the SQLite database
+            batch_rows: Commit once this many events are pending
+            flush_interval: ...or once the oldest pending event is this many seconds old
+        """
+        self.filename = filename
+        self.batch_rows = max(1, int(batch_rows))
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.oldest_pending = None
+        # Created here but used only by the log writer thread
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+    def write_event(self, event):
+        """Buffer one event tuple (see event_log.Event)"""
+        self.pending.append(event)
+        if self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+        if len(self.pending) >= self.batch_rows:
+            self.flush()
+
+    def write_events(self, events):
+        for event in events:
+            self.write_event(event)
+
+    def flush(self):
+        """Commit buffered events and outage updates in one transaction"""
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        self.oldest_pending = None
+        rows = []
+        outage_events = []
+        for event in events:
+            timestamp, ip_address, device_name, event_type, status, duration_minutes, failed_count, email_sent, notes = event
+            rows.append((timestamp.strftime(TIMESTAMP_FORMAT), ip_address, device_name, event_type, status,
+                         float(duration_minutes or 0), int(failed_count or 0), _email_value(email_sent), notes or ''))
+            if event_type in ('OUTAGE_START', 'OUTAGE_END'):
+                outage_events.append(event)
+
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO events (timestamp, ip, device_name, event_type, status, duration_minutes, '
+                'failed_count, email_sent, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            for event in outage_events:
+                self._apply_outage_event(event)
+
+    def _apply_outage_event(self, event):
+        timestamp, ip_address, device_name, event_type, _, duration_minutes = event[:6]
+        if event_type == 'OUTAGE_START':
+            self.connection.execute('INSERT INTO outages (ip, device_name, start) VALUES (?, ?, ?)',
+                                    (ip_address, device_name, timestamp.strftime(TIMESTAMP_FORMAT)))
+            return
+        end = timestamp.strftime(TIMESTAMP_FORMAT)
+        cursor = self.connection.execute(
+            'UPDATE outages SET end = ?, duration_minutes = ? WHERE id = '
+            '(SELECT MAX(id) FROM outages WHERE ip = ? AND end IS NULL)',
+            (end, duration_minutes, ip_address))
+        if cursor.rowcount == 0:
+            start = timestamp - datetime.timedelta(minutes=duration_minutes or 0)
+            self.connection.execute(
+                'INSERT INTO outages (ip, device_name, start, end, duration_minutes) VALUES (?, ?, ?, ?, ?)',
+                (ip_address, device_name, start.strftime(TIMESTAMP_FORMAT), end, duration_minutes))
+
+    def flush_if_due(self):
+        if self.oldest_pending is not None and time.monotonic() - self.oldest_pending >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        if self.connection is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.connection.close()
+            self.connection = None
+
+
+def outage_summary(filename: str, ip_address: str = None, since: datetime.datetime = None,
+                   until: datetime.datetime = None) -> List[Tuple[str, str, int, float]]:
+    """
+    Outages per device that started in [since, until)
+
+    Returns:
+        List of (ip, device_name, outage_count, total_closed_minutes)
+    """
+    clauses = []
+    params = []
+    if ip_address:
+        clauses.append('ip = ?')
+        params.append(ip_address)
+    if since:
+        clauses.append('start >= ?')
+        params.append(since.strftime(TIMESTAMP_FORMAT))
+    if until:
+        clauses.append('start < ?')
+        params.append(until.strftime(TIMESTAMP_FORMAT))
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    connection = sqlite3.connect(filename)
+    try:
+        return connection.execute(
+            f'SELECT ip, MAX(device_name), COUNT(*), COALESCE(SUM(duration_minutes), 0) FROM outages {where} '
+            'GROUP BY ip ORDER BY COUNT(*) DESC, ip', params).fetchall()
+    finally:
+        connection.close()
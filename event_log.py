@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+CSV event log writer for the Network Ping Monitor
+Keeps the log file open, checks the header once and writes rows in batches,
+rotating and compressing the file by size or by day.
+EventLogThread moves all sink I/O onto one writer thread fed by a queue.
+"""
+
+import collections
+import csv
+import datetime
+import glob
+import gzip
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# Event tuple handed from the monitor to the log sinks:
+# (timestamp, ip_address, device_name, event_type, status, duration_minutes,
+#  failed_count, email_sent, notes) with timestamp a datetime
+Event = Tuple[datetime.datetime, str, str, str, str, float, int, object, str]
+
+CSV_HEADER = [
+    'Timestamp',
+    'IP Address',
+    'Device Name',
+    'Event Type',
+    'Status',
+    'Duration (minutes)',
+    'Failed Ping Count',
+    'Email Sent',
+    'Notes'
+]
+
+# fsync policies: "never" leaves durability to the OS, "flush" fsyncs after
+# every batch, "row" flushes and fsyncs every row as it is written
+FSYNC_POLICIES = ('never', 'flush', 'row')
+
+# Compression applied to rotated log segments
+COMPRESSION_TYPES = (None, 'gzip', 'zstd')
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+def format_csv_row(event: Event) -> list:
+    """Convert an event tuple to the CSV row layout"""
+    timestamp, ip_address, device_name, event_type, status, duration_minutes, failed_count, email_sent, notes = event
+    return [
+        timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        ip_address,
+        device_name,
+        event_type,
+        status,
+        f"{duration_minutes:.2f}",
+        failed_count,
+        email_sent,
+        notes
+    ]
+
+
+def compress_file(path: str, compression: str) -> str:
+    """
+    Compress a file next to itself and remove the original
+
+    Args:
+        path: File to compress
+        compression: "gzip" or "zstd" (zstd needs the optional zstandard package)
+
+    Returns:
+        str: Path of the compressed file
+    """
+    if compression == 'zstd':
+        import zstandard
+        target = path + '.zst'
+        with open(path, 'rb') as src, open(target + '.tmp', 'wb') as dst:
+            zstandard.ZstdCompressor(level=10).copy_stream(src, dst)
+    else:
+        target = path + '.gz'
+        with open(path, 'rb') as src, gzip.open(target + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(target + '.tmp', target)
+    os.remove(path)
+    return target
+
+
+def csv_has_header(filename: str) -> bool:
+    """Return True if the CSV's first line looks like the event log header"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        first = f.readline()
+    return 'Timestamp' in first and 'IP Address' in first
+
+
+def prepend_csv_header(filename: str):
+    """Rewrite a CSV file with the event log header in front of its rows"""
+    tmp = filename + '.tmp'
+    with open(filename, 'r', encoding='utf-8') as orig, open(tmp, 'w', encoding='utf-8', newline='') as newf:
+        writer = csv.writer(newf)
+        writer.writerow(CSV_HEADER)
+        for line in orig:
+            newf.write(line)
+    os.replace(tmp, filename)
+
+
+class CsvEventWriter:
+    """
+    Long-lived, buffered writer for the event CSV
+
+    Rows are collected in memory and written when flush_rows rows are
+    pending, when the oldest pending row is flush_interval seconds old, or
+    on close(). Unless background_flush is off (when EventLogThread drives
+    the writer), a background thread handles the time-based flush so rows
+    never sit in memory during quiet periods. Safe to call from many threads.
+
+    With rotation enabled the file is rotated after a flush once it reaches
+    rotate_bytes or the local date changes: the current file is renamed to
+    <name>.<YYYYmmdd_HHMMSS>.csv and a fresh file with a header is opened in
+    its place. Rotated segments are compressed on a background thread and
+    only the newest `retain` segments are kept, so writing never waits on
+    compression. Segments are ordered by the rotation time in their names;
+    retain_glob widens retention to segments left by other writers (e.g.
+    earlier runs of the monitor).
+    """
+
+    def __init__(self, filename: str, flush_rows: int = 100, flush_interval: float = 1.0,
+                 fsync: str = 'never', background_flush: bool = True,
+                 rotate_bytes: int = 0, rotate_daily: bool = False,
+                 compression: str = 'gzip', retain: int = 0, retain_glob: str = None, timings=None):
+        """
+        Open the log file and make sure it starts with the header
+
+        Args:
+            filename: CSV file to append to
+            flush_rows: Pending row count that triggers a flush
+            flush_interval: Longest time in seconds a row stays buffered
+            fsync: One of FSYNC_POLICIES
+            background_flush: Run the time-based flush on a thread of its own
+            rotate_bytes: Rotate once the file reaches this size (0 = no size limit)
+            rotate_daily: Rotate when the local date changes
+            compression: One of COMPRESSION_TYPES for rotated segments
+            retain: Number of rotated segments to keep (0 = keep all)
+            retain_glob: Glob of the files whose rotated segments count against retain
+                         (default: this file's own segments)
+            timings: Optional metrics.Timings receiving 'log_header_check' durations
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        if compression not in COMPRESSION_TYPES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                print("⚠️  zstandard package not installed; compressing rotated logs with gzip")
+                compression = "gzip"
+        self.filename = filename
+        self.flush_rows = max(1, int(flush_rows))
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.pending = []
+        self.oldest_pending = None
+        self.rows_written = 0
+        self.closed = False
+
+        self.rotate_bytes = max(0, int(rotate_bytes))
+        self.rotate_daily = rotate_daily
+        self.compression = compression
+        self.retain = max(0, int(retain))
+        self.retain_glob = retain_glob
+        self.rotations = 0
+        self.last_segment = (None, 0)  # (stamp, number) of the last rotated segment's name
+        self.compressors = []
+        self.opened_date = None
+        self.timings = timings
+
+        self.file = None
+        self.writer = None
+        self._open()
+
+        self.wakeup = threading.Event()
+        self.flusher = None
+        if background_flush:
+            self.flusher = threading.Thread(target=self._flush_loop, name='csv-flusher', daemon=True)
+            self.flusher.start()
+
+    def _open(self):
+        """Open the file for append, adding or repairing the header once"""
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+            start = time.perf_counter()
+            if not csv_has_header(self.filename):
+                prepend_csv_header(self.filename)
+                print(f"Fixed missing header in: {self.filename}")
+            if self.timings is not None:
+                self.timings.observe('log_header_check', time.perf_counter() - start)
+            need_header = False
+        else:
+            need_header = True
+
+        self.file = open(self.filename, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.opened_date = datetime.date.today()
+        if need_header:
+            self.writer.writerow(CSV_HEADER)
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        if self.fsync != 'never':
+            os.fsync(self.file.fileno())
+
+    def write_row(self, row: Sequence):
+        """Queue one row; flushes immediately if the batch is full"""
+        with self.lock:
+            if self.closed:
+                raise ValueError(f"Event log {self.filename} is closed")
+            if self.fsync == 'row':
+                self.writer.writerow(row)
+                self.rows_written += 1
+                self._sync()
+                self._rotate_if_needed()
+                return
+            if not self.pending:
+                self.oldest_pending = time.monotonic()
+            self.pending.append(row)
+            if len(self.pending) >= self.flush_rows:
+                self._flush_locked()
+
+    def write_rows(self, rows: List[Sequence]):
+        """Queue several rows at once"""
+        for row in rows:
+            self.write_row(row)
+
+    def write_event(self, event: Event):
+        """Queue one event tuple as a CSV row"""
+        self.write_row(format_csv_row(event))
+
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        self.writer.writerows(self.pending)
+        self.rows_written += len(self.pending)
+        self.pending = []
+        self.oldest_pending = None
+        self._sync()
+        self._rotate_if_needed()
+
+    def _rotate_if_needed(self):
+        if self.rotate_bytes and self.file.tell() >= self.rotate_bytes:
+            self._rotate()
+        elif self.rotate_daily and datetime.date.today() != self.opened_date:
+            self._rotate()
+
+    def _rotate(self):
+        """Rename the current file aside, reopen a fresh one and compress the old one in the background"""
+        self.file.close()
+        base, ext = os.path.splitext(self.filename)
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Numbers keep rising within a second, even once retention removed the earlier segments
+        n = self.last_segment[1] + 1 if self.last_segment[0] == stamp else 1
+        segment = f"{base}.{stamp}{ext}" if n == 1 else f"{base}.{stamp}_{n}{ext}"
+        while glob.glob(glob.escape(segment) + '*'):
+            n += 1
+            segment = f"{base}.{stamp}_{n}{ext}"
+        self.last_segment = (stamp, n)
+        os.replace(self.filename, segment)
+        self.rotations += 1
+        self._open()
+
+        self.compressors = [t for t in self.compressors if t.is_alive()]
+        thread = threading.Thread(target=self._finish_segment, args=(segment,), name='csv-compressor', daemon=True)
+        thread.start()
+        self.compressors.append(thread)
+
+    def _finish_segment(self, segment: str):
+        if self.compression:
+            try:
+                compress_file(segment, self.compression)
+            except Exception as e:
+                print(f"❌ Failed to compress rotated log {segment}: {e}")
+        try:
+            self._apply_retention()
+        except Exception as e:
+            print(f"❌ Failed to remove old rotated logs: {e}")
+
+    def rotated_segments(self) -> List[str]:
+        """Rotated segments counted against retain, oldest first by the rotation time in their names"""
+        base, ext = os.path.splitext(self.filename)
+        pattern = self.retain_glob or glob.escape(base) + '.*' + ext + '*'
+        # <name>.<YYYYmmdd_HHMMSS>[_n]<ext>[.gz|.zst]; live logs and .tmp files do not match
+        rotated_name = re.compile(r'\.(\d{8}_\d{6})(?:_(\d+))?' + re.escape(ext) +
+                                  '(?:' + '|'.join(map(re.escape, COMPRESSED_SUFFIXES)) + ')?$')
+        segments = []
+        for path in glob.glob(pattern):
+            match = rotated_name.search(os.path.basename(path))
+            if match:
+                segments.append((match.group(1), int(match.group(2) or 1), path))
+        return [path for _, _, path in sorted(segments)]
+
+    def _apply_retention(self):
+        if not self.retain:
+            return
+        # A segment being compressed exists twice for a moment (<segment> and <segment>.gz)
+        stems = []
+        for path in self.rotated_segments():
+            stem = path
+            for suffix in COMPRESSED_SUFFIXES:
+                if stem.endswith(suffix):
+                    stem = stem[:-len(suffix)]
+            if stem not in stems:
+                stems.append(stem)
+        for stem in stems[:-self.retain]:
+            for path in (stem,) + tuple(stem + suffix for suffix in COMPRESSED_SUFFIXES):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def flush(self):
+        """Write every pending row to disk now"""
+        with self.lock:
+            if not self.closed:
+                self._flush_locked()
+
+    def flush_if_due(self):
+        """Flush if the oldest pending row has waited flush_interval seconds"""
+        with self.lock:
+            if self.closed:
+                return
+            if self.oldest_pending is not None and time.monotonic() - self.oldest_pending >= self.flush_interval:
+                self._flush_locked()
+
+    def _flush_loop(self):
+        while not self.wakeup.wait(self.flush_interval):
+            if self.closed:
+                return
+            try:
+                self.flush_if_due()
+            except Exception as e:
+                print(f"❌ Failed to write log events to {self.filename}: {e}")
+
+    def close(self):
+        """Flush pending rows and close the file"""
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self._flush_locked()
+            finally:
+                self.closed = True
+                self.file.close()
+        self.wakeup.set()
+        for thread in self.compressors:
+            thread.join()
+
+
+class EventLogThread:
+    """
+    Dedicated writer thread that owns every event sink
+
+    Producers (ping workers) only append event tuples to a deque, which is
+    atomic under the GIL, so they never take a lock or touch the filesystem.
+    The writer thread drains the deque and passes each event to the sinks'
+    write_event(). The queue is bounded: a producer that finds it full waits
+    up to block_timeout for room (counted as delayed) and then drops the
+    event (counted as dropped) rather than letting memory grow.
+    """
+
+    def __init__(self, sinks: list, max_queue: int = 10000, block_timeout: float = 0.1,
+                 poll_interval: float = 0.05, timings=None):
+        """
+        Start the writer thread
+
+        Args:
+            sinks: Objects with write_event(event), flush_if_due() and close()
+            max_queue: Maximum number of events waiting for the writer
+            block_timeout: Longest time a producer waits for room when full
+            poll_interval: How often the idle writer checks for new events
+            timings: Optional metrics.Timings receiving 'log_write' (per event)
+                     and 'log_flush' (per sink flush check) durations
+        """
+        self.sinks = list(sinks)
+        self.timings = timings
+        self.max_queue = max(1, int(max_queue))
+        self.block_timeout = block_timeout
+        self.poll_interval = poll_interval
+        self.queue = collections.deque()
+
+        # Written by the writer thread only
+        self.written = 0
+        self.max_depth = 0
+        self.errors = 0
+        # Producers update these only when the queue is full (the slow path)
+        self.delayed = 0
+        self.dropped = 0
+        self.backpressure_lock = threading.Lock()
+
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+        self.thread.start()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def put(self, event: Event) -> bool:
+        """
+        Hand an event to the writer thread
+
+        Returns:
+            bool: False if the queue stayed full and the event was dropped
+        """
+        if self.stopping.is_set():
+            return self._refuse(1)
+        if len(self.queue) >= self.max_queue and not self._wait_for_room(1):
+            return False
+        self.queue.append(event)
+        return True
+
+    def put_many(self, events: List[Event]) -> bool:
+        """
+        Hand a batch of events to the writer thread in one step
+
+        The batch goes in with a single deque.extend(), so its rows reach the
+        sinks back to back and are flushed together. A batch may take the
+        queue past max_queue (e.g. a status sweep over a large fleet); the
+        producer only waits while the queue is already full.
+
+        Returns:
+            bool: False if the queue stayed full and the batch was dropped
+        """
+        if self.stopping.is_set():
+            return self._refuse(len(events))
+        if len(self.queue) >= self.max_queue and not self._wait_for_room(len(events)):
+            return False
+        self.queue.extend(events)
+        return True
+
+    def _wait_for_room(self, count: int) -> bool:
+        """Wait up to block_timeout for the queue to drop below max_queue; count events as dropped if not"""
+        with self.backpressure_lock:
+            self.delayed += 1
+        deadline = time.monotonic() + self.block_timeout
+        while len(self.queue) >= self.max_queue:
+            if time.monotonic() >= deadline:
+                with self.backpressure_lock:
+                    self.dropped += count
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _refuse(self, count: int) -> bool:
+        """Count events logged after close() as dropped, so late writers leave a trace"""
+        with self.backpressure_lock:
+            self.dropped += count
+        print(f"⚠️  {count} log event(s) arrived after the event log was closed and were dropped")
+        return False
+
+    def _write(self, event: Event):
+        for sink in self.sinks:
+            try:
+                sink.write_event(event)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Failed to write log event to {sink.__class__.__name__}: {e}")
+
+    def _drain(self):
+        queue = self.queue
+        depth = len(queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        timings = self.timings
+        while queue:
+            if timings is None:
+                self._write(queue.popleft())
+            else:
+                start = time.perf_counter()
+                self._write(queue.popleft())
+                timings.observe('log_write', time.perf_counter() - start)
+            self.written += 1
+
+    def _run(self):
+        while not self.stopping.is_set():
+            self._drain()
+            start = time.perf_counter()
+            for sink in self.sinks:
+                try:
+                    sink.flush_if_due()
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Failed to flush {sink.__class__.__name__}: {e}")
+            if self.timings is not None:
+                self.timings.observe('log_flush', time.perf_counter() - start)
+            self.stopping.wait(self.poll_interval)
+        self._drain()
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the queue counters"""
+        return {
+            'depth': len(self.queue),
+            'max_depth': self.max_depth,
+            'written': self.written,
+            'delayed': self.delayed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+    def close(self):
+        """Write everything still queued, then close the sinks"""
+        if self.stopping.is_set():
+            return
+        self.stopping.set()
+        self.thread.join()
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"❌ Failed to close {sink.__class__.__name__}: {e}")
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Compact binary event store for the Network Ping Monitor
+Append-only columnar format kept alongside the CSV log for long-term history
+
+File layout (little endian, every record padded to 8 bytes):
+    b'PMEVLOG1'                                  file magic
+    record := type:u8, pad:3, length:u32, payload[length], pad
+Record types:
+    DEVICE  id:u32, ip_len:u16, name_len:u16, ip, name
+    NOTE    id:u32, flags:u8, pad:3, text_len:u32, text
+    ENUM    kind:u8, id:u8, pad:2, text_len:u32, text   (event type / status)
+    BLOCK   count:u32, pad:4, then one column per COLUMNS entry:
+            base:i64, width:u8, pad:7, data[count * width], pad
+            then, if the record continues, the block's inline notes:
+            note_count:u32, pad:4, note_count * (flags:u8, template:u32, text_len:u32, text)
+    ZBLOCK  count:u32, pad:4, zlib stream of a whole BLOCK payload
+Each column is frame-of-reference encoded: value = base + data[i], with the
+narrowest of 1/2/4/8 bytes that fits the block, so a scan can memory-map the
+file and cast a column straight to a typed memoryview. Finished blocks are
+written as ZBLOCK records: the columns of one block are narrow, repetitive
+integers, so zlib shrinks them several times over, and a scan decompresses
+one block at a time before casting its columns (plain BLOCK records, from
+files written with compress_blocks off, are still read in place).
+
+Timestamps are stored as seconds since the epoch of the local wall-clock time
+written to the CSV (no timezone conversion), durations as hundredths of a
+minute, and event type / status / email flag packed into one code column.
+Numbers equal to the row's failed count or duration are lifted out of the
+notes text, so "Consecutive failed ping #N" is one template. Notes that
+repeat are interned with a NOTE record. Other numbers (latency summaries,
+burst loss and jitter) make almost every note unique; they are lifted out as
+arguments, the remaining template is interned once it repeats, and the row
+gets an inline note holding the template id and just the arguments. A note
+whose template has not repeated yet is stored inline as text. Inline notes
+belong to their block and are referenced by a negative note id (-1 = the
+block's first inline note), so unique notes cost neither a NOTE record nor
+writer memory.
+"""
+
+import calendar
+import collections
+import csv
+import datetime
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'PMEVLOG1'
+
+RECORD_DEVICE = 1
+RECORD_NOTE = 2
+RECORD_ENUM = 3
+RECORD_BLOCK = 4
+RECORD_ZBLOCK = 5  # BLOCK payload compressed with zlib
+
+ENUM_EVENT_TYPE = 0
+ENUM_STATUS = 1
+
+# Note flags
+NOTE_LITERAL = 0
+NOTE_TEMPLATE = 1  # Failed count / duration placeholders
+NOTE_ARGS = 2  # Argument placeholders; inline notes with this flag carry the arguments
+
+# Notes seen once are remembered (LRU) so a second sighting interns them
+NOTE_CANDIDATES = 1024
+# Interned notes per file; later new notes are always stored inline
+MAX_INTERNED_NOTES = 65536
+
+# Placeholders substituted into interned note templates
+FAILED_PLACEHOLDER = '\x01'
+DURATION_PLACEHOLDER = '\x02'
+ARG_PLACEHOLDER = '\x03'
+ARG_SEPARATOR = '\x00'
+
+NOTE_ARG_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+_INLINE_NOTE = struct.Struct('<BII')
+
+# Compression level of ZBLOCK records; higher levels gain little on these columns
+ZLIB_LEVEL = 6
+
+COLUMNS = ('timestamp', 'device', 'failed_count', 'duration_centi', 'note', 'code')
+
+# Well-known values get fixed codes; anything else is added with an ENUM record
+EVENT_TYPES = ['MONITOR_START', 'MONITOR_STOP', 'OUTAGE_START', 'PING_FAILED', 'OUTAGE_ALERT',
+               'OUTAGE_END', 'STATUS_CHECK', 'RECOVERY_ALERT']
+STATUSES = ['ONLINE', 'OFFLINE']
+
+_RECORD_HEADER = struct.Struct('<B3xI')
+_COLUMN_HEADER = struct.Struct('<qB7x')
+_WIDTH_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+EMAIL_CODES = {False: 0, True: 1, None: 2}
+EMAIL_VALUES = {code: value for value, code in EMAIL_CODES.items()}
+
+
+def _pad(length: int) -> int:
+    return (-length) % 8
+
+
+def _width_for(span: int) -> int:
+    for width in (1, 2, 4):
+        if span < 1 << (8 * width):
+            return width
+    return 8
+
+
+def _encode_code(event_id: int, status_id: int, email_code: int) -> int:
+    return (event_id << 4) | (status_id << 2) | email_code
+
+
+def _decode_code(code: int) -> Tuple[int, int, int]:
+    return code >> 4, (code >> 2) & 0x3, code & 0x3
+
+
+def to_epoch(timestamp: datetime.datetime) -> int:
+    """Wall-clock datetime -> integer seconds, without timezone conversion"""
+    return calendar.timegm(timestamp.timetuple())
+
+
+def from_epoch(seconds: int) -> datetime.datetime:
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=seconds)
+
+
+def duration_to_centi(duration_minutes: float) -> int:
+    """Round exactly as the CSV does (f"{d:.2f}") and keep hundredths"""
+    return int(f"{duration_minutes:.2f}".replace('.', ''))
+
+
+def make_note_template(notes: str, failed_count: int, duration_centi: int) -> Tuple[str, int]:
+    """Return (text, flags) for interning; templates render back to notes exactly"""
+    if FAILED_PLACEHOLDER in notes or DURATION_PLACEHOLDER in notes:
+        return notes, NOTE_LITERAL
+    duration_text = f"{duration_centi / 100:.2f}"
+    template = notes
+    if duration_centi:
+        template = template.replace(duration_text, DURATION_PLACEHOLDER)
+    if failed_count:
+        template = template.replace(str(failed_count), FAILED_PLACEHOLDER)
+    if template == notes or render_note(template, NOTE_TEMPLATE, failed_count, duration_centi) != notes:
+        return notes, NOTE_LITERAL
+    return template, NOTE_TEMPLATE
+
+
+def split_note_args(text: str) -> Tuple[str, List[str]]:
+    """Return (template, numbers) with each number replaced by ARG_PLACEHOLDER; no numbers if none can be lifted"""
+    if ARG_PLACEHOLDER in text or ARG_SEPARATOR in text:
+        return text, []
+    args = NOTE_ARG_PATTERN.findall(text)
+    if not args:
+        return text, []
+    return NOTE_ARG_PATTERN.sub(ARG_PLACEHOLDER, text), args
+
+
+def fill_note_args(template: str, args: str) -> str:
+    """Inverse of split_note_args(), with the numbers joined by ARG_SEPARATOR"""
+    parts = template.split(ARG_PLACEHOLDER)
+    values = args.split(ARG_SEPARATOR)
+    return ''.join(part + value for part, value in zip(parts, values)) + parts[-1]
+
+
+def render_note(text: str, flags: int, failed_count: int, duration_centi: int) -> str:
+    if not flags & NOTE_TEMPLATE:
+        return text
+    return (text.replace(FAILED_PLACEHOLDER, str(failed_count))
+                .replace(DURATION_PLACEHOLDER, f"{duration_centi / 100:.2f}"))
+
+
+class BinaryEventStore:
+    """
+    Append-only writer for the binary event format
+
+    Implements the event log sink interface (write_event, flush_if_due,
+    close) so it can be attached to EventLogThread next to the CSV writer.
+    Events are buffered and written as one columnar block every block_rows
+    events, every flush_interval seconds, or on close. Reopening an existing
+    file continues its dictionaries; a torn trailing record from a crash is
+    truncated away.
+    """
+
+    def __init__(self, filename: str, block_rows: int = 4096, flush_interval: float = 5.0,
+                 compress_blocks: bool = True):
+        """
+        Open or create a binary event file
+
+        Args:
+            filename: Path of the .pmev file
+            block_rows: Events per columnar block
+            flush_interval: Longest time in seconds events stay buffered
+            compress_blocks: Write blocks as zlib-compressed ZBLOCK records
+        """
+        self.filename = filename
+        self.compress_blocks = compress_blocks
+        self.block_rows = max(1, int(block_rows))
+        self.flush_interval = flush_interval
+        self.devices = {}  # (ip, name) -> id
+        self.notes = {}  # (text, flags) -> id
+        self.note_candidates = collections.OrderedDict()  # (text, flags) seen once, not interned
+        self.enums = {ENUM_EVENT_TYPE: {name: i for i, name in enumerate(EVENT_TYPES)},
+                      ENUM_STATUS: {name: i for i, name in enumerate(STATUSES)}}
+        self.pending = {name: [] for name in COLUMNS}
+        self.pending_notes = []  # (flags, template id, text) stored inline in the pending block
+        self.oldest_pending = None
+        self.events_written = 0
+
+        valid_length = 0
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            reader = EventStoreReader(filename)
+            try:
+                self.devices = {value: key for key, value in reader.devices.items()}
+                self.notes = {value: key for key, value in reader.notes.items()}
+                for kind, values in reader.enums.items():
+                    self.enums[kind] = {name: code for code, name in values.items()}
+                valid_length = reader.valid_length
+            finally:
+                reader.close()
+
+        self.file = open(filename, 'r+b' if valid_length else 'wb')
+        if valid_length:
+            self.file.truncate(valid_length)
+            self.file.seek(valid_length)
+        else:
+            self.file.write(MAGIC)
+            self.file.flush()
+
+    def _write_record(self, record_type: int, payload: bytes):
+        self.file.write(_RECORD_HEADER.pack(record_type, len(payload)))
+        self.file.write(payload)
+        self.file.write(b'\x00' * _pad(len(payload)))
+
+    def _intern_device(self, ip_address: str, device_name: str) -> int:
+        key = (ip_address, device_name)
+        device_id = self.devices.get(key)
+        if device_id is None:
+            device_id = len(self.devices)
+            self.devices[key] = device_id
+            ip_bytes = ip_address.encode('utf-8')
+            name_bytes = device_name.encode('utf-8')
+            self._write_record(RECORD_DEVICE, struct.pack('<IHH', device_id, len(ip_bytes), len(name_bytes))
+                               + ip_bytes + name_bytes)
+        return device_id
+
+    def _intern_note(self, text: str, flags: int) -> int:
+        key = (text, flags)
+        note_id = self.notes.get(key)
+        if note_id is None:
+            note_id = len(self.notes)
+            self.notes[key] = note_id
+            data = text.encode('utf-8')
+            self._write_record(RECORD_NOTE, struct.pack('<IB3xI', note_id, flags, len(data)) + data)
+        return note_id
+
+    def _repeated_note_id(self, text: str, flags: int) -> Optional[int]:
+        """Id of an interned note, interning it on its second sighting; None if it is new"""
+        key = (text, flags)
+        note_id = self.notes.get(key)
+        if note_id is not None:
+            return note_id
+        candidates = self.note_candidates
+        if key in candidates and len(self.notes) < MAX_INTERNED_NOTES:
+            # Seen before: from now on it repeats often enough to be worth a NOTE record
+            del candidates[key]
+            return self._intern_note(text, flags)
+        candidates[key] = None
+        candidates.move_to_end(key)
+        if len(candidates) > NOTE_CANDIDATES:
+            candidates.popitem(last=False)
+        return None
+
+    def _note_id(self, text: str, flags: int) -> int:
+        """Id of an interned note, or a negative id of a note stored inline in the pending block"""
+        template, args = split_note_args(text)
+        if not args:
+            note_id = self._repeated_note_id(text, flags)
+            if note_id is not None:
+                return note_id
+            self.pending_notes.append((flags, 0, text))
+        else:
+            template_id = self._repeated_note_id(template, flags | NOTE_ARGS)
+            if template_id is not None:
+                self.pending_notes.append((flags | NOTE_ARGS, template_id, ARG_SEPARATOR.join(args)))
+            else:
+                self.pending_notes.append((flags, 0, text))
+        return -len(self.pending_notes)
+
+    def _intern_enum(self, kind: int, name: str) -> int:
+        values = self.enums[kind]
+        code = values.get(name)
+        if code is None:
+            code = len(values)
+            limit = 16 if kind == ENUM_EVENT_TYPE else 4
+            if code >= limit:
+                raise ValueError(f"Too many distinct {'event types' if kind == ENUM_EVENT_TYPE else 'statuses'}")
+            values[name] = code
+            data = name.encode('utf-8')
+            self._write_record(RECORD_ENUM, struct.pack('<BB2xI', kind, code, len(data)) + data)
+        return code
+
+    def write_event(self, event):
+        """Buffer one event tuple (see event_log.Event)"""
+        timestamp, ip_address, device_name, event_type, status, duration_minutes, failed_count, email_sent, notes = event
+        duration_centi = duration_to_centi(duration_minutes)
+        failed_count = int(failed_count)
+        text, flags = make_note_template(notes or '', failed_count, duration_centi)
+        email_code = EMAIL_CODES.get(email_sent if email_sent in (True, False) else None, 2)
+
+        pending = self.pending
+        pending['timestamp'].append(to_epoch(timestamp))
+        pending['device'].append(self._intern_device(ip_address, device_name))
+        pending['failed_count'].append(failed_count)
+        pending['duration_centi'].append(duration_centi)
+        pending['note'].append(self._note_id(text, flags))
+        pending['code'].append(_encode_code(self._intern_enum(ENUM_EVENT_TYPE, event_type),
+                                            self._intern_enum(ENUM_STATUS, status), email_code))
+        if self.oldest_pending is None:
+            self.oldest_pending = time.monotonic()
+        if len(pending['timestamp']) >= self.block_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered events as one block"""
+        count = len(self.pending['timestamp'])
+        if not count:
+            self.file.flush()
+            return
+        parts = [struct.pack('<I4x', count)]
+        for name in COLUMNS:
+            values = self.pending[name]
+            base = min(values)
+            width = _width_for(max(values) - base)
+            data = struct.pack(f'<{count}{_WIDTH_FORMATS[width]}', *(value - base for value in values))
+            parts.append(_COLUMN_HEADER.pack(base, width))
+            parts.append(data)
+            parts.append(b'\x00' * _pad(len(data)))
+        if self.pending_notes:
+            parts.append(struct.pack('<I4x', len(self.pending_notes)))
+            notes = []
+            for flags, template_id, text in self.pending_notes:
+                data = text.encode('utf-8')
+                notes.append(_INLINE_NOTE.pack(flags, template_id, len(data)))
+                notes.append(data)
+            notes = b''.join(notes)
+            parts.append(notes)
+            parts.append(b'\x00' * _pad(len(notes)))
+        payload = b''.join(parts)
+        if self.compress_blocks:
+            self._write_record(RECORD_ZBLOCK, struct.pack('<I4x', count) + zlib.compress(payload, ZLIB_LEVEL))
+        else:
+            self._write_record(RECORD_BLOCK, payload)
+        self.file.flush()
+        self.events_written += count
+        self.pending = {name: [] for name in COLUMNS}
+        self.pending_notes = []
+        self.oldest_pending = None
+
+    def flush_if_due(self):
+        if self.oldest_pending is not None and time.monotonic() - self.oldest_pending >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+
+
+class EventStoreReader:
+    """
+    Memory-mapped reader for the binary event format
+
+    blocks() yields each block's columns as typed memoryviews (frame-of-
+    reference bases applied by the caller) for fast scans; events() decodes
+    full event tuples. Compressed blocks are inflated one at a time as they
+    are reached.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.devices = {}  # id -> (ip, name)
+        self.notes = {}  # id -> (text, flags)
+        self.enums = {ENUM_EVENT_TYPE: dict(enumerate(EVENT_TYPES)),
+                      ENUM_STATUS: dict(enumerate(STATUSES))}
+        self.block_offsets = []
+        self.block_ends = []  # end of each block record's payload
+        self.block_compressed = []  # whether each block is a ZBLOCK record
+        self.file = open(filename, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a binary event log")
+        self.valid_length = self._index()
+
+    def _index(self) -> int:
+        """Walk the records, loading dictionaries; returns the end of the last complete record"""
+        data = self.map
+        offset = len(MAGIC)
+        size = len(data)
+        while offset + _RECORD_HEADER.size <= size:
+            record_type, length = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            end = start + length + _pad(length)
+            if end > size:
+                break  # torn write at the end of the file
+            if record_type == RECORD_DEVICE:
+                device_id, ip_len, name_len = struct.unpack_from('<IHH', data, start)
+                pos = start + 8
+                ip = bytes(data[pos:pos + ip_len]).decode('utf-8')
+                name = bytes(data[pos + ip_len:pos + ip_len + name_len]).decode('utf-8')
+                self.devices[device_id] = (ip, name)
+            elif record_type == RECORD_NOTE:
+                note_id, flags, text_len = struct.unpack_from('<IB3xI', data, start)
+                self.notes[note_id] = (bytes(data[start + 12:start + 12 + text_len]).decode('utf-8'), flags)
+            elif record_type == RECORD_ENUM:
+                kind, code, text_len = struct.unpack_from('<BB2xI', data, start)
+                self.enums[kind][code] = bytes(data[start + 8:start + 8 + text_len]).decode('utf-8')
+            elif record_type in (RECORD_BLOCK, RECORD_ZBLOCK):
+                self.block_offsets.append(start)
+                self.block_ends.append(start + length)
+                self.block_compressed.append(record_type == RECORD_ZBLOCK)
+            offset = end
+        return offset
+
+    def _block_data(self, n: int) -> Tuple[object, int, int]:
+        """(buffer, start, end) of the n-th block's BLOCK payload, inflating a ZBLOCK"""
+        start, end = self.block_offsets[n], self.block_ends[n]
+        if not self.block_compressed[n]:
+            return self.map, start, end
+        data = zlib.decompress(self.map[start + 8:end])
+        return data, 0, len(data)
+
+    def _read_block(self, data, start: int) -> Tuple[Dict[str, Tuple[int, memoryview]], int]:
+        """({column: (base, typed memoryview)}, offset just past the columns) of the block payload at start"""
+        view = memoryview(data)
+        (count,) = struct.unpack_from('<I4x', data, start)
+        pos = start + 8
+        columns = {}
+        for name in COLUMNS:
+            base, width = _COLUMN_HEADER.unpack_from(data, pos)
+            pos += _COLUMN_HEADER.size
+            length = count * width
+            columns[name] = (base, view[pos:pos + length].cast(_WIDTH_FORMATS[width]))
+            pos += length + _pad(length)
+        return columns, pos
+
+    def _inline_notes(self, data, pos: int, end: int) -> List[Tuple[str, int]]:
+        """(text, flags) of the notes stored inline after a block's columns, arguments filled in"""
+        if pos >= end:
+            return []
+        (note_count,) = struct.unpack_from('<I4x', data, pos)
+        pos += 8
+        notes = []
+        for _ in range(note_count):
+            flags, template_id, text_len = _INLINE_NOTE.unpack_from(data, pos)
+            pos += _INLINE_NOTE.size
+            text = bytes(data[pos:pos + text_len]).decode('utf-8')
+            pos += text_len
+            if flags & NOTE_ARGS:
+                text = fill_note_args(self.notes[template_id][0], text)
+            notes.append((text, flags))
+        return notes
+
+    def blocks(self) -> Iterator[Dict[str, Tuple[int, memoryview]]]:
+        """Yield {column: (base, typed memoryview)} for every block"""
+        for n in range(len(self.block_offsets)):
+            data, start, _ = self._block_data(n)
+            yield self._read_block(data, start)[0]
+
+    def events(self) -> Iterator[tuple]:
+        """Decode every stored event as an event tuple"""
+        event_types = self.enums[ENUM_EVENT_TYPE]
+        statuses = self.enums[ENUM_STATUS]
+        for n in range(len(self.block_offsets)):
+            data, start, end = self._block_data(n)
+            columns, pos = self._read_block(data, start)
+            inline_notes = self._inline_notes(data, pos, end)
+            bases = {name: columns[name][0] for name in COLUMNS}
+            views = [columns[name][1] for name in COLUMNS]
+            for ts, device, failed, duration, note, code in zip(*views):
+                ts += bases['timestamp']
+                failed += bases['failed_count']
+                duration += bases['duration_centi']
+                ip, name = self.devices[device + bases['device']]
+                note += bases['note']
+                text, flags = self.notes[note] if note >= 0 else inline_notes[-note - 1]
+                event_id, status_id, email_code = _decode_code(code + bases['code'])
+                yield (from_epoch(ts), ip, name, event_types[event_id], statuses[status_id],
+                       duration / 100, failed, EMAIL_VALUES[email_code],
+                       render_note(text, flags, failed, duration))
+
+    def count(self) -> int:
+        return sum(struct.unpack_from('<I', self.map, start)[0] for start in self.block_offsets)
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+def parse_csv_event(row: List[str]) -> tuple:
+    """Convert a CSV log row back to an event tuple"""
+    timestamp, ip_address, device_name, event_type, status, duration, failed_count, email_sent, notes = row
+    email = {'True': True, 'False': False}.get(email_sent)
+    return (datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S'), ip_address, device_name, event_type,
+            status, float(duration or 0), int(failed_count or 0), email, notes)
+
+
+def csv_to_binary(csv_path: str, binary_path: str, block_rows: int = 4096) -> int:
+    """Convert a CSV event log to the binary format; returns the number of events"""
+    store = BinaryEventStore(binary_path, block_rows=block_rows)
+    count = 0
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if not row or (row[0] == 'Timestamp' and row[1] == 'IP Address'):
+                    continue
+                store.write_event(parse_csv_event(row))
+                count += 1
+    finally:
+        store.close()
+    return count
+
+
+def binary_to_csv(binary_path: str, csv_path: str) -> int:
+    """Convert a binary event log back to the CSV layout; returns the number of events"""
+    from event_log import CSV_HEADER, format_csv_row
+    reader = EventStoreReader(binary_path)
+    count = 0
+    try:
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for event in reader.events():
+                writer.writerow(format_csv_row(event))
+                count += 1
+    finally:
+        reader.close()
+    return count
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Ping backends for the Network Ping Monitor
+Provides an in-process ICMP echo engine (raw socket or unprivileged datagram
+ICMP socket) and keeps the system ping command as a fallback backend
+"""
+
+import asyncio
+import itertools
+import math
+import os
+import platform
+import re
+import select
+import selectors
+import socket
+import struct
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+# Payload size matches the default of the Linux ping command (56 data bytes)
+DEFAULT_PAYLOAD_SIZE = 56
+
+# Receive buffer for the shared multiplexing socket, sized so that a burst of
+# replies from thousands of targets is not dropped by the kernel
+MULTIPLEX_RCVBUF = 4 * 1024 * 1024
+
+# Number of requests sent between non-blocking reads of queued replies
+DRAIN_EVERY = 64
+
+# Round-trip time in ping command output: "time=0.045 ms" (Linux/macOS),
+# "time=12ms" / "time<1ms" (Windows) and common localized spellings
+PING_RTT_PATTERN = re.compile(r'(?:time|zeit|temps|tiempo|tempo)\s*[=<]\s*([\d.,]+)\s*ms', re.IGNORECASE)
+PING_SEQUENCE_PATTERN = re.compile(r'icmp_seq=(\d+)')
+
+# Shortest -i interval the Linux ping command accepts from unprivileged users
+# on older iputils releases
+UNPRIVILEGED_MIN_SPACING = 0.2
+
+# Returned by ping() when the device answered but the ping command printed no
+# round-trip time. Not None, so the device counts as reachable; callers compare
+# with `is` and record no latency for it
+RTT_UNKNOWN = float('nan')
+
+
+def parse_ping_rtt(output: str) -> Optional[float]:
+    """Round-trip time in seconds from ping command output, or None if not found"""
+    match = PING_RTT_PATTERN.search(output or '')
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(',', '.')) / 1000
+    except ValueError:
+        return None
+
+
+def parse_ping_burst(output: str, count: int) -> List[Optional[float]]:
+    """
+    Per-packet round-trip times from the output of a multi-packet ping command
+
+    Args:
+        output: ping command output
+        count: Number of echo requests that were sent
+
+    Returns:
+        count entries: round-trip time in seconds, or None for a lost packet.
+        Replies are placed by icmp_seq where the output has it, otherwise in
+        the order they were printed
+    """
+    samples = [None] * count
+    position = 0
+    for line in (output or '').splitlines():
+        rtt = parse_ping_rtt(line)
+        if rtt is None:
+            continue
+        match = PING_SEQUENCE_PATTERN.search(line)
+        index = int(match.group(1)) - 1 if match else position
+        if 0 <= index < count:
+            samples[index] = rtt
+        position = max(position, index + 1)
+    return samples
+
+
+def icmp_checksum(data: bytes) -> int:
+    """Compute the RFC 1071 internet checksum of an ICMP message"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier: int, sequence: int, payload: bytes = b'') -> bytes:
+    """
+    Build an ICMP echo request packet
+
+    Args:
+        identifier: 16-bit ICMP identifier
+        sequence: 16-bit ICMP sequence number
+        payload: Data carried in the echo request
+
+    Returns:
+        bytes: Packet ready to be passed to sendto()
+    """
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, identifier & 0xFFFF, sequence & 0xFFFF)
+    checksum = icmp_checksum(header + payload)
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, identifier & 0xFFFF, sequence & 0xFFFF)
+    return header + payload
+
+
+def parse_echo_reply(packet: bytes, has_ip_header: bool) -> Optional[Tuple[int, int]]:
+    """
+    Extract (identifier, sequence) from an ICMP echo reply
+
+    Args:
+        packet: Data returned by recvfrom()
+        has_ip_header: True for raw sockets, which deliver the IPv4 header too
+
+    Returns:
+        (identifier, sequence) for echo replies, None for anything else
+    """
+    offset = 0
+    if has_ip_header:
+        if not packet:
+            return None
+        offset = (packet[0] & 0x0F) * 4
+    if len(packet) < offset + 8:
+        return None
+    icmp_type, _code, _checksum, identifier, sequence = struct.unpack_from('!BBHHH', packet, offset)
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return identifier, sequence
+
+
+class SubprocessPingBackend:
+    """Ping backend that runs the operating system's ping command once per probe"""
+
+    name = 'subprocess'
+    multiplexed = False
+
+    def __init__(self, timeout: float, is_windows: bool = None, pacer=None):
+        self.timeout = timeout
+        self.is_windows = platform.system().lower() == "windows" if is_windows is None else is_windows
+        self.pacer = pacer  # Optional ProbePacer consulted before every probe
+        self.timings = None  # Optional metrics.Timings receiving 'ping_exec' and 'ping_wait' durations
+
+    def run_command(self, command: List[str], timeout: float) -> Optional[Tuple[int, str]]:
+        """
+        Run a ping command, timing process start-up and the wait for it separately
+
+        Returns:
+            (return code, stdout), or None if the command did not finish within timeout
+        """
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        started = time.perf_counter()
+        try:
+            stdout, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return None
+        finally:
+            if self.timings is not None:
+                self.timings.observe('ping_exec', started - start)
+                self.timings.observe('ping_wait', time.perf_counter() - started)
+        return process.returncode, stdout
+
+    def build_command(self, ip_address: str) -> List[str]:
+        """Return the ping command line for one probe of ip_address"""
+        if self.is_windows:
+            # Windows ping command - use default timeout (4000ms) to match standard ping behavior
+            # -n 1 = send 1 packet, -w 4000 = wait 4000ms (4 seconds) for reply
+            command = ['ping', '-n', '1', '-w', '4000', ip_address]
+        else:
+            # Linux/Unix ping command
+            command = ['ping', '-c', '1', '-W', str(self.timeout), ip_address]
+        return command
+
+    def build_burst_command(self, ip_address: str, count: int, spacing: float,
+                            reply_timeout: float = None) -> List[str]:
+        """Return the ping command line for a burst of count packets to ip_address"""
+        if reply_timeout is None:
+            reply_timeout = self.timeout
+        if self.is_windows:
+            # Windows ping has no interval option; packets go out about 1 second apart
+            return ['ping', '-n', str(count), '-w', str(int(reply_timeout * 1000)), ip_address]
+        if hasattr(os, 'geteuid') and os.geteuid() != 0:
+            spacing = max(spacing, UNPRIVILEGED_MIN_SPACING)
+        # -W takes whole seconds on older iputils
+        return ['ping', '-c', str(count), '-i', f"{spacing:g}", '-W', str(max(1, math.ceil(reply_timeout))),
+                ip_address]
+
+    def burst(self, ip_address: str, count: int, spacing: float,
+              reply_timeout: float = None) -> List[Optional[float]]:
+        """
+        Send a burst of count packets to one device
+
+        Args:
+            ip_address: Target to ping
+            count: Packets to send
+            spacing: Seconds between packets (the Windows command always uses 1)
+            reply_timeout: Seconds to wait for each reply (default: the backend timeout)
+
+        Returns:
+            count entries: round-trip time in seconds, or None for a lost packet
+        """
+        command = self.build_burst_command(ip_address, count, spacing, reply_timeout)
+        if self.pacer is not None:
+            self.pacer.wait(ip_address, count)
+        result = self.run_command(
+            command, self.timeout + count * max(spacing, 1 if self.is_windows else UNPRIVILEGED_MIN_SPACING) + 2)
+        if result is None:
+            return [None] * count
+        # ping exits non-zero when any packet is lost, so parse the replies regardless
+        return parse_ping_burst(result[1], count)
+
+    def ping(self, ip_address: str) -> Optional[float]:
+        """
+        Ping a single device
+
+        Returns:
+            Round-trip time in seconds, RTT_UNKNOWN if the device answered but
+            the output had no round-trip time, or None if it did not answer
+        """
+        command = self.build_command(ip_address)
+        if self.pacer is not None:
+            self.pacer.wait(ip_address)
+        result = self.run_command(command, self.timeout + 2)
+        if result is None or result[0] != 0:
+            return None
+        # Only the RTT reported by ping counts; the process's run time includes fork/exec
+        rtt = parse_ping_rtt(result[1])
+        return rtt if rtt is not None else RTT_UNKNOWN
+
+    def close(self):
+        pass
+
+
+class IcmpPingBackend:
+    """
+    In-process ICMP echo backend
+
+    Prefers an unprivileged datagram ICMP socket (Linux with a suitable
+    net.ipv4.ping_group_range, macOS) and falls back to a raw socket, which
+    needs root/Administrator. ping() opens a fresh socket per probe so
+    concurrent callers never steal each other's replies; ping_many() serves a
+    whole round of targets from one long-lived socket.
+    """
+
+    name = 'icmp'
+    multiplexed = True
+
+    def __init__(self, timeout: float, payload_size: int = DEFAULT_PAYLOAD_SIZE, pacer=None):
+        self.timeout = timeout
+        self.pacer = pacer  # Optional ProbePacer consulted before every echo request
+        self.timings = None  # Optional metrics.Timings receiving 'ping_send' and 'ping_wait' durations
+        self.payload = bytes(i & 0xFF for i in range(payload_size))
+        self._sequence = itertools.count(1)
+        self._sequence_lock = threading.Lock()
+        self.identifier = os.getpid() & 0xFFFF
+
+        # Probe once so an unusable backend is reported at construction time
+        sock, self.socket_type = self._open_socket()
+        sock.close()
+
+        # Long-lived socket used by ping_many(); opened on first use
+        self._shared_socket = None
+        self._shared_lock = threading.Lock()
+
+    @staticmethod
+    def _open_socket() -> Tuple[socket.socket, int]:
+        """Open an ICMP socket, trying the unprivileged datagram type first"""
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), socket.SOCK_DGRAM
+        except (OSError, AttributeError):
+            pass
+        return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), socket.SOCK_RAW
+
+    def next_sequence(self) -> int:
+        with self._sequence_lock:
+            return next(self._sequence) & 0xFFFF
+
+    def ping(self, ip_address: str) -> Optional[float]:
+        """
+        Send one echo request and wait for the matching reply
+
+        Returns:
+            Round-trip time in seconds, or None on timeout
+        """
+        sock = socket.socket(socket.AF_INET, self.socket_type, socket.IPPROTO_ICMP)
+        sent_at = None
+        try:
+            sequence = self.next_sequence()
+            # Datagram ICMP sockets have their identifier rewritten by the kernel,
+            # which also demultiplexes replies per socket, so only raw sockets
+            # need the identifier checked
+            raw = self.socket_type == socket.SOCK_RAW
+            identifier = (self.identifier + threading.get_ident()) & 0xFFFF
+            packet = build_echo_request(identifier, sequence, self.payload)
+            if self.pacer is not None:
+                self.pacer.wait(ip_address)
+
+            sent_at = time.perf_counter()
+            deadline = sent_at + self.timeout
+            sock.sendto(packet, (ip_address, 0))
+
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                readable, _, _ = select.select([sock], [], [], remaining)
+                if not readable:
+                    return None
+                data, address = sock.recvfrom(2048)
+                received_at = time.perf_counter()
+                if address[0] != ip_address:
+                    continue
+                reply = parse_echo_reply(data, has_ip_header=raw)
+                if reply is None:
+                    continue
+                reply_identifier, reply_sequence = reply
+                if reply_sequence != sequence or (raw and reply_identifier != identifier):
+                    continue
+                return received_at - sent_at
+        finally:
+            sock.close()
+            if self.timings is not None and sent_at is not None:
+                self.timings.observe('ping_wait', time.perf_counter() - sent_at)
+
+    def burst(self, ip_address: str, count: int, spacing: float,
+              reply_timeout: float = None) -> List[Optional[float]]:
+        """
+        Send a burst of count packets to one device (see burst_many())
+
+        Returns:
+            count entries: round-trip time in seconds, or None for a lost packet
+        """
+        return self.burst_many([ip_address], count, spacing, reply_timeout)[ip_address]
+
+    def _open_multiplex_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, self.socket_type, socket.IPPROTO_ICMP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MULTIPLEX_RCVBUF)
+        except OSError:
+            pass
+        sock.setblocking(False)
+        return sock
+
+    def _get_shared_socket(self) -> socket.socket:
+        if self._shared_socket is None:
+            self._shared_socket = self._open_multiplex_socket()
+        return self._shared_socket
+
+    def ping_many(self, ip_addresses: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Ping every target once from a single socket
+
+        All echo requests are sent up front, then one selector loop collects
+        the replies and matches them by source address and sequence number
+        until every target has answered or the timeout expires.
+
+        Args:
+            ip_addresses: Targets to probe in this round
+
+        Returns:
+            {ip_address: round-trip time in seconds, or None on timeout}
+        """
+        results = {ip: None for ip in ip_addresses}
+        if not results:
+            return results
+        return self._run_round(self._ping_round, results)
+
+    def burst_many(self, ip_addresses: Iterable[str], count: int, spacing: float,
+                   reply_timeout: float = None) -> Dict[str, List[Optional[float]]]:
+        """
+        Send a burst of count echo requests to every target from a single socket
+
+        Each of the count rounds sends one request to every target; rounds
+        start spacing seconds apart and replies are collected in between, so
+        a round of hundreds of targets costs (count - 1) * spacing plus the
+        final reply wait, not count times the timeout.
+
+        Args:
+            ip_addresses: Targets to probe
+            count: Packets per target
+            spacing: Seconds between the starts of consecutive rounds
+            reply_timeout: Seconds to wait for replies after the last round
+                           (default: the backend timeout)
+
+        Returns:
+            {ip_address: count entries of round-trip time in seconds, or None for a lost packet}
+        """
+        targets = list(dict.fromkeys(ip_addresses))
+        if not targets:
+            return {}
+        return self._run_round(self._burst_round, targets, count, spacing,
+                               self.timeout if reply_timeout is None else reply_timeout)
+
+    def _run_round(self, round_function, *args):
+        """Run a multiplexed round on the shared socket, or a private one if it is busy"""
+        if self._shared_lock.acquire(blocking=False):
+            try:
+                return round_function(self._get_shared_socket(), *args)
+            finally:
+                self._shared_lock.release()
+
+        # Another round is still collecting replies (e.g. overlapping per-device
+        # schedules): serve this one from a short-lived socket of its own.
+        # Sequence numbers are unique across rounds, so neither socket can
+        # claim the other's replies.
+        sock = self._open_multiplex_socket()
+        try:
+            return round_function(sock, *args)
+        finally:
+            sock.close()
+
+    def _send_requests(self, sock: socket.socket, targets: Iterable[str],
+                       pending: Dict[Tuple[str, int], float], replies: dict, by_sequence: bool) -> Dict[str, int]:
+        """Send one echo request to every target; returns {ip: sequence} of those sent"""
+        raw = self.socket_type == socket.SOCK_RAW
+        identifier = self.identifier
+        pacer = self.pacer
+        if pacer is not None:
+            targets = pacer.interleave(targets)
+        sequences = {}
+        for sent, ip_address in enumerate(targets, 1):
+            sequence = self.next_sequence()
+            packet = build_echo_request(identifier, sequence, self.payload)
+            if pacer is not None:
+                # Keep collecting replies while the pacer holds this request back
+                send_at = time.perf_counter() + pacer.reserve(ip_address)
+                while True:
+                    remaining = send_at - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    if select.select([sock], [], [], remaining)[0]:
+                        self._drain_replies(sock, raw, identifier, pending, replies, by_sequence)
+            while True:
+                try:
+                    sock.sendto(packet, (ip_address, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    # Send buffer full: drain replies while waiting for room
+                    self._drain_replies(sock, raw, identifier, pending, replies, by_sequence)
+                    select.select([], [sock], [], 0.01)
+                except OSError as e:
+                    # Unroutable or invalid target: report as unreachable
+                    print(f"Error pinging {ip_address}: {e}")
+                    sequence = None
+                    break
+            if sequence is not None:
+                pending[(ip_address, sequence)] = time.perf_counter()
+                sequences[ip_address] = sequence
+                # Collect early replies so they don't overflow the receive buffer
+                if sent % DRAIN_EVERY == 0:
+                    self._drain_replies(sock, raw, identifier, pending, replies, by_sequence)
+        return sequences
+
+    def _collect_replies(self, selector: selectors.BaseSelector, sock: socket.socket, deadline: float,
+                         pending: Dict[Tuple[str, int], float], replies: dict, by_sequence: bool):
+        """Record replies until every request is answered or the deadline passes"""
+        raw = self.socket_type == socket.SOCK_RAW
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            if selector.select(remaining):
+                self._drain_replies(sock, raw, self.identifier, pending, replies, by_sequence)
+
+    def _ping_round(self, sock: socket.socket, results: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        pending = {}  # (ip, sequence) -> send time
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            start = time.perf_counter()
+            self._send_requests(sock, results, pending, results, False)
+            sent = time.perf_counter()
+            self._collect_replies(selector, sock, sent + self.timeout, pending, results, False)
+            if self.timings is not None:
+                self.timings.observe('ping_send', sent - start)
+                self.timings.observe('ping_wait', time.perf_counter() - sent)
+
+        return results
+
+    def _burst_round(self, sock: socket.socket, targets: List[str], count: int, spacing: float,
+                     reply_timeout: float) -> Dict[str, List[Optional[float]]]:
+        pending = {}  # (ip, sequence) -> send time
+        replies = {}  # (ip, sequence) -> round-trip time
+        sent = []  # per round: {ip: sequence}
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            burst_start = time.perf_counter()
+            for round_number in range(count):
+                round_start = time.perf_counter()
+                sent.append(self._send_requests(sock, targets, pending, replies, True))
+                if self.timings is not None:
+                    self.timings.observe('ping_send', time.perf_counter() - round_start)
+                if round_number < count - 1:
+                    # Collect replies of earlier rounds while waiting for the next one
+                    self._collect_replies(selector, sock, round_start + spacing, pending, replies, True)
+                    delay = round_start + spacing - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            self._collect_replies(selector, sock, time.perf_counter() + reply_timeout, pending, replies, True)
+            if self.timings is not None:
+                self.timings.observe('ping_wait', time.perf_counter() - burst_start)
+
+        return {ip: [replies.get((ip, sequences.get(ip))) for sequences in sent] for ip in targets}
+
+    @staticmethod
+    def _drain_replies(sock: socket.socket, raw: bool, identifier: int,
+                       pending: Dict[Tuple[str, int], float], results: dict, by_sequence: bool = False):
+        """
+        Read every queued reply from a non-blocking socket and record matches
+
+        Round-trip times are stored in results by ip, or by (ip, sequence)
+        when by_sequence is set (several requests per target in flight)
+        """
+        while True:
+            try:
+                data, address = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            received_at = time.perf_counter()
+            reply = parse_echo_reply(data, has_ip_header=raw)
+            if reply is None:
+                continue
+            reply_identifier, reply_sequence = reply
+            if raw and reply_identifier != identifier:
+                continue
+            key = (address[0], reply_sequence)
+            sent_at = pending.pop(key, None)
+            if sent_at is not None:
+                results[key if by_sequence else address[0]] = received_at - sent_at
+
+    def close(self):
+        with self._shared_lock:
+            if self._shared_socket is not None:
+                self._shared_socket.close()
+                self._shared_socket = None
+
+
+class AsyncIcmpPinger:
+    """
+    asyncio front end for IcmpPingBackend
+
+    One non-blocking socket is registered with the event loop; each ping()
+    awaits a future that the reader callback resolves when the reply with the
+    matching source address and sequence number arrives. Requires a selector
+    based event loop (add_reader is not available on the Windows proactor loop).
+    """
+
+    def __init__(self, backend: IcmpPingBackend, loop: asyncio.AbstractEventLoop = None):
+        self.backend = backend
+        self.loop = loop or asyncio.get_running_loop()
+        self.raw = backend.socket_type == socket.SOCK_RAW
+        self._waiters = {}  # (ip, sequence) -> future resolved with the receive time
+
+        self.sock = backend._open_multiplex_socket()
+        try:
+            self.loop.add_reader(self.sock.fileno(), self._on_readable)
+        except NotImplementedError:
+            self.sock.close()
+            raise
+
+    async def ping(self, ip_address: str, timeout: float = None) -> Optional[float]:
+        """
+        Send one echo request and await the matching reply
+
+        Args:
+            ip_address: Target to ping
+            timeout: Seconds to wait for the reply (default: the backend timeout)
+
+        Returns:
+            Round-trip time in seconds, or None on timeout
+        """
+        sequence = self.backend.next_sequence()
+        packet = build_echo_request(self.backend.identifier, sequence, self.backend.payload)
+        key = (ip_address, sequence)
+        if self.backend.pacer is not None:
+            await self.backend.pacer.async_wait(ip_address)
+        future = self.loop.create_future()
+        self._waiters[key] = future
+        try:
+            while True:
+                try:
+                    sent_at = time.perf_counter()
+                    self.sock.sendto(packet, (ip_address, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    await asyncio.sleep(0.001)
+            received_at = await asyncio.wait_for(future, self.backend.timeout if timeout is None else timeout)
+            return received_at - sent_at
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._waiters.pop(key, None)
+
+    async def burst(self, ip_address: str, count: int, spacing: float,
+                    reply_timeout: float = None) -> List[Optional[float]]:
+        """
+        Send count echo requests spacing seconds apart and await their replies
+
+        Every packet may be answered until reply_timeout (default: the backend
+        timeout) after the last one was sent, as in IcmpPingBackend.burst_many().
+
+        Returns:
+            count entries: round-trip time in seconds, or None for a lost packet
+        """
+        if reply_timeout is None:
+            reply_timeout = self.backend.timeout
+
+        async def delayed_ping(index):
+            await asyncio.sleep(index * spacing)
+            return await self.ping(ip_address, reply_timeout + (count - 1 - index) * spacing)
+
+        return list(await asyncio.gather(*(delayed_ping(index) for index in range(count))))
+
+    def _on_readable(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            received_at = time.perf_counter()
+            reply = parse_echo_reply(data, has_ip_header=self.raw)
+            if reply is None:
+                continue
+            reply_identifier, reply_sequence = reply
+            if self.raw and reply_identifier != self.backend.identifier:
+                continue
+            future = self._waiters.get((address[0], reply_sequence))
+            if future is not None and not future.done():
+                future.set_result(received_at)
+
+    def close(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.sock.close()
+
+
+def create_ping_backend(name: str, timeout: float, is_windows: bool = None, pacer=None):
+    """
+    Create the configured ping backend
+
+    Args:
+        name: "icmp", "subprocess" or "auto". "auto" uses the in-process ICMP
+              engine where an ICMP socket can be opened (not on Windows, where
+              raw sockets are unreliable) and the system ping command otherwise
+        timeout: Ping timeout in seconds
+        is_windows: Override OS detection
+        pacer: Optional ProbePacer that rate-limits outgoing probes
+
+    Returns:
+        Backend object with ping(ip_address) -> Optional[float]
+    """
+    if is_windows is None:
+        is_windows = platform.system().lower() == "windows"
+    name = (name or 'auto').lower()
+
+    if name == 'subprocess':
+        return SubprocessPingBackend(timeout, is_windows, pacer)
+    if name == 'icmp':
+        return IcmpPingBackend(timeout, pacer=pacer)
+    if name != 'auto':
+        raise ValueError(f"Unknown ping backend: {name}")
+
+    if not is_windows:
+        try:
+            return IcmpPingBackend(timeout, pacer=pacer)
+        except OSError as e:
+            print(f"⚠️  In-process ICMP unavailable ({e}); falling back to system ping command")
+    return SubprocessPingBackend(timeout, is_windows, pacer)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Streaming latency statistics for the Network Ping Monitor
+Per-device RTT and packet-loss summaries in constant memory: EWMA, min/max
+and p50/p95/p99 from a DDSketch-style logarithmic histogram
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+class QuantileSketch:
+    """
+    Bounded-memory quantile sketch (DDSketch with a collapsing lowest bucket)
+
+    Values are counted in logarithmic buckets so every quantile estimate is
+    within relative_accuracy of a real sample value. At most max_buckets
+    buckets are kept; beyond that the lowest buckets are merged, which only
+    costs accuracy on the low tail, never on p95/p99.
+    """
+
+    __slots__ = ('relative_accuracy', 'max_buckets', 'log_gamma', 'min_value', 'buckets', 'zero_count', 'count')
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 256, min_value: float = 1e-3):
+        """
+        Args:
+            relative_accuracy: Relative error bound of quantile estimates
+            max_buckets: Most buckets kept (memory bound)
+            min_value: Values at or below this are counted as zero
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(gamma)
+        self.min_value = min_value
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Merge the two lowest buckets so the bucket count stays bounded"""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None if nothing was added"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+                return 2 * math.exp(index * self.log_gamma) / (1 + math.exp(self.log_gamma))
+        return 2 * math.exp(max(self.buckets) * self.log_gamma) / (1 + math.exp(self.log_gamma))
+
+    def clear(self):
+        self.buckets.clear()
+        self.zero_count = 0
+        self.count = 0
+
+
+class LatencyStats:
+    """
+    RTT and loss statistics for one device
+
+    The EWMA spans the whole run; min, max, loss and the quantile sketch
+    cover the current period and are cleared by reset_period() after they
+    are logged. Memory is constant however long the service runs.
+    """
+
+    __slots__ = ('alpha', 'ewma', 'last', 'period_min', 'period_max', 'period_sent', 'period_lost',
+                 'total_sent', 'total_lost', 'sketch')
+
+    def __init__(self, alpha: float = 0.1, max_buckets: int = 256):
+        """
+        Args:
+            alpha: EWMA smoothing factor (weight of the newest sample)
+            max_buckets: Quantile sketch bucket limit
+        """
+        self.alpha = alpha
+        self.ewma = None
+        self.last = None
+        self.period_min = None
+        self.period_max = None
+        self.period_sent = 0
+        self.period_lost = 0
+        self.total_sent = 0
+        self.total_lost = 0
+        self.sketch = QuantileSketch(max_buckets=max_buckets)
+
+    def add(self, rtt_ms: Optional[float]):
+        """Record one probe: its RTT in milliseconds, or None if it was lost"""
+        self.period_sent += 1
+        self.total_sent += 1
+        if rtt_ms is None:
+            self.period_lost += 1
+            self.total_lost += 1
+            return
+        self.last = rtt_ms
+        self.ewma = rtt_ms if self.ewma is None else self.ewma + self.alpha * (rtt_ms - self.ewma)
+        if self.period_min is None or rtt_ms < self.period_min:
+            self.period_min = rtt_ms
+        if self.period_max is None or rtt_ms > self.period_max:
+            self.period_max = rtt_ms
+        self.sketch.add(rtt_ms)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Current values; RTTs in milliseconds, loss as a percentage of the period's probes"""
+        return {
+            'last': self.last,
+            'ewma': self.ewma,
+            'min': self.period_min,
+            'max': self.period_max,
+            'p50': self.sketch.quantile(0.50),
+            'p95': self.sketch.quantile(0.95),
+            'p99': self.sketch.quantile(0.99),
+            'loss_pct': 100.0 * self.period_lost / self.period_sent if self.period_sent else None,
+            'probes': self.period_sent,
+        }
+
+    def summary(self) -> str:
+        """One-line summary for the log notes column"""
+        snapshot = self.snapshot()
+        if not snapshot['probes']:
+            return "no probes this period"
+
+        def ms(value):
+            return '-' if value is None else f"{value:.2f}"
+
+        return (f"rtt ms ewma {ms(snapshot['ewma'])} min {ms(snapshot['min'])} max {ms(snapshot['max'])} "
+                f"p50 {ms(snapshot['p50'])} p95 {ms(snapshot['p95'])} p99 {ms(snapshot['p99'])}; "
+                f"loss {snapshot['loss_pct']:.1f}% of {snapshot['probes']} probes")
+
+    def reset_period(self):
+        self.period_min = None
+        self.period_max = None
+        self.period_sent = 0
+        self.period_lost = 0
+        self.sketch.clear()
+
+
+def burst_statistics(samples: List[Optional[float]]) -> Tuple[float, Optional[float], Optional[float]]:
+    """
+    Summarize one multi-packet burst probe
+
+    Args:
+        samples: Per-packet round-trip times, None for a lost packet
+
+    Returns:
+        (loss_ratio, median_rtt, jitter): loss as a fraction of the packets
+        sent; the median RTT and the jitter (mean absolute difference between
+        consecutive received RTTs, as in RFC 3550) in the samples' unit, None
+        when too few packets were answered
+    """
+    if not samples:
+        return 1.0, None, None
+    received = [rtt for rtt in samples if rtt is not None]
+    loss_ratio = 1 - len(received) / len(samples)
+    if not received:
+        return loss_ratio, None, None
+    ordered = sorted(received)
+    middle = len(ordered) // 2
+    median = ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+    jitter = None
+    if len(received) > 1:
+        jitter = sum(abs(b - a) for a, b in zip(received, received[1:])) / (len(received) - 1)
+    return loss_ratio, median, jitter
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Metrics for the Network Ping Monitor
+Hot-path timing histograms and an optional Prometheus/OpenMetrics text
+endpoint served from a background thread
+"""
+
+import bisect
+import http.server
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Upper bounds in seconds, from sub-millisecond pings to multi-second SMTP sessions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations in seconds
+
+    observe() takes no lock: under the GIL a concurrent increment can very
+    occasionally be lost, which is acceptable for monitoring and keeps the
+    ping path free of contention.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: above the largest bound
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), list(self.counts)):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile q (0..1), 0.0 when empty"""
+        cumulative = self.cumulative()
+        total = cumulative[-1][1]
+        if not total:
+            return 0.0
+        rank = q * total
+        for bound, seen in cumulative:
+            if seen >= rank:
+                return bound
+        return cumulative[-1][0]
+
+
+class Timings:
+    """Named histograms of hot-path durations"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, names: Iterable[str] = ()):
+        """
+        Args:
+            buckets: Histogram bucket upper bounds in seconds
+            names: Histograms to create up front (others are created on first use)
+        """
+        self.buckets = tuple(buckets)
+        self.histograms = {name: Histogram(self.buckets) for name in names}
+        self.lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def items(self) -> List[Tuple[str, Histogram]]:
+        return sorted(self.histograms.items())
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_sample(name: str, value: float, labels: Dict[str, object] = None) -> str:
+    """One exposition line: name{label="value",...} value"""
+    if labels:
+        rendered = ','.join(f'{key}="{escape_label(label)}"' for key, label in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if isinstance(value, bool):
+        value = int(value)
+    if value == float('inf'):
+        return f"{name} +Inf"
+    return f"{name} {value!r}" if isinstance(value, float) else f"{name} {value}"
+
+
+def render_histogram(name: str, histogram: Histogram, help_text: str) -> List[str]:
+    """Exposition lines (HELP, TYPE, buckets, sum, count) for a histogram"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for bound, count in histogram.cumulative():
+        lines.append(format_sample(f"{name}_bucket", count, {'le': '+Inf' if bound == float('inf') else f"{bound:g}"}))
+    lines.append(format_sample(f"{name}_sum", histogram.sum))
+    lines.append(format_sample(f"{name}_count", histogram.count))
+    return lines
+
+
+class MetricsServer:
+    """
+    HTTP endpoint serving GET /metrics from a daemon thread
+
+    render() is called on the server thread for every scrape and must only
+    read in-memory state.
+    """
+
+    def __init__(self, render: Callable[[], str], host: str = '127.0.0.1', port: int = 9108):
+        """
+        Args:
+            render: Returns the exposition text
+            host: Address to listen on
+            port: TCP port to listen on (0 picks a free port)
+        """
+        self.render = render
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                try:
+                    body = server.render().encode('utf-8')
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the console
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        self.thread.start()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.httpd.shutdown()
+        self.httpd.server_close()
@@ -5,19 +5,99 @@ Monitors multiple network devices and logs outages to CSV file
 Sends email alerts for outages longer than specified threshold
 """
 
+import argparse
+import array
+import asyncio
+import atexit
 import subprocess
 import time
-import csv
 import datetime
+import glob
 import threading
 import os
 import sys
-import smtplib
 import traceback
 from email.message import EmailMessage
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import platform
 from config import *
+from adaptive_interval import AdaptiveIntervalController
+from device_state import DeviceStateTable, OUTAGE_START, PING_FAILED
+from alert_dispatcher import AlertCoalescer, AlertDispatcher, AlertRecord
+from event_db import SqliteEventStore
+from event_log import CsvEventWriter, EventLogThread
+from event_store import BinaryEventStore
+from icmp_ping import (RTT_UNKNOWN, AsyncIcmpPinger, SubprocessPingBackend, create_ping_backend, parse_ping_burst,
+                       parse_ping_rtt)
+from latency_stats import LatencyStats, burst_statistics
+from metrics import MetricsServer, Timings, format_sample, render_histogram
+from probe_pacer import ProbePacer
+from profiling import ProfileReporter, SamplingProfiler
+from probe_scheduler import ProbeScheduler
+from smtp_pool import SmtpConnectionPool
+from state_checkpoint import StateCheckpointer, restore_checkpoint
+from topology import DeviceTopology
+from worker_pool import ProbeWorkerPool
+
+# Settings added after the original config.py layout. Older config files (for
+# example those generated by setup_email.py) may not define them.
+_SETTING_DEFAULTS = {
+    'PING_BACKEND': 'auto',
+    'PING_MULTIPLEX': True,
+    'MONITOR_MODE': 'threaded',
+    'ASYNC_MAX_SUBPROCESSES': 256,
+    'WORKER_POOL_SIZE': 32,
+    'SWEEP_WORKERS': 256,
+    'SCHEDULING_MODE': 'cycle',
+    'DEVICE_INTERVALS': {},
+    'SCHEDULE_JITTER': 0.1,
+    'CSV_FLUSH_ROWS': 100,
+    'CSV_FLUSH_INTERVAL': 1.0,
+    'CSV_FSYNC': 'never',
+    'LOG_QUEUE_SIZE': 10000,
+    'LOG_QUEUE_BLOCK_TIMEOUT': 0.1,
+    'LOG_ROTATE_MB': 100,
+    'LOG_ROTATE_DAILY': True,
+    'LOG_COMPRESSION': 'gzip',
+    'LOG_RETAIN_FILES': 30,
+    'BINARY_EVENT_LOG': False,
+    'CSV_LOG_ENABLED': True,
+    'EVENT_DATABASE': None,
+    'ALERT_OUTBOX_DIRECTORY': 'outbox',
+    'ALERT_MAX_RETRIES': 5,
+    'ALERT_RETRY_BACKOFF': 30,
+    'SMTP_POOL_SIZE': 2,
+    'SMTP_KEEPALIVE_INTERVAL': 30,
+    'SMTP_IDLE_TIMEOUT': 300,
+    'ALERT_DIGEST_WINDOW': 30,
+    'ALERT_RATE_LIMIT': 20,
+    'DEVICE_PARENTS': {},
+    'SUPPRESSED_PROBE_INTERVAL': 30,
+    'LATENCY_EWMA_ALPHA': 0.1,
+    'BURST_COUNT': 1,
+    'BURST_SPACING': 0.1,
+    'BURST_REPLY_TIMEOUT': 0.5,
+    'BURST_MAX_LOSS': 0.5,
+    'BURST_MAX_JITTER_MS': None,
+    'DEVICE_BURST_THRESHOLDS': {},
+    'ADAPTIVE_INTERVALS': False,
+    'ADAPTIVE_MAX_INTERVAL': 60,
+    'ADAPTIVE_BACKOFF': 1.5,
+    'ADAPTIVE_STABLE_PROBES': 10,
+    'ADAPTIVE_MAX_RTTVAR_MS': 50,
+    'PROBE_BUDGET': None,
+    'PROBE_RATE_LIMIT': None,
+    'PROBE_SUBNET_RATE_LIMIT': None,
+    'PROBE_SUBNET_PREFIX': 24,
+    'PROBE_RATE_BURST': 1,
+    'METRICS_PORT': None,
+    'METRICS_HOST': '127.0.0.1',
+    'STATE_CHECKPOINT': 'device_state.ckpt',
+    'STATE_CHECKPOINT_INTERVAL': 10,
+    'STATE_CHECKPOINT_MAX_AGE': 3600,
+}
+for _name, _value in _SETTING_DEFAULTS.items():
+    globals().setdefault(_name, _value)
 
 # Single-instance guard (cross-platform)
 import tempfile
@@ -101,10 +181,41 @@ class PingMonitor:
         self.ping_interval = ping_interval
         self.timeout = timeout
         self.running = False
-        self.device_status = {ip: True for ip in devices.keys()}  # True = online, False = offline
-        self.last_status_change = {ip: datetime.datetime.now() for ip in devices.keys()}
-        self.failed_ping_count = {ip: 0 for ip in devices.keys()}  # Track consecutive failed pings
-        self.email_sent_for_outage = {ip: False for ip in devices.keys()}  # Track if email was sent for current outage
+        # Status, consecutive failures, email-sent flags and outage counts per device, in typed arrays
+        self.device_state = DeviceStateTable(devices.keys())
+        self.latency_stats = {ip: LatencyStats(LATENCY_EWMA_ALPHA) for ip in devices.keys()}  # RTT/loss per device
+        
+        # Burst probes: BURST_COUNT packets per check, judged by loss ratio and jitter
+        self.burst_count = max(1, int(BURST_COUNT))
+        self.burst_thresholds = {}  # ip -> (max_loss, max_jitter_ms)
+        for ip in devices.keys():
+            overrides = DEVICE_BURST_THRESHOLDS.get(ip, {})
+            self.burst_thresholds[ip] = (overrides.get('max_loss', BURST_MAX_LOSS),
+                                         overrides.get('max_jitter_ms', BURST_MAX_JITTER_MS))
+        self.burst_notes = {}  # ip -> why the last burst counted as a failure
+        
+        # Adaptive cadence: stable devices back off towards ADAPTIVE_MAX_INTERVAL, failures
+        # and RTT variance snap them back. Devices with a DEVICE_INTERVALS entry keep theirs
+        self.adaptive_intervals = None
+        if ADAPTIVE_INTERVALS:
+            self.adaptive_intervals = AdaptiveIntervalController(
+                [ip for ip in devices.keys() if ip not in DEVICE_INTERVALS], ping_interval, ADAPTIVE_MAX_INTERVAL,
+                ADAPTIVE_BACKOFF, ADAPTIVE_STABLE_PROBES, ADAPTIVE_MAX_RTTVAR_MS, PROBE_BUDGET)
+        self.scheduler = None
+        
+        # Optional upstream topology: children of an unreachable parent are probed
+        # less often and do not alert; the parent is logged once as the root cause
+        self.topology = DeviceTopology(DEVICE_PARENTS, devices.keys()) if DEVICE_PARENTS else None
+        self.root_causes_logged = set()  # Unreachable parents already logged as a root cause
+        self.root_cause_lock = threading.Lock()  # Children of one parent are checked on different threads
+        self.last_suppressed_probe = {}  # ip -> monotonic time of the last probe while suppressed
+        self.probes_skipped_upstream = 0
+        
+        # Hot-path timing histograms, exported on /metrics when METRICS_PORT is set and
+        # written to a file in --profile mode; None keeps the ping path untimed
+        self.timings = None
+        self.metrics_server = None
+        self.profile_reporter = None
         
         # CSV file setup - compute filename and ensure log directory exists before creating file
         timestamp_suffix = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -114,7 +225,7 @@ class PingMonitor:
         base_dir = os.path.dirname(os.path.abspath(__file__))
 
         # Create logs directory if specified and adjust filename (use base_dir to avoid running in System32)
-        if hasattr(globals(), 'LOG_DIRECTORY') and LOG_DIRECTORY:
+        if globals().get('LOG_DIRECTORY'):
             log_dir = os.path.join(base_dir, LOG_DIRECTORY)
             os.makedirs(log_dir, exist_ok=True)
             self.csv_filename = os.path.join(log_dir, filename)
@@ -124,58 +235,245 @@ class PingMonitor:
         # Create CSV file with headers if needed
         self.setup_csv_file()
         
+        # Warm restart: device state from the last checkpoint, if it is recent enough
+        self.checkpoint_filename = None
+        self.checkpointer = None
+        self.resumed_devices = []
+        if STATE_CHECKPOINT:
+            self.checkpoint_filename = os.path.join(os.path.dirname(self.csv_filename), STATE_CHECKPOINT)
+            self.restore_state()
+        
         # Determine ping command based on OS
         self.is_windows = platform.system().lower() == "windows"
+        # Optional pacer: probes leave at an even rate instead of all at once
+        self.probe_pacer = None
+        if PROBE_RATE_LIMIT or PROBE_SUBNET_RATE_LIMIT:
+            self.probe_pacer = ProbePacer(PROBE_RATE_LIMIT, PROBE_SUBNET_RATE_LIMIT, PROBE_SUBNET_PREFIX,
+                                          PROBE_RATE_BURST)
+        self.ping_backend = create_ping_backend(PING_BACKEND, self.timeout, self.is_windows, self.probe_pacer)
+        
+        # Long-lived workers for backends that ping one device per call
+        self.worker_pool = ProbeWorkerPool(WORKER_POOL_SIZE)
+        
+        # Alert emails are delivered by background threads over pooled SMTP sessions;
+        # checks only enqueue them
+        self.smtp_pool = SmtpConnectionPool(SMTP_SERVER, SMTP_PORT, EMAIL_FROM, EMAIL_PASSWORD, SMTP_USE_TLS,
+                                            SMTP_POOL_SIZE, SMTP_KEEPALIVE_INTERVAL, SMTP_IDLE_TIMEOUT)
+        outbox_dir = os.path.join(base_dir, ALERT_OUTBOX_DIRECTORY) if ALERT_OUTBOX_DIRECTORY else None
+        self.alert_dispatcher = AlertDispatcher(self.deliver_email, outbox_dir, ALERT_MAX_RETRIES, ALERT_RETRY_BACKOFF,
+                                                workers=SMTP_POOL_SIZE, on_result=self.log_alert_delivery)
+        # Alerts raised together (e.g. everything behind a failed switch) go out as one digest
+        self.alert_coalescer = AlertCoalescer(self.build_alert_email, self.alert_dispatcher,
+                                              ALERT_DIGEST_WINDOW, ALERT_RATE_LIMIT)
+        atexit.register(self.close_alerts)
+        
+        if METRICS_PORT is not None:
+            self.enable_timings()
     
-    def setup_csv_file(self):
-        """Create CSV file with headers"""
-        # Only create the file and write headers if it does not already exist or is empty
+    def enable_timings(self):
+        """Start timing the hot-path phases (ping, dispatch, state update, logging, email)"""
+        if self.timings is None:
+            self.timings = Timings(names=('cycle', 'ping_rtt', 'log_write', 'log_flush', 'email_send'))
+        self.event_log.timings = self.timings
+        if self.event_writer is not None:
+            self.event_writer.timings = self.timings
+        self.ping_backend.timings = self.timings
+        self.worker_pool.timings = self.timings
+    
+    def start_profiling(self, path: str, interval: float = 60.0, sample_seconds: float = 0):
+        """
+        Write per-phase timing tables to a file every interval
+        
+        Args:
+            path: Report file (appended to)
+            interval: Seconds between reports
+            sample_seconds: Also sample every thread's stack for this many seconds (0 = off)
+        """
+        self.enable_timings()
+        sampler = SamplingProfiler(sample_seconds) if sample_seconds > 0 else None
+        
+        def describe():
+            busy = f", worker queue {self.worker_pool.tasks.qsize()}" if self.worker_pool.threads else ""
+            return (f"devices {len(self.devices)}, interval {self.ping_interval}s, "
+                    f"backend {self.ping_backend.name}{busy}")
+        
+        self.profile_reporter = ProfileReporter(self.timings, path, interval, describe, sampler)
+        self.profile_reporter.start()
+        sampling = f", sampling stacks for {sample_seconds:g}s" if sampler is not None else ""
+        print(f"⏱️  Profiling: phase timings every {interval:g}s to {path}{sampling}")
+    
+    def close_profiling(self):
+        if self.profile_reporter is not None:
+            self.profile_reporter.close()
+            print(f"⏱️  Profile written to: {self.profile_reporter.path}")
+            self.profile_reporter = None
+    
+    def restore_state(self):
+        """Load device state from the checkpoint file, if there is a recent one"""
         try:
-            need_header = True
-            if os.path.exists(self.csv_filename) and os.path.getsize(self.csv_filename) > 0:
-                need_header = False
-
-            with open(self.csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                if need_header:
-                    writer.writerow([
-                        'Timestamp',
-                        'IP Address', 
-                        'Device Name',
-                        'Event Type',
-                        'Status',
-                        'Duration (minutes)',
-                        'Failed Ping Count',
-                        'Email Sent',
-                        'Notes'
-                    ])
+            restored, age = restore_checkpoint(self.checkpoint_filename, self.device_state, STATE_CHECKPOINT_MAX_AGE)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring state checkpoint {self.checkpoint_filename}: {e}")
+            return
+        if restored:
+            self.resumed_devices = restored
+            print(f"♻️  Restored state of {len(restored)}/{len(self.devices)} devices from a checkpoint "
+                  f"written {age:.0f}s ago")
+        elif age:
+            print(f"⚠️  State checkpoint is {age:.0f}s old (limit {STATE_CHECKPOINT_MAX_AGE}s); starting fresh")
+    
+    def log_resumed_devices(self) -> List[str]:
+        """
+        Log MONITOR_START rows for the devices restored from a checkpoint
+        
+        Restored devices are not pinged before monitoring starts; the first
+        cycle picks up any change since the checkpoint through the normal
+        transitions, with outage durations counted from the original start.
+        
+        Returns:
+            list: Devices that still need an initial status check
+        """
+        state = self.device_state
+        offline = 0
+        rows = []
+        for ip_address in self.resumed_devices:
+            notes = "Resumed from checkpoint"
+            if state.is_online(ip_address):
+                status = "ONLINE"
+            else:
+                status = "OFFLINE"
+                offline += 1
+                notes += f"; offline for {state.seconds_since_change(ip_address) / 60:.2f} minutes"
+            rows.append((ip_address, "MONITOR_START", status, 0, state.failed_count(ip_address), False, notes))
+        self.log_events(rows)
+        if self.resumed_devices:
+            print(f"♻️  Resumed {len(self.resumed_devices)} devices from the checkpoint ({offline} offline)")
+        resumed = set(self.resumed_devices)
+        return [ip_address for ip_address in self.devices.keys() if ip_address not in resumed]
+    
+    def start_checkpoints(self):
+        if self.checkpoint_filename is not None and self.checkpointer is None:
+            self.checkpointer = StateCheckpointer(self.device_state, self.checkpoint_filename,
+                                                  STATE_CHECKPOINT_INTERVAL)
+            self.checkpointer.start()
+    
+    def close_checkpoints(self):
+        """Stop periodic checkpoints and write a final one"""
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+            self.checkpointer = None
+    
+    def setup_csv_file(self):
+        """Open the event log sinks: the CSV writer (creating the file with headers if
+        needed) and the optional event database and binary log"""
+        self.event_writer = None
+        if CSV_LOG_ENABLED:
+            try:
+                is_new = not os.path.exists(self.csv_filename) or os.path.getsize(self.csv_filename) == 0
+                # Retention counts the rotated segments of earlier runs as well
+                segments = os.path.join(glob.escape(os.path.dirname(self.csv_filename)), 'ping_log_*.csv*')
+                self.event_writer = CsvEventWriter(self.csv_filename, CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL, CSV_FSYNC,
+                                                   background_flush=False,
+                                                   rotate_bytes=int(LOG_ROTATE_MB * 1024 * 1024),
+                                                   rotate_daily=LOG_ROTATE_DAILY,
+                                                   compression=LOG_COMPRESSION or None,
+                                                   retain=LOG_RETAIN_FILES, retain_glob=segments)
+                if is_new:
                     print(f"CSV log file created with header: {self.csv_filename}")
-        except Exception as e:
-            print(f"❌ Failed to create CSV log file {self.csv_filename}: {e}")
+            except Exception as e:
+                print(f"❌ Failed to create CSV log file {self.csv_filename}: {e}")
+        
+        # One writer thread owns the log sinks; ping workers only enqueue events
+        sinks = [self.event_writer] if self.event_writer is not None else []
+        self.database_filename = None
+        if EVENT_DATABASE:
+            self.database_filename = os.path.join(os.path.dirname(self.csv_filename), EVENT_DATABASE)
+            try:
+                sinks.append(SqliteEventStore(self.database_filename))
+            except Exception as e:
+                print(f"❌ Failed to open event database {self.database_filename}: {e}")
+                self.database_filename = None
+        self.binary_filename = None
+        if BINARY_EVENT_LOG:
+            self.binary_filename = os.path.splitext(self.csv_filename)[0] + '.pmev'
+            try:
+                sinks.append(BinaryEventStore(self.binary_filename))
+            except Exception as e:
+                print(f"❌ Failed to open binary event log {self.binary_filename}: {e}")
+                self.binary_filename = None
+        self.event_log = EventLogThread(sinks, LOG_QUEUE_SIZE, LOG_QUEUE_BLOCK_TIMEOUT)
+        # Queued rows must reach the disk even if the process exits without stop_monitoring()
+        atexit.register(self.event_log.close)
+    
+    def close_event_log(self):
+        """Write queued events, flush buffered CSV rows and close the log file"""
+        self.event_log.close()
     
     def send_email_alert(self, ip_address: str, event_type: str, failed_count: int = 0, duration_minutes: float = 0):
         """
-        Send email alert for device outage or recovery
+        Queue an email alert for device outage or recovery
+        
+        The alert is emailed at once, or with the digest of the current window
+        if another alert went out less than ALERT_DIGEST_WINDOW seconds ago,
+        by the alert dispatcher, so a slow SMTP server never delays the ping loop.
         
         Args:
             ip_address: IP address of the device
             event_type: OUTAGE_ALERT or RECOVERY_ALERT
             failed_count: Number of consecutive failed pings
             duration_minutes: Duration of outage for recovery alerts
+            
+        Returns:
+            bool: True if the alert was queued for delivery; whether it was
+            delivered is logged later by log_alert_delivery()
         """
         if not EMAIL_ALERTS_ENABLED:
             return
             
         try:
-            device_name = self.devices.get(ip_address, "Unknown Device")
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            record = AlertRecord(datetime.datetime.now(), ip_address, self.devices.get(ip_address, "Unknown Device"),
+                                 event_type, failed_count, duration_minutes)
+            return self.alert_coalescer.submit(record, EMAIL_TO)
             
-            # Create message
-            msg = EmailMessage()
-            msg['From'] = EMAIL_FROM
-            msg['To'] = ', '.join(EMAIL_TO)
+        except Exception as e:
+            print(f"❌ Failed to queue email alert for {ip_address}: {e}")
+            return False
+    
+    def log_alert_delivery(self, alert, delivered: bool, detail: str):
+        """
+        Log an EMAIL_DELIVERED or EMAIL_FAILED row for every device an alert email covered
+        (called by the alert dispatcher once the email is sent or given up on)
+        
+        Args:
+            alert: alert_dispatcher.QueuedAlert that finished
+            delivered: Whether the email reached the SMTP server
+            detail: Attempts, and the error and outbox file of a failed email
+        """
+        event_type = "EMAIL_DELIVERED" if delivered else "EMAIL_FAILED"
+        digest = f" in a digest of {len(alert.records)} alerts" if len(alert.records) > 1 else ""
+        self.log_events([(record.ip_address, event_type, "OFFLINE" if record.event_type == "OUTAGE_ALERT" else "ONLINE",
+                          record.duration_minutes, record.failed_count, delivered,
+                          f"{record.event_type} email{digest} {detail}")
+                         for record in alert.records])
+    
+    def build_alert_email(self, records: List[AlertRecord], recipients: List[str]) -> EmailMessage:
+        """
+        Build the email for one alert, or a digest when several were raised together
+        
+        Args:
+            records: Alerts to include, in the order they were raised
+            recipients: Addresses for the To header
+        """
+        msg = EmailMessage()
+        msg['From'] = EMAIL_FROM
+        msg['To'] = ', '.join(recipients)
+        
+        if len(records) == 1:
+            record = records[0]
+            device_name, ip_address = record.device_name, record.ip_address
+            timestamp = record.timestamp.strftime('%Y-%m-%d %H:%M:%S')
             
-            if event_type == "OUTAGE_ALERT":
+            if record.event_type == "OUTAGE_ALERT":
                 msg['Subject'] = f"{EMAIL_SUBJECT_PREFIX} Device Outage - {device_name} ({ip_address})"
                 
                 body = f"""NETWORK DEVICE OUTAGE ALERT
@@ -183,16 +481,16 @@ class PingMonitor:
 Device: {device_name}
 IP Address: {ip_address}
 Alert Time: {timestamp}
-Failed Ping Count: {failed_count}
+Failed Ping Count: {record.failed_count}
 Threshold: {EMAIL_ALERT_THRESHOLD} failed pings
 
-The device has failed to respond to {failed_count} consecutive ping attempts.
+The device has failed to respond to {record.failed_count} consecutive ping attempts.
 Please check the device status and network connectivity.
 
 This alert was generated automatically by the Network Ping Monitor.
 """
             
-            elif event_type == "RECOVERY_ALERT":
+            else:
                 msg['Subject'] = f"{EMAIL_SUBJECT_PREFIX} Device Recovery - {device_name} ({ip_address})"
                 
                 body = f"""NETWORK DEVICE RECOVERY ALERT
@@ -200,7 +498,7 @@ This alert was generated automatically by the Network Ping Monitor.
 Device: {device_name}
 IP Address: {ip_address}
 Recovery Time: {timestamp}
-Outage Duration: {duration_minutes:.2f} minutes
+Outage Duration: {record.duration_minutes:.2f} minutes
 
 The device is now responding to ping requests and appears to be back online.
 
@@ -208,25 +506,240 @@ This recovery notification was generated automatically by the Network Ping Monit
 """
             
             msg.set_content(body)
+            return msg
+        
+        # Digest: one line per device, outages first
+        outages = [r for r in records if r.event_type == "OUTAGE_ALERT"]
+        recoveries = [r for r in records if r.event_type != "OUTAGE_ALERT"]
+        parts = []
+        if outages:
+            parts.append(f"{len(outages)} Device Outage{'s' if len(outages) != 1 else ''}")
+        if recoveries:
+            parts.append(f"{len(recoveries)} Recover{'ies' if len(recoveries) != 1 else 'y'}")
+        msg['Subject'] = f"{EMAIL_SUBJECT_PREFIX} {', '.join(parts)}"
+        
+        first = records[0].timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        last = records[-1].timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        lines = ["NETWORK DEVICE ALERT DIGEST", "",
+                 f"{len(records)} alerts between {first} and {last}", ""]
+        if outages:
+            lines.append(f"OUTAGES ({len(outages)}) - no response to {EMAIL_ALERT_THRESHOLD}+ consecutive pings:")
+            for r in outages:
+                lines.append(f"  {r.timestamp.strftime('%H:%M:%S')}  {r.device_name} ({r.ip_address}) - "
+                             f"{r.failed_count} failed pings")
+            lines.append("")
+        if recoveries:
+            lines.append(f"RECOVERIES ({len(recoveries)}):")
+            for r in recoveries:
+                lines.append(f"  {r.timestamp.strftime('%H:%M:%S')}  {r.device_name} ({r.ip_address}) - "
+                             f"back online after {r.duration_minutes:.2f} minutes")
+            lines.append("")
+        lines.append("This digest was generated automatically by the Network Ping Monitor.")
+        msg.set_content("\n".join(lines) + "\n")
+        return msg
+    
+    def deliver_email(self, msg: EmailMessage):
+        """
+        Send one alert message over a pooled SMTP session (called on the alert
+        dispatcher threads)
+        
+        Raises:
+            Exception: Any SMTP or network error, so the dispatcher can retry
+        """
+        if self.timings is None:
+            self.smtp_pool.send(msg)
+            return
+        start = time.perf_counter()
+        try:
+            self.smtp_pool.send(msg)
+        finally:
+            self.timings.observe('email_send', time.perf_counter() - start)
+    
+    def close_alerts(self):
+        """Send pending digests, deliver queued alerts (saving the rest to the outbox) and close SMTP sessions"""
+        self.alert_coalescer.close()
+        self.alert_dispatcher.close()
+        self.smtp_pool.close()
+    
+    def start_metrics_server(self):
+        """Serve /metrics on METRICS_HOST:METRICS_PORT from a background thread"""
+        if METRICS_PORT is None or self.metrics_server is not None:
+            return
+        try:
+            self.metrics_server = MetricsServer(self.render_metrics, METRICS_HOST, METRICS_PORT)
+        except OSError as e:
+            print(f"❌ Failed to start metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}")
+            return
+        self.metrics_server.start()
+        host, port = self.metrics_server.address
+        print(f"📈 Metrics: http://{host}:{port}/metrics")
+    
+    def close_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+            self.metrics_server = None
+    
+    def render_metrics(self) -> str:
+        """
+        Current state in the Prometheus text exposition format
+        
+        Runs on the metrics server thread and only reads in-memory state: the
+        per-device dicts, latency statistics, timing histograms and the
+        lock-free event log counters. Nothing on the ping path is locked.
+        """
+        lines = []
+        
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+        
+        labels = {ip: {'ip': ip, 'device': name} for ip, name in self.devices.items()}
+        state_rows = list(self.device_state.rows())
+        family('pingmon_device_up', 'gauge', 'Whether the device answered its last check (1) or is offline (0)')
+        for ip, status, _, _ in state_rows:
+            lines.append(format_sample('pingmon_device_up', status, labels[ip]))
+        family('pingmon_device_consecutive_failures', 'gauge', 'Consecutive failed pings')
+        for ip, _, count, _ in state_rows:
+            lines.append(format_sample('pingmon_device_consecutive_failures', count, labels[ip]))
+        family('pingmon_device_outages_total', 'counter', 'Outages started since the monitor started')
+        for ip, _, _, count in state_rows:
+            lines.append(format_sample('pingmon_device_outages_total', count, labels[ip]))
+        
+        stats_items = list(self.latency_stats.items())
+        family('pingmon_device_rtt_seconds', 'gauge', 'Round-trip time of the last answered ping')
+        for ip, stats in stats_items:
+            if stats.last is not None:
+                lines.append(format_sample('pingmon_device_rtt_seconds', stats.last / 1000, labels[ip]))
+        family('pingmon_device_rtt_ewma_seconds', 'gauge', 'Smoothed round-trip time')
+        for ip, stats in stats_items:
+            if stats.ewma is not None:
+                lines.append(format_sample('pingmon_device_rtt_ewma_seconds', stats.ewma / 1000, labels[ip]))
+        family('pingmon_device_probes_total', 'counter', 'Ping packets sent')
+        for ip, stats in stats_items:
+            lines.append(format_sample('pingmon_device_probes_total', stats.total_sent, labels[ip]))
+        family('pingmon_device_probes_lost_total', 'counter', 'Ping packets not answered')
+        for ip, stats in stats_items:
+            lines.append(format_sample('pingmon_device_probes_lost_total', stats.total_lost, labels[ip]))
+        
+        family('pingmon_devices', 'gauge', 'Monitored devices')
+        lines.append(format_sample('pingmon_devices', len(self.devices)))
+        
+        log_stats = self.event_log.stats()
+        family('pingmon_log_events_written_total', 'counter', 'Events written by the log writer thread')
+        lines.append(format_sample('pingmon_log_events_written_total', log_stats['written']))
+        family('pingmon_log_events_dropped_total', 'counter', 'Events dropped because the log queue stayed full')
+        lines.append(format_sample('pingmon_log_events_dropped_total', log_stats['dropped']))
+        family('pingmon_log_queue_depth', 'gauge', 'Events waiting for the log writer thread')
+        lines.append(format_sample('pingmon_log_queue_depth', log_stats['depth']))
+        
+        if self.timings is not None:
+            help_texts = {
+                'cycle': 'Duration of a monitoring cycle',
+                'ping_rtt': 'Round-trip time of answered ping packets',
+                'log_write': 'Time to write one event to the log sinks',
+                'log_flush': 'Time spent in the log sinks\' periodic flush',
+                'email_send': 'Time to send one alert email over SMTP',
+                'dispatch': 'Time a check waited in the worker pool queue',
+                'ping_exec': 'Time to start a ping command process',
+                'ping_send': 'Time to send the echo requests of a ping round',
+                'ping_wait': 'Time spent waiting for ping replies',
+                'state_update': 'Time to apply a ping result to the device state machine',
+                'state_batch': 'Time to apply a multiplexed round of ping results to the device state machine',
+                'log_header_check': 'Time to check an existing log file for its header',
+            }
+            for name, histogram in self.timings.items():
+                lines.extend(render_histogram(f"pingmon_{name}_seconds", histogram,
+                                              help_texts.get(name, f"Duration of {name}")))
+        return '\n'.join(lines) + '\n'
+    
+    def start_alert_dispatcher(self):
+        """Requeue alerts left undelivered by a previous run"""
+        if EMAIL_ALERTS_ENABLED:
+            pending = self.alert_dispatcher.load_outbox()
+            if pending:
+                print(f"📥 Retrying {pending} undelivered alert(s) from the outbox")
+    
+    def probe_device(self, ip_address: str):
+        """
+        Ping a single device and return its round-trip time
+        Uses the configured ping backend (in-process ICMP or the system ping command)
+        
+        Args:
+            ip_address: IP address to ping
             
-            # Send email
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                if SMTP_USE_TLS:
-                    server.starttls()
-                server.login(EMAIL_FROM, EMAIL_PASSWORD)
-                server.send_message(msg)
-            
-            print(f"📧 Email alert sent for {device_name} ({ip_address}) - {event_type}")
-            return True
+        Returns:
+            float: Round-trip time in seconds (RTT_UNKNOWN if the device answered but no time was
+                   reported), or None if the device did not answer
+        """
+        try:
+            return self.ping_backend.ping(ip_address)
+        except Exception as e:
+            print(f"Error pinging {ip_address}: {e}")
+            return None
+    
+    def probe_device_burst(self, ip_address: str):
+        """
+        Send a burst of BURST_COUNT packets to a single device
+        
+        Args:
+            ip_address: IP address to ping
             
+        Returns:
+            list: Round-trip time in seconds per packet, None for each lost packet
+        """
+        try:
+            return self.ping_backend.burst(ip_address, self.burst_count, BURST_SPACING, BURST_REPLY_TIMEOUT)
         except Exception as e:
-            print(f"❌ Failed to send email alert for {ip_address}: {e}")
-            return False
+            print(f"Error pinging {ip_address}: {e}")
+            return [None] * self.burst_count
+    
+    def evaluate_burst(self, ip_address: str, samples):
+        """
+        Decide whether a burst probe counts as a successful ping
+        
+        The device is up when at least one packet was answered, the loss ratio
+        is at most its max_loss threshold and the jitter is at most its
+        max_jitter_ms threshold (if one is set).
+        
+        Args:
+            ip_address: IP address that was probed
+            samples: Per-packet round-trip times in seconds, None for a lost packet
+            
+        Returns:
+            tuple: (is_online, median round-trip time in seconds or None)
+        """
+        loss_ratio, rtt, jitter = burst_statistics(samples)
+        max_loss, max_jitter_ms = self.burst_thresholds.get(ip_address, (BURST_MAX_LOSS, BURST_MAX_JITTER_MS))
+        jitter_ok = max_jitter_ms is None or jitter is None or jitter * 1000 <= max_jitter_ms
+        is_online = rtt is not None and loss_ratio <= max_loss and jitter_ok
+        if is_online:
+            self.burst_notes.pop(ip_address, None)
+        else:
+            lost = sum(1 for sample in samples if sample is None)
+            note = f"burst {lost}/{len(samples)} lost"
+            if jitter is not None:
+                note += f", jitter {jitter * 1000:.2f} ms"
+            self.burst_notes[ip_address] = note
+        return is_online, rtt
+    
+    def probe_once(self, ip_address: str):
+        """
+        Probe a device once, with a burst when BURST_COUNT > 1
+        
+        Returns:
+            tuple: (is_online, round-trip time in seconds or None, burst samples or None)
+        """
+        if self.burst_count > 1:
+            samples = self.probe_device_burst(ip_address)
+            return (*self.evaluate_burst(ip_address, samples), samples)
+        rtt = self.probe_device(ip_address)
+        if rtt is RTT_UNKNOWN:
+            return True, None, None  # Answered, but no round-trip time to record
+        return rtt is not None, rtt, None
     
     def ping_device(self, ip_address: str) -> bool:
         """
         Ping a single device and return True if successful
-        Uses default system ping behavior to match 'ping <ip>' command
         
         Args:
             ip_address: IP address to ping
@@ -234,29 +747,69 @@ This recovery notification was generated automatically by the Network Ping Monit
         Returns:
             bool: True if ping successful, False otherwise
         """
-        try:
-            if self.is_windows:
-                # Windows ping command - use default timeout (4000ms) to match standard ping behavior
-                # -n 1 = send 1 packet, -w 4000 = wait 4000ms (4 seconds) for reply
-                command = ['ping', '-n', '1', '-w', '4000', ip_address]
-            else:
-                # Linux/Unix ping command
-                command = ['ping', '-c', '1', '-W', str(self.timeout), ip_address]
-            
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout + 2
-            )
-            
-            return result.returncode == 0
-            
-        except subprocess.TimeoutExpired:
-            return False
-        except Exception as e:
-            print(f"Error pinging {ip_address}: {e}")
-            return False
+        return self.probe_device(ip_address) is not None
+    
+    def record_probe(self, ip_address: str, is_online: bool, rtt: float = None, samples=None):
+        """
+        Add a probe result to the device's latency statistics
+        
+        Args:
+            ip_address: IP address that was probed
+            is_online: Whether the probe was answered
+            rtt: Round-trip time in seconds, when known
+            samples: Per-packet round-trip times of a burst probe; each packet
+                     is recorded, so loss is counted per packet
+        """
+        stats = self.latency_stats.get(ip_address)
+        if stats is None:
+            return
+        if samples is not None:
+            for sample in samples:
+                stats.add(None if sample is None else sample * 1000)
+                if sample is not None and self.timings is not None:
+                    self.timings.observe('ping_rtt', sample)
+        elif not is_online:
+            stats.add(None)
+        elif rtt is not None:
+            stats.add(rtt * 1000)
+            if self.timings is not None:
+                self.timings.observe('ping_rtt', rtt)
+    
+    def record_probes(self, results):
+        """
+        record_probe() and the adaptive interval update for a whole round of results
+        
+        The statistics table and timings are looked up once per round, RTTs
+        are timed in one pass at the end and the interval controller takes
+        its lock once instead of once per device.
+        
+        Args:
+            results: (ip_address, is_online, rtt, burst samples or None) per device
+        """
+        latency_stats = self.latency_stats
+        rtts = []
+        for ip_address, is_online, rtt, samples in results:
+            stats = latency_stats.get(ip_address)
+            if stats is None:
+                continue
+            if samples is not None:
+                for sample in samples:
+                    if sample is None:
+                        stats.add(None)
+                    else:
+                        stats.add(sample * 1000)
+                        rtts.append(sample)
+            elif not is_online:
+                stats.add(None)
+            elif rtt is not None:
+                stats.add(rtt * 1000)
+                rtts.append(rtt)
+        if self.timings is not None:
+            for rtt in rtts:
+                self.timings.observe('ping_rtt', rtt)
+        if self.adaptive_intervals is not None:
+            self.adaptive_intervals.update_many((ip_address, is_online, rtt)
+                                                for ip_address, is_online, rtt, _ in results)
     
     def log_event(self, ip_address: str, event_type: str, status: str, duration_minutes: float = 0, 
                   failed_count: int = 0, email_sent: bool = False, notes: str = ""):
@@ -272,179 +825,559 @@ This recovery notification was generated automatically by the Network Ping Monit
             email_sent: Whether an email alert was sent
             notes: Additional notes
         """
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         device_name = self.devices.get(ip_address, "Unknown")
         
-        # Open file for append; if file is empty write header first (defensive)
-        # Ensure header is present (defensive check) before appending
-        try:
-            self.ensure_csv_header()
-
-            with open(self.csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow([
-                    timestamp,
-                    ip_address,
-                    device_name,
-                    event_type,
-                    status,
-                    f"{duration_minutes:.2f}",
-                    failed_count,
-                    email_sent,
-                    notes
-                ])
-        except Exception as e:
-            print(f"❌ Failed to write log event to {self.csv_filename}: {e}")
-
-    def ensure_csv_header(self):
-        """Check the CSV's first line and prepend header if missing."""
-        header = 'Timestamp'
-        try:
-            if not os.path.exists(self.csv_filename) or os.path.getsize(self.csv_filename) == 0:
-                # file missing or empty: setup_csv_file will create header
-                self.setup_csv_file()
-                return
-
-            # Read first line to confirm header
-            with open(self.csv_filename, 'r', encoding='utf-8') as f:
-                first = f.readline()
-                if 'Timestamp' in first and 'IP Address' in first:
-                    return  # header present
-
-            # Header missing: prepend header safely
-            tmp = self.csv_filename + '.tmp'
-            with open(self.csv_filename, 'r', encoding='utf-8') as orig, open(tmp, 'w', encoding='utf-8', newline='') as newf:
-                writer = csv.writer(newf)
-                writer.writerow([
-                    'Timestamp', 'IP Address', 'Device Name', 'Event Type', 'Status',
-                    'Duration (minutes)', 'Failed Ping Count', 'Email Sent', 'Notes'
-                ])
-                # copy rest
-                for line in orig:
-                    newf.write(line)
-
-            os.replace(tmp, self.csv_filename)
-            print(f"Fixed missing header in: {self.csv_filename}")
-        except Exception as e:
-            print(f"❌ Failed to ensure CSV header for {self.csv_filename}: {e}")
+        # Hand the event to the writer thread; formatting and disk I/O happen there
+        self.event_log.put((datetime.datetime.now(), ip_address, device_name, event_type, status,
+                            duration_minutes, failed_count, email_sent, notes))
+    
+    def log_events(self, rows):
+        """
+        Log several events as one batch
+        
+        The rows share one timestamp and reach the writer thread in a single
+        step, so they are written and flushed together.
+        
+        Args:
+            rows: log_event() arguments (ip_address, event_type, status, duration_minutes,
+                  failed_count, email_sent, notes) per event
+        """
+        if not rows:
+            return
+        timestamp = datetime.datetime.now()
+        devices = self.devices
+        self.event_log.put_many([(timestamp, ip_address, devices.get(ip_address, "Unknown"), event_type, status,
+                                  duration_minutes, failed_count, email_sent, notes)
+                                 for ip_address, event_type, status, duration_minutes, failed_count, email_sent, notes
+                                 in rows])
     
-    def check_device_status(self, ip_address: str):
+    def check_device_status(self, ip_address: str, is_online: bool = None, rtt: float = None, samples=None):
         """
         Check a single device and handle status changes with continuous logging
         
         Args:
             ip_address: IP address to check
+            is_online: Result of a ping already sent for this device (e.g. by a
+                       multiplexed round); the device is pinged when omitted
+            rtt: Round-trip time in seconds of that ping, if known
+            samples: Per-packet round-trip times of a burst probe already sent;
+                     is_online and rtt are then derived from them
+        """
+        # At most one check per device in flight: a check that overran its cycle
+        # is skipped, never run alongside the next one
+        if not self.device_state.claim(ip_address):
+            return
+        try:
+            if is_online is None and samples is None:
+                is_online, rtt, samples = self.probe_once(ip_address)
+            elif samples is not None:
+                is_online, rtt = self.evaluate_burst(ip_address, samples)
+            self.apply_probe_result(ip_address, is_online, rtt, samples)
+        finally:
+            self.device_state.release(ip_address)
+    
+    def apply_probe_result(self, ip_address: str, is_online: bool, rtt: float = None, samples=None):
+        """
+        Record one probe result and run the device's status transition
+        
+        The caller must hold the device's claim (see DeviceStateTable.claim())
+        and releases it afterwards.
+        
+        Args:
+            ip_address: IP address that was probed
+            is_online: Whether the device counts as reachable
+            rtt: Round-trip time in seconds, if known
+            samples: Per-packet round-trip times of a burst probe, if one was sent
         """
         current_time = datetime.datetime.now()
-        is_online = self.ping_device(ip_address)
-        previous_status = self.device_status[ip_address]
+        now = time.monotonic()
+        self.record_probe(ip_address, is_online, rtt, samples)
+        if self.adaptive_intervals is not None:
+            self.adaptive_intervals.update(ip_address, is_online, rtt)
+        if self.timings is None:
+            self.apply_status_effects(self.status_transition(ip_address, is_online, current_time, now))
+            return
+        start = time.perf_counter()
+        self.apply_status_effects(self.status_transition(ip_address, is_online, current_time, now))
+        self.timings.observe('state_update', time.perf_counter() - start)
+    
+    def apply_status_effects(self, effects):
+        """
+        Run the side effects yielded by status_transition() synchronously
+        
+        Args:
+            effects: Generator returned by status_transition()
+        """
+        result = None
+        try:
+            while True:
+                kind, args = effects.send(result)
+                if kind == 'email':
+                    result = self.send_email_alert(*args)
+                else:
+                    result = self.log_event(*args)
+        except StopIteration:
+            pass
+    
+    def status_transition(self, ip_address: str, is_online: bool, current_time: datetime.datetime,
+                          now: float = None):
+        """
+        Apply one ping result to the device state machine
+        
+        This is a generator so that the threaded and asyncio monitors share the
+        exact same transition logic. It yields the side effects in order:
+        ('email', send_email_alert args), which expects the send result back,
+        and ('log', log_event args).
+        
+        Args:
+            ip_address: IP address that was pinged
+            is_online: Whether the ping succeeded
+            current_time: Time the result was observed
+            now: time.monotonic() value at the same moment (read when omitted)
+        """
+        state = self.device_state
+        i = state.index[ip_address]
+        if now is None:
+            now = state.clock()
+        previous_status = state.online[i]
         
         if is_online:
             # Device is responding
             if not previous_status:
                 # Device came back online after being offline
-                last_change_time = self.last_status_change[ip_address]
-                duration_minutes = (current_time - last_change_time).total_seconds() / 60
+                duration_minutes = (now - state.last_change[i]) / 60
                 
                 # Send recovery email if email was sent for the outage
                 email_sent = False
-                if SEND_RECOVERY_EMAILS and self.email_sent_for_outage[ip_address]:
-                    email_sent = self.send_email_alert(ip_address, "RECOVERY_ALERT", 0, duration_minutes)
+                if SEND_RECOVERY_EMAILS and state.email_sent[i]:
+                    email_sent = yield ('email', (ip_address, "RECOVERY_ALERT", 0, duration_minutes))
                 
-                self.log_event(ip_address, "OUTAGE_END", "ONLINE", duration_minutes, 
-                             0, email_sent, f"Device recovered after {duration_minutes:.2f} minutes")
+                yield ('log', (ip_address, "OUTAGE_END", "ONLINE", duration_minutes, 
+                             0, email_sent, f"Device recovered after {duration_minutes:.2f} minutes"))
                 
                 print(f"✅ {current_time.strftime('%H:%M:%S')} - {ip_address} ({self.devices[ip_address]}) is back ONLINE after {duration_minutes:.2f} minutes")
                 
                 # Reset counters
-                self.email_sent_for_outage[ip_address] = False
+                state.email_sent[i] = 0
+                self.last_suppressed_probe.pop(ip_address, None)
             
             # Reset failed ping counter
-            self.failed_ping_count[ip_address] = 0
-            self.device_status[ip_address] = True
+            state.failed[i] = 0
+            state.online[i] = 1
+            state.alert_suppressed[i] = 0
+            self.root_causes_logged.discard(ip_address)
             
             # Update last change time only if status actually changed
             if not previous_status:
-                self.last_status_change[ip_address] = current_time
+                state.last_change[i] = now
             
             # Periodic status logging (every hour for online devices)
-            elif LOG_PERIODIC_STATUS and (current_time - self.last_status_change[ip_address]).total_seconds() >= PERIODIC_LOG_INTERVAL:
-                self.log_event(ip_address, "STATUS_CHECK", "ONLINE", 0, 0, False, "Periodic status check")
-                self.last_status_change[ip_address] = current_time
+            elif LOG_PERIODIC_STATUS and now - state.last_change[i] >= PERIODIC_LOG_INTERVAL:
+                stats = self.latency_stats[ip_address]
+                yield ('log', (ip_address, "STATUS_CHECK", "ONLINE", 0, 0, False,
+                             f"Periodic status check; {stats.summary()}"))
+                stats.reset_period()
+                state.last_change[i] = now
         
         else:
             # Device is not responding
-            self.failed_ping_count[ip_address] += 1
-            failed_count = self.failed_ping_count[ip_address]
+            state.failed[i] += 1
+            failed_count = state.failed[i]
+            root_cause = self.upstream_root_cause(ip_address)
+            
+            first_cut_off = False
+            if root_cause is not None:
+                with self.root_cause_lock:
+                    first_cut_off = root_cause not in self.root_causes_logged
+                    self.root_causes_logged.add(root_cause)
+            if first_cut_off:
+                # First device found cut off by this upstream outage - record the cause once
+                yield ('log', (root_cause, "ROOT_CAUSE", "OFFLINE", 0, state.failed_count(root_cause), False,
+                             f"Downstream devices unreachable behind {self.devices[root_cause]}"))
+                print(f"🔗 {current_time.strftime('%H:%M:%S')} - {root_cause} ({self.devices[root_cause]}) is down; "
+                      f"suppressing alerts for the devices behind it")
             
             if previous_status:
                 # Device just went offline - log the initial failure
-                self.log_event(ip_address, "OUTAGE_START", "OFFLINE", 0, failed_count, False, 
-                             "Device became unreachable")
+                notes = "Device became unreachable"
+                if ip_address in self.burst_notes:
+                    notes += f" ({self.burst_notes[ip_address]})"
+                if root_cause is not None:
+                    notes += f" (upstream {self.devices[root_cause]} ({root_cause}) is down)"
+                state.outages[i] += 1
+                yield ('log', (ip_address, "OUTAGE_START", "OFFLINE", 0, failed_count, False, notes))
                 print(f"❌ {current_time.strftime('%H:%M:%S')} - {ip_address} ({self.devices[ip_address]}) went OFFLINE (ping #{failed_count})")
-                self.device_status[ip_address] = False
-                self.last_status_change[ip_address] = current_time
+                state.online[i] = 0
+                state.last_change[i] = now
             
             else:
                 # Device still offline - log every failed ping
-                self.log_event(ip_address, "PING_FAILED", "OFFLINE", 0, failed_count, False, 
-                             f"Consecutive failed ping #{failed_count}")
+                notes = f"Consecutive failed ping #{failed_count}"
+                if ip_address in self.burst_notes:
+                    notes += f" ({self.burst_notes[ip_address]})"
+                yield ('log', (ip_address, "PING_FAILED", "OFFLINE", 0, failed_count, False, notes))
                 print(f"❌ {current_time.strftime('%H:%M:%S')} - {ip_address} ({self.devices[ip_address]}) ping failed #{failed_count}")
             
-            # Send email alert if threshold reached and not already sent
-            if failed_count == EMAIL_ALERT_THRESHOLD and not self.email_sent_for_outage[ip_address]:
-                email_sent = self.send_email_alert(ip_address, "OUTAGE_ALERT", failed_count)
+            # Send email alert if threshold reached and not already sent; an alert held
+            # back while upstream was down goes out once the upstream device recovers
+            alert_due = failed_count == EMAIL_ALERT_THRESHOLD or state.alert_suppressed[i]
+            if alert_due and not state.email_sent[i] and root_cause is not None:
+                if not state.alert_suppressed[i]:
+                    state.alert_suppressed[i] = 1
+                    yield ('log', (ip_address, "OUTAGE_ALERT", "OFFLINE", 0, failed_count, False,
+                                 f"Alert suppressed: upstream {self.devices[root_cause]} ({root_cause}) is down"))
+            elif alert_due and not state.email_sent[i]:
+                state.alert_suppressed[i] = 0
+                email_sent = yield ('email', (ip_address, "OUTAGE_ALERT", failed_count))
                 if email_sent:
-                    self.email_sent_for_outage[ip_address] = True
+                    state.email_sent[i] = 1
                 
-                self.log_event(ip_address, "OUTAGE_ALERT", "OFFLINE", 0, failed_count, email_sent, 
-                             f"Email alert sent after {failed_count} failed pings")
-                print(f"📧 {current_time.strftime('%H:%M:%S')} - Email alert sent for {self.devices[ip_address]} after {failed_count} failed pings")
+                yield ('log', (ip_address, "OUTAGE_ALERT", "OFFLINE", 0, failed_count, email_sent, 
+                             f"Email alert queued after {failed_count} failed pings"))
+                print(f"📧 {current_time.strftime('%H:%M:%S')} - Email alert queued for {self.devices[ip_address]} after {failed_count} failed pings")
+    
+    def upstream_root_cause(self, ip_address: str):
+        """The furthest-upstream unreachable parent of a device, or None"""
+        if self.topology is None:
+            return None
+        return self.topology.root_cause(ip_address, self.device_state.is_online)
+    
+    def due_devices(self, now: float = None) -> List[str]:
+        """
+        Devices to probe in this monitoring cycle
+        
+        Every device, unless adaptive intervals are enabled: then only those
+        whose own interval has elapsed since their last probe.
+        
+        Args:
+            now: Current time.monotonic() value
+        """
+        if self.adaptive_intervals is None:
+            return list(self.devices.keys())
+        return self.adaptive_intervals.due(self.devices.keys(), now)
+    
+    def select_probe_targets(self, ip_addresses, now: float = None) -> List[str]:
+        """
+        Devices to probe this round, parents ahead of their children
+        
+        Devices behind an unreachable parent are probed at most once every
+        SUPPRESSED_PROBE_INTERVAL seconds until the parent recovers.
+        
+        Args:
+            ip_addresses: Devices that are due
+            now: Current time.monotonic() value
+        """
+        if self.topology is None:
+            return list(ip_addresses)
+        now = time.monotonic() if now is None else now
+        targets = []
+        for ip_address in self.topology.sort_upstream_first(ip_addresses):
+            if self.upstream_root_cause(ip_address) is not None:
+                if now - self.last_suppressed_probe.get(ip_address, float('-inf')) < SUPPRESSED_PROBE_INTERVAL:
+                    self.probes_skipped_upstream += 1
+                    continue
+                self.last_suppressed_probe[ip_address] = now
+            else:
+                self.last_suppressed_probe.pop(ip_address, None)  # The upstream device is back
+            targets.append(ip_address)
+        return targets
+    
+    def use_multiplexed_pings(self) -> bool:
+        return PING_MULTIPLEX and self.ping_backend.multiplexed
+    
+    def check_devices_multiplexed(self, ip_addresses):
+        """
+        Ping a group of devices in one multiplexed round and process each result
+        
+        Devices whose previous round has not finished are left out.
+        
+        Args:
+            ip_addresses: IP addresses to check
+        """
+        ip_addresses = self.device_state.claim_many(ip_addresses)
+        if not ip_addresses:
+            return
+        try:
+            if self.burst_count > 1:
+                # Every device gets its burst from the same socket, rounds BURST_SPACING apart
+                try:
+                    bursts = self.ping_backend.burst_many(ip_addresses, self.burst_count, BURST_SPACING,
+                                                          BURST_REPLY_TIMEOUT)
+                except Exception as e:
+                    print(f"Error in multiplexed ping round: {e}")
+                    bursts = {ip_address: [None] * self.burst_count for ip_address in ip_addresses}
+                self.process_cycle_results([(ip_address, *self.evaluate_burst(ip_address, samples), samples)
+                                            for ip_address, samples in bursts.items()])
+                return
+            
+            try:
+                results = self.ping_backend.ping_many(ip_addresses)
+            except Exception as e:
+                print(f"Error in multiplexed ping round: {e}")
+                results = {ip_address: None for ip_address in ip_addresses}
+            self.process_cycle_results([(ip_address, rtt is not None, rtt, None)
+                                        for ip_address, rtt in results.items()])
+        finally:
+            self.device_state.release_many(ip_addresses)
+    
+    def check_devices_pooled(self, ip_addresses):
+        """
+        Probe a round of devices on the worker pool, then decide their transitions parents first
+        
+        Used when a topology is configured: a child is only evaluated once
+        its parent's result from the same round has been applied, so it never
+        judges suppression by the parent's status from the previous cycle. A
+        probe still running when the round's interval is up applies its own
+        result when it finishes.
+        
+        Args:
+            ip_addresses: IP addresses to check, parents first
+        """
+        state = self.device_state
+        results = {}
+        results_lock = threading.Lock()
+        evaluated = threading.Event()  # Results arriving after this apply themselves
+        
+        def probe(ip_address):
+            if not state.claim(ip_address):
+                return
+            try:
+                result = self.probe_once(ip_address)
+            except Exception:
+                state.release(ip_address)
+                raise
+            with results_lock:
+                if not evaluated.is_set():
+                    results[ip_address] = result  # Evaluated (and released) with the round
+                    return
+            # Late: apply the result under the same claim, so no other check can slip in between
+            try:
+                self.apply_probe_result(ip_address, *result)
+            finally:
+                state.release(ip_address)
+        
+        self.worker_pool.run_cycle(ip_addresses, probe, self.ping_interval)
+        with results_lock:
+            evaluated.set()
+            finished = dict(results)
+        try:
+            self.process_cycle_results([(ip_address, *finished[ip_address])
+                                        for ip_address in self.topology.sort_upstream_first(finished)])
+        finally:
+            state.release_many(finished)
+    
+    def process_cycle_results(self, results):
+        """
+        Apply a whole round of ping results to the device state machine at once
+        
+        The transitions of every device are decided in one batch by
+        DeviceStateTable.evaluate_batch(); status_transition() then runs only
+        for the devices that produce an event. A device that stays online
+        costs no Python call in the decision phase. Latency statistics and
+        adaptive intervals are updated for the round in one pass by
+        record_probes().
+        
+        Args:
+            results: (ip_address, is_online, rtt, burst samples or None) per device, parents
+                     first; the caller must have claimed every device
+        """
+        current_time = datetime.datetime.now()
+        now = time.monotonic()
+        state = self.device_state
+        results = list(results)
+        self.record_probes(results)
+        index = state.index
+        indices = array.array('i', [index[result[0]] for result in results])
+        reachable = array.array('B', [result[1] for result in results])
+        
+        start = time.perf_counter()
+        events = state.evaluate_batch(indices, reachable, now, EMAIL_ALERT_THRESHOLD,
+                                      PERIODIC_LOG_INTERVAL if LOG_PERIODIC_STATUS else None)
+        for i, bits in events:
+            is_online = not bits & (OUTAGE_START | PING_FAILED)
+            self.apply_status_effects(self.status_transition(state.keys[i], is_online, current_time, now))
+        if self.timings is not None:
+            self.timings.observe('state_batch', time.perf_counter() - start)
     
     def monitor_all_devices(self):
         """Monitor all devices in a single cycle"""
-        threads = []
+        targets = self.select_probe_targets(self.due_devices())
+        if self.use_multiplexed_pings():
+            # One socket serves every device; no per-device threads or processes
+            self.check_devices_multiplexed(targets)
+            return
         
-        for ip_address in self.devices.keys():
-            thread = threading.Thread(target=self.check_device_status, args=(ip_address,))
-            threads.append(thread)
-            thread.start()
+        if self.topology is not None:
+            # Children must see their parents' results from this round
+            self.check_devices_pooled(targets)
+            return
         
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+        # Queue each device on the persistent worker pool and wait at most one
+        # interval; a slow device keeps its worker but never holds up the others
+        self.worker_pool.run_cycle(targets, self.check_device_status, self.ping_interval)
     
-    def start_monitoring(self):
-        """Start the continuous monitoring loop"""
-        self.running = True
+    def print_startup_banner(self):
+        """Print the monitoring configuration shown when monitoring starts"""
         print(f"🔍 Starting continuous ping monitor for {len(self.devices)} devices...")
         print(f"⏱️  Ping interval: {self.ping_interval} second(s) (matches default ping behavior)")
         print(f"⏰ Timeout: {self.timeout} seconds (matches default ping behavior)")
+        print(f"📡 Ping backend: {self.ping_backend.name}")
+        if self.burst_count > 1:
+            limits = f"offline above {BURST_MAX_LOSS:.0%} loss"
+            if BURST_MAX_JITTER_MS is not None:
+                limits += f" or {BURST_MAX_JITTER_MS} ms jitter"
+            print(f"📶 Burst probes: {self.burst_count} packets {BURST_SPACING * 1000:.0f} ms apart, {limits}")
+        if self.topology is not None:
+            print(f"🔗 Topology: {len(self.topology)} devices behind an upstream device")
+        if self.probe_pacer is not None:
+            limits = []
+            if PROBE_RATE_LIMIT:
+                limits.append(f"{PROBE_RATE_LIMIT} packets/s overall")
+            if PROBE_SUBNET_RATE_LIMIT:
+                limits.append(f"{PROBE_SUBNET_RATE_LIMIT} packets/s per /{PROBE_SUBNET_PREFIX}")
+            print(f"🚦 Probe pacing: {', '.join(limits)}")
+        if self.adaptive_intervals is not None:
+            budget = f", budget {PROBE_BUDGET} probes/s" if PROBE_BUDGET else ""
+            print(f"🐢 Adaptive intervals: {self.ping_interval}s to {ADAPTIVE_MAX_INTERVAL}s{budget}")
         print(f"📧 Email alerts: {'Enabled' if EMAIL_ALERTS_ENABLED else 'Disabled'}")
         if EMAIL_ALERTS_ENABLED:
             print(f"🚨 Alert threshold: {EMAIL_ALERT_THRESHOLD} consecutive failed pings")
             print(f"📬 Recipients: {', '.join(EMAIL_TO)}")
-        print(f"📄 Log file: {self.csv_filename}")
+        if self.event_writer is not None:
+            print(f"📄 Log file: {self.csv_filename}")
+        if self.database_filename:
+            print(f"🗄️  Event database: {self.database_filename}")
+        if self.binary_filename:
+            print(f"🗜️  Binary log: {self.binary_filename}")
+        if self.checkpoint_filename:
+            print(f"💾 State checkpoint: {self.checkpoint_filename} every {STATE_CHECKPOINT_INTERVAL}s")
         print("📝 Logging: Every failed ping will be logged immediately")
         print("Press Ctrl+C to stop monitoring\n")
+    
+    def print_status_summary(self, now: datetime.datetime):
+        """Print the periodic online/total summary line"""
+        online_count = self.device_state.online_count()
+        total_count = len(self.devices)
+        print(f"\n📊 Status Summary - {now.strftime('%H:%M:%S')} - {online_count}/{total_count} devices online")
+        log_stats = self.event_log.stats()
+        if log_stats['delayed'] or log_stats['dropped']:
+            print(f"📝 Log queue: depth {log_stats['depth']} (max {log_stats['max_depth']}), "
+                  f"{log_stats['delayed']} events delayed, {log_stats['dropped']} dropped")
+        if self.worker_pool.threads:
+            metrics = self.worker_pool.metrics()
+            print(f"⚙️  Workers: {metrics['busy_workers']}/{metrics['workers']} busy, "
+                  f"queue depth {metrics['queue_depth']}, "
+                  f"last cycle {metrics['last_cycle_seconds']:.2f}s (max {metrics['max_cycle_seconds']:.2f}s), "
+                  f"{metrics['skipped']} checks skipped while still running")
+        if self.device_state.contended:
+            print(f"🔒 {self.device_state.contended} checks skipped: the device already had a check in flight")
+        if self.root_causes_logged:
+            print(f"🔗 Upstream outages: {', '.join(sorted(list(self.root_causes_logged)))}; "
+                  f"{self.probes_skipped_upstream} downstream probes skipped so far")
+        if self.probe_pacer is not None:
+            pacing = self.probe_pacer.stats()
+            print(f"🚦 Pacer: {pacing['delayed']} probes delayed of {pacing['packets']} packets, "
+                  f"mean delay {pacing['mean_delay'] * 1000:.1f} ms (max {pacing['max_delay'] * 1000:.1f} ms)")
+        if self.adaptive_intervals is not None:
+            adaptive = self.adaptive_intervals.stats()
+            print(f"🐢 Adaptive intervals: {adaptive['backed_off']}/{adaptive['devices']} devices backed off, "
+                  f"{adaptive['probes_per_hour']:.0f} probes/hour, saving {adaptive['saved_per_hour']:.0f} "
+                  f"({adaptive['saved_pct']:.1f}%) vs fixed rate")
+    
+    def status_sweep(self, ip_addresses, timeout: float = None) -> Dict[str, Optional[bool]]:
+        """
+        Ping a set of devices concurrently, once each
         
-        # Log initial status
-        for ip_address in self.devices.keys():
-            is_online = self.ping_device(ip_address)
-            status = "ONLINE" if is_online else "OFFLINE"
-            self.device_status[ip_address] = is_online
-            self.failed_ping_count[ip_address] = 0 if is_online else 1
+        Uses one multiplexed round on the icmp backend, otherwise a short-lived
+        pool of up to SWEEP_WORKERS threads of its own, so the sweep never
+        waits behind checks queued on the monitoring pool. It takes about one
+        ping timeout however many devices there are (times the number of
+        rounds needed when there are more devices than SWEEP_WORKERS).
+        
+        Args:
+            ip_addresses: IP addresses to ping
+            timeout: Longest time to wait for the sweep (None = until every device has a result)
             
-            self.log_event(ip_address, "MONITOR_START", status, 0, 
-                         self.failed_ping_count[ip_address], False, "Initial status check")
+        Returns:
+            dict: {ip_address: True/False}, None for a device with no result before the timeout
+        """
+        ip_addresses = list(ip_addresses)
+        results = dict.fromkeys(ip_addresses)
+        if not ip_addresses:
+            return results
+        if self.use_multiplexed_pings():
+            try:
+                replies = self.ping_backend.ping_many(ip_addresses)
+            except Exception as e:
+                print(f"Error in multiplexed ping round: {e}")
+                replies = {}
+            for ip_address in ip_addresses:
+                results[ip_address] = replies.get(ip_address) is not None
+            return results
+        
+        def sweep_one(ip_address):
+            results[ip_address] = self.ping_device(ip_address)
+        
+        sweep_pool = ProbeWorkerPool(min(len(ip_addresses), SWEEP_WORKERS), name='sweep-worker')
+        try:
+            sweep_pool.run_cycle(ip_addresses, sweep_one, timeout)
+        finally:
+            sweep_pool.shutdown()
+        # Workers still pinging keep writing to results; hand back what was in by the timeout
+        return dict(results)
+    
+    def log_status_sweep(self, event_type: str, results: Dict[str, Optional[bool]], notes: str, initial: bool):
+        """
+        Log a MONITOR_START/MONITOR_STOP row for every device of a sweep, as one batch
+        
+        Args:
+            event_type: MONITOR_START or MONITOR_STOP
+            results: status_sweep() results
+            notes: Notes for each row
+            initial: Record the results as the devices' initial status
+        """
+        state = self.device_state
+        rows = []
+        for ip_address, is_online in results.items():
+            row_notes = notes
+            if is_online is None:
+                # No reply before the sweep's timeout: report the last known status
+                is_online = state.is_online(ip_address)
+                row_notes += "; no reply before the timeout, last known status"
+            if initial:
+                state.set_initial(ip_address, is_online)
+            status = "ONLINE" if is_online else "OFFLINE"
+            rows.append((ip_address, event_type, status, 0, state.failed_count(ip_address), False, row_notes))
             
             status_symbol = "✅" if is_online else "❌"
             print(f"{status_symbol} {ip_address} ({self.devices[ip_address]}) - {status}")
+        self.log_events(rows)
+    
+    def start_monitoring(self):
+        """Start the continuous monitoring loop"""
+        self.running = True
+        self.print_startup_banner()
+        self.start_alert_dispatcher()
+        self.start_metrics_server()
+        
+        # Log initial status
+        results = self.status_sweep(self.log_resumed_devices())
+        self.log_status_sweep("MONITOR_START", results, "Initial status check", initial=True)
+        
+        self.start_checkpoints()
         
         print(f"\n🚀 Continuous monitoring started at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("💡 Only status changes and failures will be displayed to reduce console spam")
         print("=" * 80)
         
+        if SCHEDULING_MODE == 'per_device':
+            try:
+                self.run_scheduled_monitoring()
+            except KeyboardInterrupt:
+                print("\n\n🛑 Stopping monitor...")
+                self.stop_monitoring()
+            return
+        
         try:
             cycle_count = 0
             last_summary_time = datetime.datetime.now()
@@ -455,15 +1388,15 @@ This recovery notification was generated automatically by the Network Ping Monit
                 
                 # Show summary every 60 seconds instead of every cycle
                 if (cycle_start - last_summary_time).total_seconds() >= 60:
-                    online_count = sum(1 for status in self.device_status.values() if status)
-                    total_count = len(self.devices)
-                    print(f"\n📊 Status Summary - {cycle_start.strftime('%H:%M:%S')} - {online_count}/{total_count} devices online")
+                    self.print_status_summary(cycle_start)
                     last_summary_time = cycle_start
                 
                 self.monitor_all_devices()
                 
                 # Sleep for the remaining interval
                 cycle_duration = (datetime.datetime.now() - cycle_start).total_seconds()
+                if self.timings is not None:
+                    self.timings.observe('cycle', cycle_duration)
                 sleep_time = max(0, self.ping_interval - cycle_duration)
                 if sleep_time > 0:
                     time.sleep(sleep_time)
@@ -472,26 +1405,421 @@ This recovery notification was generated automatically by the Network Ping Monit
             print("\n\n🛑 Stopping monitor...")
             self.stop_monitoring()
     
+    def run_scheduled_monitoring(self):
+        """
+        Monitoring loop with independent per-device schedules
+        
+        Each device is probed on its own interval (DEVICE_INTERVALS, the
+        adaptive interval when ADAPTIVE_INTERVALS is on, or ping_interval)
+        with SCHEDULE_JITTER applied, instead of the
+        whole fleet being pinged together once per cycle. Due devices are
+        handed to the worker pool, so a slow probe never delays other devices.
+        """
+        scheduler = ProbeScheduler(self.ping_interval, SCHEDULE_JITTER, DEVICE_INTERVALS)
+        for ip_address in self.devices.keys():
+            interval = None
+            if self.adaptive_intervals is not None and ip_address in self.adaptive_intervals:
+                interval = self.adaptive_intervals.interval(ip_address)
+            scheduler.add(ip_address, interval)
+        self.scheduler = scheduler
+        
+        multiplexed = self.use_multiplexed_pings()
+        batch_number = 0
+        
+        last_summary_time = datetime.datetime.now()
+        while self.running:
+            if self.adaptive_intervals is not None:
+                # Intervals change on the worker threads; the heap is only touched here.
+                # A device snapped back to the fastest interval is pulled forward now
+                for ip_address, interval in self.adaptive_intervals.pop_changes():
+                    scheduler.set_interval(ip_address, interval)
+            due = scheduler.pop_due()
+            if due:
+                targets = self.select_probe_targets(due)
+                if multiplexed:
+                    # All devices due at the same moment share one ICMP round; devices
+                    # still in an earlier round are left out of it when it starts
+                    batch_number += 1
+                    self.worker_pool.submit(('batch', batch_number),
+                                            lambda _key, ips=targets: self.check_devices_multiplexed(ips))
+                else:
+                    for ip_address in targets:
+                        self.worker_pool.submit(ip_address, self.check_device_status)
+                for ip_address in due:
+                    scheduler.reschedule(ip_address)
+            
+            now = datetime.datetime.now()
+            if (now - last_summary_time).total_seconds() >= 60:
+                self.print_status_summary(now)
+                last_summary_time = now
+            
+            next_due = scheduler.next_due()
+            if next_due is not None:
+                time.sleep(min(1.0, max(0.0, next_due - time.monotonic())))
+            else:
+                time.sleep(1.0)
+    
     def stop_monitoring(self):
         """Stop the monitoring"""
         self.running = False
+        deadline = time.time() + self.timeout + 3
+        # Checks still queued would only report after the final status and race the log shutdown
+        cancelled = self.worker_pool.cancel_pending()
+        if cancelled:
+            print(f"⏹️  Cancelled {cancelled} queued device checks")
         
         print("📊 Final device status check...")
-        # Log final status
-        for ip_address in self.devices.keys():
-            is_online = self.ping_device(ip_address)
-            status = "ONLINE" if is_online else "OFFLINE"
-            failed_count = self.failed_ping_count[ip_address]
+        # Log final status; shutdown waits one ping timeout (plus a second of slack), not one per device
+        results = self.status_sweep(self.devices.keys(), self.timeout + 1)
+        # Checks already running finish (and log) before the sinks close
+        self.worker_pool.shutdown(wait=True, timeout=max(0.0, deadline - time.time()))
+        self.log_status_sweep("MONITOR_STOP", results, "Monitoring stopped", initial=False)
+        
+        self.close_checkpoints()
+        self.close_alerts()
+        self.close_event_log()
+        self.close_metrics_server()
+        self.close_profiling()
+        
+        print(f"\n✅ Monitoring stopped at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if self.event_writer is not None:
+            print(f"📄 Log saved to: {self.csv_filename}")
+        if self.database_filename:
+            print(f"🗄️  Events saved to: {self.database_filename}")
+
+class AsyncPingMonitor(PingMonitor):
+    """
+    asyncio variant of PingMonitor
+    
+    Each device check is a coroutine. Pings go through the event loop (an
+    ICMP socket when the icmp backend is active, otherwise
+    asyncio.create_subprocess_exec). CSV rows go to the event log writer
+    thread and emails to the alert dispatcher thread, so file and SMTP
+    I/O never block the loop. The
+    state machine is the same status_transition() used by PingMonitor, so
+    both modes produce identical events.
+    """
+    
+    def __init__(self, devices: Dict[str, str], ping_interval: int = 30, timeout: int = 5,
+                 max_subprocesses: int = 256):
+        """
+        Initialize the asyncio ping monitor
+        
+        Args:
+            devices: Dictionary of {ip_address: description}
+            ping_interval: Seconds between ping attempts
+            timeout: Ping timeout in seconds
+            max_subprocesses: Cap on concurrent ping processes for the subprocess backend
+        """
+        super().__init__(devices, ping_interval, timeout)
+        self.max_subprocesses = max_subprocesses
+        self.icmp_pinger = None
+        self.subprocess_slots = None
+    
+    def open_event_loop_resources(self):
+        """Bind the ICMP socket and subprocess limiter to the running event loop"""
+        self.subprocess_slots = asyncio.Semaphore(self.max_subprocesses)
+        self.icmp_pinger = None
+        if self.ping_backend.name == 'icmp':
+            try:
+                self.icmp_pinger = AsyncIcmpPinger(self.ping_backend)
+            except NotImplementedError:
+                print("⚠️  Event loop cannot watch ICMP sockets; using the system ping command")
+    
+    def close_event_loop_resources(self):
+        if self.icmp_pinger is not None:
+            self.icmp_pinger.close()
+            self.icmp_pinger = None
+    
+    async def async_probe_device(self, ip_address: str):
+        """
+        Ping a single device without blocking the event loop
+        
+        Args:
+            ip_address: IP address to ping
             
-            self.log_event(ip_address, "MONITOR_STOP", status, 0, failed_count, False, "Monitoring stopped")
+        Returns:
+            float: Round-trip time in seconds (RTT_UNKNOWN if the device answered but no time was
+                   reported), or None if the device did not answer
+        """
+        try:
+            if self.icmp_pinger is not None:
+                return await self.icmp_pinger.ping(ip_address)
             
-            status_symbol = "✅" if is_online else "❌"
-            print(f"{status_symbol} {ip_address} ({self.devices[ip_address]}) - {status}")
+            if self.probe_pacer is not None:
+                await self.probe_pacer.async_wait(ip_address)
+            result = await self.async_run_ping_command(self.subprocess_backend().build_command(ip_address),
+                                                       self.timeout + 2)
+            if result is None or result[0] != 0:
+                return None
+            rtt = parse_ping_rtt(result[1])
+            return rtt if rtt is not None else RTT_UNKNOWN
+        except Exception as e:
+            print(f"Error pinging {ip_address}: {e}")
+            return None
+    
+    async def async_probe_device_burst(self, ip_address: str):
+        """
+        Send a burst of BURST_COUNT packets to a single device without blocking the event loop
+        
+        Args:
+            ip_address: IP address to ping
+            
+        Returns:
+            list: Round-trip time in seconds per packet, None for each lost packet
+        """
+        try:
+            if self.icmp_pinger is not None:
+                return await self.icmp_pinger.burst(ip_address, self.burst_count, BURST_SPACING,
+                                                    BURST_REPLY_TIMEOUT)
+            
+            command = self.subprocess_backend().build_burst_command(ip_address, self.burst_count, BURST_SPACING,
+                                                                    BURST_REPLY_TIMEOUT)
+            if self.probe_pacer is not None:
+                await self.probe_pacer.async_wait(ip_address, self.burst_count)
+            result = await self.async_run_ping_command(command,
+                                                       self.timeout + self.burst_count * max(BURST_SPACING, 1) + 2)
+            if result is None:
+                return [None] * self.burst_count
+            # ping exits non-zero when any packet is lost, so parse the replies regardless
+            return parse_ping_burst(result[1], self.burst_count)
+        except Exception as e:
+            print(f"Error pinging {ip_address}: {e}")
+            return [None] * self.burst_count
+    
+    def subprocess_backend(self) -> SubprocessPingBackend:
+        """The ping command backend used for subprocess pings from the event loop"""
+        if self.ping_backend.name == 'icmp':
+            return SubprocessPingBackend(self.timeout, self.is_windows)
+        return self.ping_backend
+    
+    async def async_run_ping_command(self, command, timeout: float):
+        """
+        Run a ping command under the subprocess limit
+        
+        Args:
+            command: Command line to run
+            timeout: Seconds before the process is killed
+            
+        Returns:
+            tuple: (return code, decoded stdout), or None if the command timed out
+        """
+        async with self.subprocess_slots:
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            started = time.perf_counter()
+            try:
+                output, _ = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return None
+            finally:
+                if self.timings is not None:
+                    self.timings.observe('ping_exec', started - start)
+                    self.timings.observe('ping_wait', time.perf_counter() - started)
+        return process.returncode, output.decode(errors='replace')
+    
+    async def async_probe_once(self, ip_address: str):
+        """Coroutine version of probe_once"""
+        if self.burst_count > 1:
+            samples = await self.async_probe_device_burst(ip_address)
+            return (*self.evaluate_burst(ip_address, samples), samples)
+        rtt = await self.async_probe_device(ip_address)
+        if rtt is RTT_UNKNOWN:
+            return True, None, None  # Answered, but no round-trip time to record
+        return rtt is not None, rtt, None
+    
+    async def async_ping_device(self, ip_address: str) -> bool:
+        """
+        Ping a single device without blocking the event loop
+        
+        Args:
+            ip_address: IP address to ping
+            
+        Returns:
+            bool: True if ping successful, False otherwise
+        """
+        return await self.async_probe_device(ip_address) is not None
+    
+    async def async_log_event(self, *args):
+        """Awaitable CSV sink; log_event() only enqueues for the writer thread"""
+        return self.log_event(*args)
+    
+    async def async_send_email_alert(self, *args):
+        """Awaitable email sink; send_email_alert() only enqueues for the alert dispatcher"""
+        return self.send_email_alert(*args)
+    
+    async def async_check_device_status(self, ip_address: str, is_online: bool = None, rtt: float = None,
+                                        samples=None):
+        """
+        Coroutine version of check_device_status
+        
+        Args:
+            ip_address: IP address to check
+            is_online: Result of a ping already sent for this device
+            rtt: Round-trip time in seconds of that ping, if known
+            samples: Per-packet round-trip times of a burst probe already sent
+        """
+        # Coroutines of the same device never interleave their transitions (see check_device_status)
+        if not self.device_state.claim(ip_address):
+            return
+        try:
+            current_time = datetime.datetime.now()
+            now = time.monotonic()
+            if is_online is None and samples is None:
+                is_online, rtt, samples = await self.async_probe_once(ip_address)
+            elif samples is not None:
+                is_online, rtt = self.evaluate_burst(ip_address, samples)
+            self.record_probe(ip_address, is_online, rtt, samples)
+            if self.adaptive_intervals is not None:
+                self.adaptive_intervals.update(ip_address, is_online, rtt)
+            
+            start = time.perf_counter()
+            effects = self.status_transition(ip_address, is_online, current_time, now)
+            result = None
+            try:
+                while True:
+                    kind, args = effects.send(result)
+                    if kind == 'email':
+                        result = await self.async_send_email_alert(*args)
+                    else:
+                        result = await self.async_log_event(*args)
+            except StopIteration:
+                pass
+            if self.timings is not None:
+                self.timings.observe('state_update', time.perf_counter() - start)
+        finally:
+            self.device_state.release(ip_address)
+    
+    async def async_monitor_all_devices(self):
+        """Monitor all devices in a single cycle, one coroutine per device"""
+        targets = self.select_probe_targets(self.due_devices())
+        if self.topology is None:
+            await asyncio.gather(*(self.async_check_device_status(ip_address) for ip_address in targets))
+            return
+        
+        # Probe concurrently, then apply the results parents first (see check_devices_pooled)
+        targets = self.device_state.claim_many(targets)
+        try:
+            results = await asyncio.gather(*(self.async_probe_once(ip_address) for ip_address in targets))
+            self.process_cycle_results([(ip_address, *result) for ip_address, result in zip(targets, results)])
+        finally:
+            self.device_state.release_many(targets)
+    
+    async def async_status_sweep(self, event_type: str, notes: str, initial: bool, ip_addresses=None,
+                                 timeout: float = None):
+        """
+        Ping every device (or the given ones) concurrently and log a MONITOR_START/MONITOR_STOP row for each
+        
+        Args:
+            event_type: MONITOR_START or MONITOR_STOP
+            notes: Notes for each row
+            initial: Record the results as the devices' initial status
+            ip_addresses: Devices to ping (default: all)
+            timeout: Longest time to wait for the pings (None = until every device has a result);
+                     devices still pending are logged with their last known status
+        """
+        ip_addresses = list(self.devices.keys()) if ip_addresses is None else list(ip_addresses)
+        results = dict.fromkeys(ip_addresses)
+        tasks = {asyncio.ensure_future(self.async_ping_device(ip_address)): ip_address
+                 for ip_address in ip_addresses}
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                results[tasks[task]] = task.result()
+        self.log_status_sweep(event_type, results, notes, initial)
+    
+    async def async_run(self):
+        """Run the initial sweep and the continuous monitoring loop"""
+        self.open_event_loop_resources()
+        try:
+            await self.async_status_sweep("MONITOR_START", "Initial status check", initial=True,
+                                          ip_addresses=self.log_resumed_devices())
+            self.start_checkpoints()
+            
+            print(f"\n🚀 Continuous monitoring started at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print("💡 Only status changes and failures will be displayed to reduce console spam")
+            print("=" * 80)
+            
+            last_summary_time = datetime.datetime.now()
+            while self.running:
+                cycle_start = datetime.datetime.now()
+                
+                # Show summary every 60 seconds instead of every cycle
+                if (cycle_start - last_summary_time).total_seconds() >= 60:
+                    self.print_status_summary(cycle_start)
+                    last_summary_time = cycle_start
+                
+                await self.async_monitor_all_devices()
+                
+                # Sleep for the remaining interval
+                cycle_duration = (datetime.datetime.now() - cycle_start).total_seconds()
+                if self.timings is not None:
+                    self.timings.observe('cycle', cycle_duration)
+                sleep_time = max(0, self.ping_interval - cycle_duration)
+                if sleep_time > 0:
+                    await asyncio.sleep(sleep_time)
+        finally:
+            self.close_event_loop_resources()
+    
+    async def async_stop(self):
+        self.open_event_loop_resources()
+        try:
+            await self.async_status_sweep("MONITOR_STOP", "Monitoring stopped", initial=False,
+                                          timeout=self.timeout + 1)
+        finally:
+            self.close_event_loop_resources()
+    
+    def start_monitoring(self):
+        """Start the continuous monitoring loop on an asyncio event loop"""
+        self.running = True
+        self.print_startup_banner()
+        self.start_alert_dispatcher()
+        self.start_metrics_server()
+        print("⚙️  Monitoring core: asyncio")
+        
+        try:
+            asyncio.run(self.async_run())
+        except KeyboardInterrupt:
+            print("\n\n🛑 Stopping monitor...")
+            self.stop_monitoring()
+    
+    def stop_monitoring(self):
+        """Stop the monitoring"""
+        self.running = False
+        
+        print("📊 Final device status check...")
+        asyncio.run(self.async_stop())
+        self.close_checkpoints()
+        self.close_alerts()
+        
+        self.close_event_log()
+        self.close_metrics_server()
+        self.close_profiling()
         
         print(f"\n✅ Monitoring stopped at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"📄 Log saved to: {self.csv_filename}")
+        if self.event_writer is not None:
+            print(f"📄 Log saved to: {self.csv_filename}")
+        if self.database_filename:
+            print(f"🗄️  Events saved to: {self.database_filename}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Network Ping Monitor with Email Alerts")
+    parser.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                        help="time each phase of the monitoring cycle and append histograms to FILE "
+                             "(default: profile_<timestamp>.txt next to the CSV log)")
+    parser.add_argument('--profile-interval', type=float, default=60, metavar='SECONDS',
+                        help="seconds between profile reports (default: 60)")
+    parser.add_argument('--profile-sample', type=float, default=0, metavar='SECONDS',
+                        help="also run a sampling profiler over every thread for the first SECONDS")
+    args = parser.parse_args()
+    
     # Use configuration from config.py
     devices = DEVICES
     ping_interval = PING_INTERVAL
@@ -514,7 +1842,14 @@ def main():
     print()
     
     # Create and start monitor
-    monitor = PingMonitor(devices, ping_interval, timeout)
+    if MONITOR_MODE == 'async':
+        monitor = AsyncPingMonitor(devices, ping_interval, timeout, ASYNC_MAX_SUBPROCESSES)
+    else:
+        monitor = PingMonitor(devices, ping_interval, timeout)
+    if args.profile is not None:
+        path = args.profile or os.path.join(os.path.dirname(monitor.csv_filename),
+                                            f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        monitor.start_profiling(path, args.profile_interval, args.profile_sample)
     monitor.start_monitoring()
 
 if __name__ == "__main__":
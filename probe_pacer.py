@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Probe pacing for the Network Ping Monitor
+Token buckets (global and per subnet) in front of the ping backends, so
+probes leave at an even rate instead of all in the same millisecond and do
+not trip ICMP rate limiting on switches and firewalls
+"""
+
+import asyncio
+import collections
+import itertools
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket kept as a theoretical arrival time (GCRA)
+
+    A packet may leave once the bucket holds a token; the bucket refills at
+    rate tokens per second up to burst tokens. Reservations are made ahead,
+    so callers learn how long to wait instead of polling.
+    """
+
+    __slots__ = ('rate', 'tolerance', 'arrival')
+
+    def __init__(self, rate: float, burst: float = 1):
+        """
+        Args:
+            rate: Packets per second
+            burst: Packets that may leave back to back after an idle period
+        """
+        self.rate = rate
+        self.tolerance = (max(1.0, burst) - 1) / rate
+        self.arrival = float('-inf')
+
+    def earliest(self, now: float) -> float:
+        """Earliest time the next packet may leave"""
+        return max(now, self.arrival - self.tolerance)
+
+    def consume(self, at: float, packets: int = 1):
+        """Record packets leaving at the given time"""
+        self.arrival = max(self.arrival, at) + packets / self.rate
+
+
+class ProbePacer:
+    """
+    Global and per-subnet packet rate limits for probes
+
+    reserve() books the next free slot in the global bucket and in the
+    bucket of the target's subnet and returns how long the caller must wait
+    for it. Safe to call from several threads and from the event loop.
+    """
+
+    def __init__(self, rate: Optional[float] = None, subnet_rate: Optional[float] = None,
+                 subnet_prefix: int = 24, burst: float = 1, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the pacer
+
+        Args:
+            rate: Packets per second across all targets (None = unlimited)
+            subnet_rate: Packets per second into each subnet (None = unlimited)
+            subnet_prefix: Prefix length that defines a subnet (24 = /24)
+            burst: Packets each bucket lets through back to back after an idle period
+            clock: Monotonic time source
+        """
+        self.rate = rate
+        self.subnet_rate = subnet_rate
+        self.subnet_prefix = max(0, min(32, subnet_prefix))
+        self.burst = burst
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.global_bucket = TokenBucket(rate, burst) if rate else None
+        self.subnet_buckets = {}  # subnet key -> TokenBucket
+        self.subnet_keys = {}  # ip -> subnet key
+
+        self.packets = 0
+        self.delayed = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def subnet_of(self, ip_address: str) -> Hashable:
+        """Subnet key of an address (the address itself if it is not IPv4)"""
+        key = self.subnet_keys.get(ip_address)
+        if key is None:
+            try:
+                address = struct.unpack('!I', socket.inet_aton(ip_address))[0]
+                key = address >> (32 - self.subnet_prefix) if self.subnet_prefix else 0
+            except OSError:
+                key = ip_address
+            self.subnet_keys[ip_address] = key
+        return key
+
+    def interleave(self, ip_addresses: Iterable[str]) -> List[str]:
+        """
+        Order targets round-robin across subnets
+
+        A round sent in address order would wait on one subnet's bucket while
+        the others sit idle; interleaving keeps every subnet's budget in use.
+        """
+        if not self.subnet_rate:
+            return list(ip_addresses)
+        by_subnet = collections.OrderedDict()
+        for ip_address in ip_addresses:
+            by_subnet.setdefault(self.subnet_of(ip_address), []).append(ip_address)
+        return [ip_address for group in itertools.zip_longest(*by_subnet.values())
+                for ip_address in group if ip_address is not None]
+
+    def reserve(self, ip_address: str, packets: int = 1) -> float:
+        """
+        Book send slots for packets to ip_address
+
+        Args:
+            ip_address: Target of the packets
+            packets: Packets about to be sent back to back
+
+        Returns:
+            Seconds to wait before sending (0 if a slot is free now)
+        """
+        with self.lock:
+            now = self.clock()
+            buckets = []
+            if self.global_bucket is not None:
+                buckets.append(self.global_bucket)
+            if self.subnet_rate:
+                subnet = self.subnet_of(ip_address)
+                bucket = self.subnet_buckets.get(subnet)
+                if bucket is None:
+                    bucket = self.subnet_buckets[subnet] = TokenBucket(self.subnet_rate, self.burst)
+                buckets.append(bucket)
+
+            send_at = now
+            for bucket in buckets:
+                send_at = max(send_at, bucket.earliest(now))
+            for bucket in buckets:
+                bucket.consume(send_at, packets)
+
+            delay = send_at - now
+            self.packets += packets
+            if delay > 0:
+                self.delayed += 1
+                self.total_delay += delay
+                if delay > self.max_delay:
+                    self.max_delay = delay
+            return delay
+
+    def wait(self, ip_address: str, packets: int = 1):
+        """Block until packets to ip_address may be sent"""
+        delay = self.reserve(ip_address, packets)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_wait(self, ip_address: str, packets: int = 1):
+        """Coroutine version of wait()"""
+        delay = self.reserve(ip_address, packets)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        """Packets paced so far, and how many reservations were held back and for how long"""
+        with self.lock:
+            return {
+                'packets': self.packets,
+                'delayed': self.delayed,
+                'total_delay': self.total_delay,
+                'mean_delay': self.total_delay / self.delayed if self.delayed else 0.0,
+                'max_delay': self.max_delay,
+                'subnets': len(self.subnet_buckets),
+            }
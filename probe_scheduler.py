@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Per-device probe scheduler for the Network Ping Monitor
+Keeps each device's next due time in a binary heap so devices are probed on
+their own interval (with optional jitter) instead of in one lockstep cycle
+"""
+
+import heapq
+import random
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+class ProbeScheduler:
+    """
+    Heap-based scheduler of per-device probe times
+
+    Every operation is O(log n) in the number of scheduled devices. Removing
+    a device or changing its interval invalidates its heap entry lazily via a
+    per-device generation number, so stale entries are skipped when popped.
+    """
+
+    def __init__(self, default_interval: float, jitter: float = 0.0,
+                 intervals: Dict[Hashable, float] = None,
+                 clock: Callable[[], float] = time.monotonic, seed: int = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            default_interval: Seconds between probes for devices without their own interval
+            jitter: Random offset applied to every due time, as a fraction of the
+                    device's interval (0.1 = +/-10%)
+            intervals: Optional {device: interval_seconds} overrides
+            clock: Monotonic time source
+            seed: Seed for the jitter random generator
+        """
+        self.default_interval = default_interval
+        self.jitter = max(0.0, jitter)
+        self.intervals = dict(intervals or {})
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.heap = []  # (due_time, generation, key)
+        self.due_times = {}  # key -> time the next probe fires (jitter applied)
+        self.anchors = {}  # key -> the same due time without jitter; the cadence is kept from here
+        self.generations = {}  # key -> current generation
+
+    def __len__(self) -> int:
+        return len(self.due_times)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.due_times
+
+    def interval_for(self, key: Hashable) -> float:
+        return self.intervals.get(key, self.default_interval)
+
+    def _jittered(self, due: float, interval: float) -> float:
+        if not self.jitter:
+            return due
+        return due + self.random.uniform(-self.jitter, self.jitter) * interval
+
+    def _push(self, key: Hashable, due: float, anchor: float = None):
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        self.due_times[key] = due
+        self.anchors[key] = due if anchor is None else anchor
+        heapq.heappush(self.heap, (due, generation, key))
+
+    def add(self, key: Hashable, interval: float = None, first_due: float = None):
+        """
+        Schedule a device
+
+        Args:
+            key: Device identifier (IP address)
+            interval: Probe interval for this device (defaults to default_interval)
+            first_due: Absolute first due time; by default the first probe is
+                       placed at a random point within one interval so that
+                       devices added together do not all fire together
+        """
+        if interval is not None:
+            self.intervals[key] = interval
+        if first_due is None:
+            first_due = self.clock() + self.random.uniform(0, self.interval_for(key))
+        self._push(key, first_due)
+
+    def remove(self, key: Hashable):
+        """Stop scheduling a device"""
+        if key in self.due_times:
+            del self.due_times[key]
+            del self.anchors[key]
+            self.generations[key] = self.generations.get(key, 0) + 1
+
+    def set_interval(self, key: Hashable, interval: float, now: float = None):
+        """
+        Change a device's interval, pulling its next probe earlier if needed
+
+        Args:
+            key: Device identifier
+            interval: New probe interval in seconds
+            now: Current clock value
+        """
+        self.intervals[key] = interval
+        if key not in self.due_times:
+            return
+        now = self.clock() if now is None else now
+        if self.due_times[key] > now + interval:
+            self._push(key, now + interval)
+
+    def pop_due(self, now: float = None, limit: int = None) -> List[Hashable]:
+        """
+        Remove and return every device whose due time has passed
+
+        The caller must reschedule() each returned device once it is dispatched.
+
+        Args:
+            now: Current clock value
+            limit: Maximum number of devices to return
+        """
+        now = self.clock() if now is None else now
+        due = []
+        heap = self.heap
+        while heap and heap[0][0] <= now and (limit is None or len(due) < limit):
+            _, generation, key = heapq.heappop(heap)
+            if self.generations.get(key) != generation or key not in self.due_times:
+                continue  # stale entry
+            due.append(key)
+        return due
+
+    def reschedule(self, key: Hashable, now: float = None):
+        """
+        Schedule a device's next probe one interval after its last due time
+
+        Anchoring on the previous unjittered due time keeps the cadence from
+        drifting: each probe's jitter is an offset from the anchor and does not
+        carry over into later ones. A device that fell behind is scheduled
+        one interval from now instead of being probed repeatedly to catch up.
+        """
+        if key not in self.due_times:
+            return
+        now = self.clock() if now is None else now
+        interval = self.interval_for(key)
+        due = self.anchors[key] + interval
+        if due < now:
+            due = now + interval
+        self._push(key, self._jittered(due, interval), due)
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest scheduled device, or None if nothing is scheduled"""
+        heap = self.heap
+        while heap:
+            _, generation, key = heap[0]
+            if self.generations.get(key) == generation and key in self.due_times:
+                return heap[0][0]
+            heapq.heappop(heap)
+        return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Profiling mode for the Network Ping Monitor
+Writes periodic per-phase timing histograms to a file and can run a bounded
+sampling profiler over the monitor's threads
+"""
+
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+from typing import Callable, List
+
+# Phases in the order they happen in a check; others follow alphabetically
+PHASE_ORDER = ('cycle', 'dispatch', 'ping_exec', 'ping_send', 'ping_wait', 'state_update', 'state_batch',
+               'log_write', 'log_flush', 'log_header_check', 'email_send', 'ping_rtt')
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples every thread's stack
+
+    Runs on its own thread for at most duration seconds (or until stop()),
+    so its overhead is bounded. Counts are kept per function (inclusive:
+    anywhere on the stack) and per line (exclusive: the innermost frame), so
+    memory is bounded by the size of the code base, not by the run time.
+    """
+
+    def __init__(self, duration: float, interval: float = 0.005):
+        """
+        Args:
+            duration: Seconds to sample for
+            interval: Seconds between samples
+        """
+        self.duration = duration
+        self.interval = interval
+        self.samples = 0
+        self.elapsed = 0.0  # Seconds actually sampled (less than duration if stopped early)
+        self.inclusive = collections.Counter()  # "file:function" -> samples on the stack
+        self.exclusive = collections.Counter()  # "file:line function" -> samples as innermost frame
+        self.finished = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        start = time.monotonic()
+        deadline = start + self.duration
+        while time.monotonic() < deadline and not self.stopping.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples += 1
+                code = frame.f_code
+                self.exclusive[f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"] += 1
+                seen = set()
+                while frame is not None:
+                    code = frame.f_code
+                    seen.add(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.inclusive.update(seen)
+            self.stopping.wait(self.interval)
+        self.elapsed = time.monotonic() - start
+        self.finished.set()
+
+    def stop(self):
+        """End sampling early and wait for the sampler thread, so the counters stop changing"""
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def report(self, top: int = 25) -> List[str]:
+        """Text lines with the functions and lines seen in the most samples (call once finished)"""
+        lines = [f"sampling profile: {self.samples} thread samples over {self.elapsed:.1f}s "
+                 f"(every {self.interval * 1000:g} ms)"]
+        if not self.samples:
+            return lines
+        lines.append(f"{'inclusive %':>11}  function")
+        for name, count in self.inclusive.most_common(top):
+            lines.append(f"{100.0 * count / self.samples:>10.1f}%  {name}")
+        lines.append(f"{'exclusive %':>11}  innermost line")
+        for name, count in self.exclusive.most_common(top):
+            lines.append(f"{100.0 * count / self.samples:>10.1f}%  {name}")
+        return lines
+
+
+class ProfileReporter:
+    """
+    Appends a per-phase timing table to a file every interval
+
+    Each table covers the period since the previous one: calls, total time,
+    share of the period (summed over threads, so concurrent phases can exceed
+    100%), mean and p50/p95/p99 (bucket upper bounds), plus the largest
+    duration seen since start.
+    """
+
+    def __init__(self, timings, path: str, interval: float = 60.0,
+                 describe: Callable[[], str] = None, sampler: SamplingProfiler = None):
+        """
+        Args:
+            timings: metrics.Timings collecting the phase durations
+            path: File the tables are appended to
+            interval: Seconds between tables
+            describe: Returns extra text for each table heading (e.g. the device count)
+            sampler: Optional SamplingProfiler whose report is appended once it finishes
+        """
+        self.timings = timings
+        self.path = path
+        self.interval = interval
+        self.describe = describe
+        self.sampler = sampler
+        self.sampler_reported = False
+        self.previous = {}  # phase -> (bucket counts, sum) at the previous table
+        self.period_start = time.monotonic()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name='profile-reporter', daemon=True)
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.sampler is not None:
+            self.sampler.start()
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            self.write_report()
+
+    def phase_rows(self, period: float) -> List[str]:
+        """Table rows for the phases observed during the last period"""
+        names = sorted(self.timings.histograms, key=lambda name: (
+            PHASE_ORDER.index(name) if name in PHASE_ORDER else len(PHASE_ORDER), name))
+        rows = []
+        for name in names:
+            histogram = self.timings.histograms[name]
+            counts, total = list(histogram.counts), histogram.sum
+            previous_counts, previous_total = self.previous.get(name, ([0] * len(counts), 0.0))
+            self.previous[name] = (counts, total)
+            period_counts = [now - before for now, before in zip(counts, previous_counts)]
+            calls = sum(period_counts)
+            if not calls:
+                continue
+            seconds = total - previous_total
+            bounds = histogram.buckets + (float('inf'),)
+
+            def quantile(q):
+                rank = q * calls
+                seen = 0
+                for bound, count in zip(bounds, period_counts):
+                    seen += count
+                    if seen >= rank:
+                        return bound
+                return bounds[-1]
+
+            def ms(value):
+                return '>' + f"{histogram.buckets[-1] * 1000:g}" if value == float('inf') else f"{value * 1000:.2f}"
+
+            rows.append(f"{name:<17} {calls:>9} {seconds:>10.3f} {100.0 * seconds / period:>7.1f}% "
+                        f"{seconds / calls * 1000:>9.3f} {ms(quantile(0.5)):>9} {ms(quantile(0.95)):>9} "
+                        f"{ms(quantile(0.99)):>9} {histogram.max * 1000:>10.2f}")
+        return rows
+
+    def write_report(self, final: bool = False):
+        """Append the table for the period since the previous report"""
+        with self.lock:
+            now = time.monotonic()
+            period = max(now - self.period_start, 1e-9)
+            self.period_start = now
+            heading = f"=== {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  period {period:.1f}s"
+            if self.describe is not None:
+                heading += f"  {self.describe()}"
+            lines = [heading + " ===",
+                     f"{'phase':<17} {'calls':>9} {'total s':>10} {'share':>8} {'mean ms':>9} "
+                     f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>10}"]
+            lines.extend(self.phase_rows(period) or ["(no timed phases this period)"])
+            # The sampling profile goes out once, when done (or cut short by the final report)
+            if self.sampler is not None and not self.sampler_reported and (self.sampler.finished.is_set() or final):
+                self.sampler_reported = True
+                # Cut short by the final report: the counters must not change while they are read
+                self.sampler.stop()
+                lines.append("")
+                lines.extend(self.sampler.report())
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n\n')
+            except OSError as e:
+                print(f"❌ Failed to write profile report {self.path}: {e}")
+
+    def close(self):
+        """Stop the periodic reports and write a final one"""
+        if self.stopping.is_set():
+            return
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.write_report(final=True)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Pooled SMTP sessions for the Network Ping Monitor
+Keeps authenticated connections open between alerts so a burst of alerts
+does not pay a TCP connect, TLS handshake and AUTH for every message
+"""
+
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from typing import Callable, Dict
+
+
+class PooledSession:
+    """One open SMTP connection, when it last sent and when it was last known to work"""
+
+    __slots__ = ('smtp', 'last_used', 'last_checked')
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = self.last_checked = time.monotonic()
+
+
+class SmtpConnectionPool:
+    """
+    Bounded pool of logged-in SMTP sessions shared by all alert senders
+
+    send() borrows an idle session (or opens one while fewer than size are
+    open), sends, and returns it to the pool. A session not heard from for
+    keepalive_interval is checked with NOOP before reuse, and a background
+    thread NOOPs idle sessions so the server does not drop them; sessions
+    that have not sent anything for idle_timeout are closed. If a session
+    turns out to be dead the message is retried once on a fresh connection.
+    """
+
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+                 use_tls: bool = True, size: int = 2, keepalive_interval: float = 30.0,
+                 idle_timeout: float = 300.0, timeout: float = 30.0,
+                 smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        """
+        Initialize the pool (connections are opened on demand)
+
+        Args:
+            host: SMTP server
+            port: SMTP port
+            username: Login name (None = no AUTH)
+            password: Login password
+            use_tls: Issue STARTTLS before logging in
+            size: Most sessions open at once
+            keepalive_interval: Seconds after which an unused session is NOOP-checked
+            idle_timeout: Seconds without a message after which a session is closed
+            timeout: Socket timeout for SMTP commands
+            smtp_factory: Creates the smtplib.SMTP object (host, port, timeout=...)
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = max(1, int(size))
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        self.idle = deque()  # PooledSession, most recently used on the right
+        self.open_sessions = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.keepalive_thread = None
+
+        # Metrics
+        self.connects = 0
+        self.reconnects = 0
+        self.messages = 0
+        self.noops = 0
+
+    def _connect(self) -> PooledSession:
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._quietly_close(smtp)
+            raise
+        with self.condition:
+            self.connects += 1
+        return PooledSession(smtp)
+
+    @staticmethod
+    def _quietly_close(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            try:
+                smtp.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_alive(session: PooledSession) -> bool:
+        try:
+            return session.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self) -> PooledSession:
+        """Borrow an idle session or open a new one, waiting while size sessions are busy"""
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise smtplib.SMTPException("SMTP connection pool is closed")
+                if self.idle:
+                    session = self.idle.pop()
+                    break
+                if self.open_sessions < self.size:
+                    self.open_sessions += 1
+                    session = None
+                    break
+                self.condition.wait()
+        if session is None:
+            try:
+                return self._connect()
+            except Exception:
+                self._discard(None)
+                raise
+        if time.monotonic() - session.last_checked > self.keepalive_interval:
+            with self.condition:
+                self.noops += 1
+            if not self._is_alive(session):
+                self._quietly_close(session.smtp)
+                with self.condition:
+                    self.reconnects += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+        return session
+
+    def _release(self, session: PooledSession, used: bool = True):
+        session.last_checked = time.monotonic()
+        if used:
+            session.last_used = session.last_checked
+        with self.condition:
+            if self.closed:
+                self.open_sessions -= 1
+                close = True
+            else:
+                self.idle.append(session)
+                close = False
+            self.condition.notify()
+        if close:
+            self._quietly_close(session.smtp)
+        else:
+            self._start_keepalive()
+
+    def _discard(self, session):
+        if session is not None:
+            self._quietly_close(session.smtp)
+        with self.condition:
+            self.open_sessions -= 1
+            self.condition.notify()
+
+    def send(self, msg: EmailMessage):
+        """
+        Send one message on a pooled session
+
+        Raises:
+            Exception: SMTP or network errors from a fresh connection
+        """
+        session = self._acquire()
+        try:
+            session.smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError) as e:
+            if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code not in (421, 451):
+                # The server rejected the message itself; the session is still usable
+                self._release(session)
+                raise
+            # Stale session: retry once on a new connection
+            self._quietly_close(session.smtp)
+            with self.condition:
+                self.reconnects += 1
+            session = None
+            try:
+                session = self._connect()
+                session.smtp.send_message(msg)
+            except Exception:
+                self._discard(session)
+                raise
+        except Exception:
+            self._discard(session)
+            raise
+        with self.condition:
+            self.messages += 1
+        self._release(session)
+
+    def _start_keepalive(self):
+        with self.condition:
+            if self.keepalive_thread is not None or self.closed:
+                return
+            self.keepalive_thread = threading.Thread(target=self._keepalive, name='smtp-keepalive', daemon=True)
+            self.keepalive_thread.start()
+
+    def _keepalive(self):
+        """NOOP idle sessions that are due and close those idle past idle_timeout"""
+        interval = max(1.0, self.keepalive_interval / 2)
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed, timeout=interval)
+                if self.closed:
+                    return
+                now = time.monotonic()
+                due = [s for s in self.idle if now - s.last_checked >= self.keepalive_interval
+                       or now - s.last_used >= self.idle_timeout]
+                for session in due:
+                    self.idle.remove(session)
+            for session in due:
+                if now - session.last_used < self.idle_timeout and self._is_alive(session):
+                    with self.condition:
+                        self.noops += 1
+                    self._release(session, used=False)
+                else:
+                    self._discard(session)
+
+    def stats(self) -> Dict[str, int]:
+        with self.condition:
+            return {
+                'open': self.open_sessions,
+                'idle': len(self.idle),
+                'connects': self.connects,
+                'reconnects': self.reconnects,
+                'messages': self.messages,
+                'noops': self.noops,
+            }
+
+    def close(self):
+        """Close idle sessions; busy sessions are closed when they are returned"""
+        with self.condition:
+            self.closed = True
+            idle = list(self.idle)
+            self.idle.clear()
+            self.open_sessions -= len(idle)
+            self.condition.notify_all()
+        for session in idle:
+            self._quietly_close(session.smtp)
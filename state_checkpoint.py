@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Crash-safe device state checkpoints for the Network Ping Monitor
+Periodic binary snapshots of the DeviceStateTable, restored on startup so
+outage durations and alert suppression survive a restart
+
+File layout (little endian, sections padded to 8 bytes):
+    header  magic:8s (b'PMSTATE1'), written_wall:f64, written_mono:f64,
+            count:u32, keys_len:u32, crc32:u32, pad:4
+    keys    device keys as UTF-8, separated by '\\n'
+    columns online[count]:u8, email_sent[count]:u8, alert_suppressed[count]:u8,
+            failed[count]:i32, outages[count]:i32, last_change[count]:f64
+The CRC covers everything after the header. last_change values are in the
+writer's monotonic clock; written_wall and written_mono taken together map
+them to wall-clock time, so a restart (or a reboot) can rebase them onto the
+new process's clock.
+
+A checkpoint is written to a temporary file, fsynced and renamed over the
+previous one, so a crash at any point leaves either the old or the new
+snapshot, never a torn one.
+"""
+
+import array
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from device_state import DeviceStateTable
+
+MAGIC = b'PMSTATE1'
+
+_HEADER = struct.Struct('<8sddIII4x')
+
+# (field, typecode) in file order
+COLUMNS = (('online', 'B'), ('email_sent', 'B'), ('alert_suppressed', 'B'),
+           ('failed', 'i'), ('outages', 'i'), ('last_change', 'd'))
+
+
+def _pad(length: int) -> bytes:
+    return b'\0' * ((-length) % 8)
+
+
+def encode_checkpoint(table: DeviceStateTable, wall_clock: Callable[[], float] = time.time) -> bytes:
+    """
+    Serialize the table
+
+    Each column is copied with one tobytes() call, which runs without
+    releasing the GIL, so a column is never caught half-written. Columns are
+    copied one after another; a check running at the same moment may show
+    up in some columns and not yet in others, which the next checkpoint
+    corrects.
+    """
+    keys = '\n'.join(str(key) for key in table.keys).encode('utf-8')
+    written_wall, written_mono = wall_clock(), table.clock()
+    body = [keys, _pad(len(keys))]
+    for field, _ in COLUMNS:
+        column = getattr(table, field)
+        if sys.byteorder != 'little':
+            column = array.array(column.typecode, column)
+            column.byteswap()
+        data = column.tobytes()
+        body.append(data)
+        body.append(_pad(len(data)))
+    payload = b''.join(body)
+    header = _HEADER.pack(MAGIC, written_wall, written_mono, len(table.keys), len(keys), zlib.crc32(payload))
+    return header + payload
+
+
+def decode_checkpoint(data: bytes) -> Tuple[float, float, List[str], Dict[str, array.array]]:
+    """
+    Parse a checkpoint
+
+    Returns:
+        (written_wall, written_mono, keys, columns by field name)
+
+    Raises:
+        ValueError: The data is not a complete, intact checkpoint
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("checkpoint is truncated")
+    magic, written_wall, written_mono, count, keys_len, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a state checkpoint")
+    payload = memoryview(data)[_HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise ValueError("checkpoint checksum mismatch")
+
+    keys = bytes(payload[:keys_len]).decode('utf-8').split('\n') if count else []
+    if len(keys) != count:
+        raise ValueError("checkpoint key count mismatch")
+    offset = keys_len + (-keys_len) % 8
+    columns = {}
+    for field, typecode in COLUMNS:
+        column = array.array(typecode)
+        size = column.itemsize * count
+        if offset + size > len(payload):
+            raise ValueError("checkpoint is truncated")
+        column.frombytes(payload[offset:offset + size])
+        if sys.byteorder != 'little':
+            column.byteswap()
+        columns[field] = column
+        offset += size + (-size) % 8
+    return written_wall, written_mono, keys, columns
+
+
+def write_checkpoint(path: str, table: DeviceStateTable, wall_clock: Callable[[], float] = time.time):
+    """Atomically replace the checkpoint at path with the table's current state"""
+    data = encode_checkpoint(table, wall_clock)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def restore_checkpoint(path: str, table: DeviceStateTable, max_age: Optional[float] = None,
+                       wall_clock: Callable[[], float] = time.time) -> Tuple[List[str], float]:
+    """
+    Load a checkpoint into the table
+
+    Devices that are in the checkpoint but no longer monitored are ignored;
+    devices that are new keep their initial state. Status-change times are
+    rebased onto the table's clock, so an outage that began before the
+    restart keeps its original start.
+
+    Args:
+        path: Checkpoint file
+        table: Table to restore into
+        max_age: Ignore checkpoints written more than this many seconds ago (None = any age)
+        wall_clock: Wall-clock time source
+
+    Returns:
+        (devices restored, checkpoint age in seconds); nothing is restored
+        when the file is missing or too old
+
+    Raises:
+        ValueError: The file exists but is damaged
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0.0
+    written_wall, written_mono, keys, columns = decode_checkpoint(data)
+    now_wall = wall_clock()
+    age = now_wall - written_wall
+    if max_age is not None and age > max_age:
+        return [], age
+
+    # Writer's monotonic value -> this process's monotonic value
+    offset = (table.clock() - now_wall) - (written_mono - written_wall)
+    if keys == [str(key) for key in table.keys]:
+        # Same devices as last run: copy whole columns
+        for field, _ in COLUMNS:
+            getattr(table, field)[:] = columns[field]
+        table.last_change[:] = array.array('d', [value + offset for value in table.last_change])
+        return list(table.keys), age
+
+    restored = []
+    for position, key in enumerate(keys):
+        i = table.index.get(key)
+        if i is None:
+            continue
+        for field, _ in COLUMNS:
+            getattr(table, field)[i] = columns[field][position]
+        table.last_change[i] += offset
+        restored.append(key)
+    return restored, age
+
+
+class StateCheckpointer:
+    """Writes a checkpoint of a DeviceStateTable every interval from a background thread"""
+
+    def __init__(self, table: DeviceStateTable, path: str, interval: float = 10.0):
+        """
+        Args:
+            table: State to checkpoint
+            path: Checkpoint file
+            interval: Seconds between checkpoints
+        """
+        self.table = table
+        self.path = path
+        self.interval = interval
+        self.written = 0
+        self.last_seconds = 0.0
+        self.errors = 0
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='state-checkpoint', daemon=True)
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopping.wait(self.interval):
+            self.write()
+
+    def write(self):
+        start = time.perf_counter()
+        try:
+            write_checkpoint(self.path, self.table)
+        except OSError as e:
+            self.errors += 1
+            print(f"❌ Failed to write state checkpoint {self.path}: {e}")
+            return
+        self.last_seconds = time.perf_counter() - start
+        self.written += 1
+
+    def close(self):
+        """Stop the periodic checkpoints and write a final one"""
+        if self.stopping.is_set():
+            return
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.write()
@@ -0,0 +1,168 @@
+"""Tests for alert_dispatcher"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from email.message import EmailMessage
+
+from alert_dispatcher import AlertCoalescer, AlertDispatcher, AlertRecord
+
+
+def make_message(subject: str) -> EmailMessage:
+    message = EmailMessage()
+    message['Subject'] = subject
+    message['To'] = 'ops@example.com'
+    message.set_content(subject)
+    return message
+
+
+def make_record(n: int) -> AlertRecord:
+    return AlertRecord(time.time(), f"10.3.0.{n}", f"Device {n}", 'OUTAGE_ALERT', 3, 0)
+
+
+class FlakySender:
+    """Raises on the first `failures` sends, then delivers"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = 0
+        self.delivered = []
+
+    def __call__(self, message: EmailMessage):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise OSError("SMTP server unavailable")
+        self.delivered.append(message['Subject'])
+
+
+class ResultLog:
+    """on_result callback that records outcomes and signals when one arrives"""
+
+    def __init__(self):
+        self.results = []
+        self.arrived = threading.Event()
+
+    def __call__(self, alert, delivered, detail):
+        self.results.append((alert.label, alert.records, delivered))
+        self.arrived.set()
+
+
+class AlertDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.outbox = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.outbox, True)
+
+    def outbox_files(self):
+        return [name for name in os.listdir(self.outbox) if name.endswith('.eml')]
+
+    def test_retry_until_delivered(self):
+        sender, results = FlakySender(2), ResultLog()
+        dispatcher = AlertDispatcher(sender, self.outbox, max_retries=5, backoff=0.01, on_result=results)
+        records = (make_record(1),)
+        dispatcher.submit(make_message("down"), records=records)
+        self.assertTrue(results.arrived.wait(5))
+        dispatcher.close()
+        self.assertEqual(sender.delivered, ["down"])
+        self.assertEqual(results.results, [("down", records, True)])
+        self.assertEqual(dispatcher.stats()['failed_attempts'], 2)
+        self.assertEqual(self.outbox_files(), [])  # removed once delivered
+
+    def test_gives_up_into_outbox_and_resends_on_next_start(self):
+        results = ResultLog()
+        dispatcher = AlertDispatcher(FlakySender(100), self.outbox, max_retries=1, backoff=0.01, on_result=results)
+        dispatcher.submit(make_message("down"))
+        self.assertTrue(results.arrived.wait(5))
+        dispatcher.close()
+        self.assertEqual(results.results, [("down", (), False)])
+        self.assertEqual(dispatcher.stats()['gave_up'], 1)
+        self.assertEqual(len(self.outbox_files()), 1)
+
+        sender, results = FlakySender(0), ResultLog()
+        dispatcher = AlertDispatcher(sender, self.outbox, on_result=results)
+        self.assertEqual(dispatcher.load_outbox(), 1)
+        self.assertTrue(results.arrived.wait(5))
+        dispatcher.close()
+        self.assertEqual(sender.delivered, ["down"])
+        self.assertEqual(self.outbox_files(), [])
+
+    def test_close_saves_alerts_waiting_for_retry(self):
+        results = ResultLog()
+        dispatcher = AlertDispatcher(FlakySender(1), self.outbox, backoff=60, on_result=results)
+        dispatcher.submit(make_message("down"))
+        deadline = time.monotonic() + 5
+        while dispatcher.stats()['retrying'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        dispatcher.close(timeout=1)
+        self.assertEqual(results.results, [("down", (), False)])
+        self.assertEqual(len(self.outbox_files()), 1)
+        self.assertFalse(dispatcher.submit(make_message("late")))
+
+
+class RecordingDispatcher:
+    """Stands in for AlertDispatcher and records (time, records, subject) per message"""
+
+    def __init__(self):
+        self.messages = []
+        self.condition = threading.Condition()
+
+    def submit(self, message, label='', records=()):
+        with self.condition:
+            self.messages.append((time.monotonic(), records, message['Subject']))
+            self.condition.notify_all()
+        return True
+
+    def wait_for(self, count: int, timeout: float = 5) -> bool:
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.messages) >= count, timeout)
+
+
+def render(records, recipients):
+    return make_message(f"{len(records)} alert(s) for {', '.join(recipients)}")
+
+
+class AlertCoalescerTest(unittest.TestCase):
+    def test_first_alert_at_once_then_digest(self):
+        dispatcher = RecordingDispatcher()
+        coalescer = AlertCoalescer(render, dispatcher, window=0.5)
+        self.addCleanup(coalescer.close)
+        start = time.monotonic()
+        coalescer.submit(make_record(1), ['ops@example.com'])
+        self.assertTrue(dispatcher.wait_for(1))
+        self.assertLess(dispatcher.messages[0][0] - start, 0.3)
+        for n in (2, 3, 4):
+            coalescer.submit(make_record(n), ['ops@example.com'])
+        self.assertTrue(dispatcher.wait_for(2))
+        sent_at, records, _ = dispatcher.messages[1]
+        self.assertGreaterEqual(sent_at - dispatcher.messages[0][0], 0.45)
+        self.assertEqual([record.ip_address for record in records], ["10.3.0.2", "10.3.0.3", "10.3.0.4"])
+        self.assertEqual(coalescer.stats()['digests'], 1)
+
+    def test_recipients_with_same_alerts_share_a_message(self):
+        dispatcher = RecordingDispatcher()
+        coalescer = AlertCoalescer(render, dispatcher, window=0.2)
+        coalescer.submit(make_record(1), ['a@example.com', 'b@example.com'])
+        self.assertTrue(dispatcher.wait_for(1))
+        coalescer.close()
+        self.assertEqual(len(dispatcher.messages), 1)
+        self.assertEqual(dispatcher.messages[0][2], "1 alert(s) for a@example.com, b@example.com")
+
+    def test_rate_limited_alerts_wait_and_close_flushes_them(self):
+        dispatcher = RecordingDispatcher()
+        coalescer = AlertCoalescer(render, dispatcher, window=0.05, rate_limit=1, rate_period=3600)
+        coalescer.submit(make_record(1), ['ops@example.com'])
+        self.assertTrue(dispatcher.wait_for(1))
+        coalescer.submit(make_record(2), ['ops@example.com'])
+        coalescer.submit(make_record(3), ['ops@example.com'])
+        self.assertFalse(dispatcher.wait_for(2, timeout=0.3))
+        coalescer.close()
+        self.assertEqual(len(dispatcher.messages), 2)
+        self.assertEqual(len(dispatcher.messages[1][1]), 2)
+        self.assertGreater(coalescer.stats()['rate_limited'], 0)
+        self.assertFalse(coalescer.submit(make_record(4), ['ops@example.com']))
+
+
+if __name__ == '__main__':
+    unittest.main()
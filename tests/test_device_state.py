@@ -0,0 +1,144 @@
+"""Tests for device_state.DeviceStateTable"""
+
+import array
+import random
+import threading
+import time
+import unittest
+from unittest import mock
+
+import device_state
+from device_state import DeviceStateTable
+
+
+def random_table(rng: random.Random, count: int) -> DeviceStateTable:
+    """Table of count devices in a random mix of states, on a fixed clock"""
+    table = DeviceStateTable([f"10.0.{i // 256}.{i % 256}" for i in range(count)], clock=lambda: 1000.0)
+    for i in range(count):
+        table.online[i] = rng.random() < 0.6
+        table.failed[i] = 0 if table.online[i] else rng.randint(1, 5)
+        table.email_sent[i] = not table.online[i] and rng.random() < 0.3
+        table.alert_suppressed[i] = not table.online[i] and rng.random() < 0.2
+        table.last_change[i] = 1000.0 - rng.uniform(0, 7200)
+    return table
+
+
+def evaluate_in_python(table, indices, reachable, now, alert_threshold, periodic_interval):
+    with mock.patch.object(device_state, 'numpy', None):
+        return table.evaluate_batch(indices, reachable, now, alert_threshold, periodic_interval)
+
+
+class EvaluateBatchTest(unittest.TestCase):
+    def test_single_device_transitions(self):
+        table = DeviceStateTable(['a'], clock=lambda: 0.0)
+        self.assertEqual(evaluate_in_python(table, [0], [True], 10.0, 3, None), [])
+        self.assertEqual(evaluate_in_python(table, [0], [True], 10.0, 3, 5.0), [(0, device_state.STATUS_CHECK)])
+        self.assertEqual(evaluate_in_python(table, [0], [False], 10.0, 3, None), [(0, device_state.OUTAGE_START)])
+
+        table.online[0] = 0
+        table.failed[0] = 2
+        self.assertEqual(evaluate_in_python(table, [0], [False], 10.0, 3, None),
+                         [(0, device_state.PING_FAILED | device_state.OUTAGE_ALERT)])
+        table.email_sent[0] = 1
+        self.assertEqual(evaluate_in_python(table, [0], [False], 10.0, 3, None), [(0, device_state.PING_FAILED)])
+        self.assertEqual(evaluate_in_python(table, [0], [True], 10.0, 3, None), [(0, device_state.OUTAGE_END)])
+
+    def test_paths_agree(self):
+        if device_state.numpy is None:
+            self.skipTest("NumPy is not installed")
+        rng = random.Random(21)
+        table = random_table(rng, 2000)
+        for periodic_interval in (None, 3600):
+            indices = array.array('i', rng.sample(range(len(table)), 1500))
+            reachable = array.array('B', [rng.random() < 0.7 for _ in indices])
+            expected = evaluate_in_python(table, indices, reachable, 1000.0, 3, periodic_interval)
+            self.assertTrue(expected)
+            self.assertEqual(table.evaluate_batch(indices, reachable, 1000.0, 3, periodic_interval), expected)
+
+    def test_evaluation_does_not_change_state(self):
+        table = random_table(random.Random(22), 100)
+        before = [bytes(getattr(table, field)) for field in ('online', 'failed', 'email_sent', 'last_change')]
+        table.evaluate_batch(array.array('i', range(100)), array.array('B', [0] * 100), 1000.0)
+        after = [bytes(getattr(table, field)) for field in ('online', 'failed', 'email_sent', 'last_change')]
+        self.assertEqual(before, after)
+
+
+class ClaimTest(unittest.TestCase):
+    def test_claim_is_exclusive_until_release(self):
+        table = DeviceStateTable(['a', 'b'])
+        self.assertTrue(table.claim('a'))
+        self.assertFalse(table.claim('a'))
+        self.assertEqual(table.claim_many(['a', 'b']), ['b'])
+        self.assertEqual(table.contended, 2)
+        table.release('a')
+        table.release_many(['b'])
+        self.assertEqual(table.claim_many(['b', 'a']), ['b', 'a'])
+
+    def test_refused_claims_are_all_counted(self):
+        keys = list(range(64))
+        table = DeviceStateTable(keys, shards=8)
+        self.assertEqual(table.claim_many(keys), keys)
+
+        def refuse(batched):
+            for _ in range(200):
+                if batched:
+                    table.claim_many(keys[:8])
+                else:
+                    for key in keys:
+                        table.claim(key)
+
+        threads = [threading.Thread(target=refuse, args=(n % 2,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(table.contended, 4 * 200 * 64 + 4 * 200 * 8)
+
+    def test_concurrent_claims_never_overlap(self):
+        keys = list(range(200))
+        table = DeviceStateTable(keys, shards=8)
+        owners = [0] * len(keys)  # checks currently holding each device
+        overlaps = []
+        claims = [0] * len(keys)
+        start = threading.Barrier(8)
+
+        def hold(claimed):
+            for key in claimed:
+                owners[key] += 1
+                if owners[key] != 1:
+                    overlaps.append(key)
+                claims[key] += 1
+            time.sleep(0.0001)  # let the other threads try the same devices meanwhile
+            for key in claimed:
+                owners[key] -= 1
+
+        def claim_one_by_one(seed):
+            rng = random.Random(seed)
+            start.wait()
+            for _ in range(500):
+                key = rng.choice(keys)
+                if table.claim(key):
+                    hold([key])
+                    table.release(key)
+
+        def claim_in_batches(seed):
+            rng = random.Random(seed)
+            start.wait()
+            for _ in range(200):
+                claimed = table.claim_many(rng.sample(keys, 50))
+                hold(claimed)
+                table.release_many(claimed)
+
+        threads = [threading.Thread(target=claim_one_by_one if n % 2 else claim_in_batches, args=(n,))
+                   for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(overlaps, [])
+        self.assertTrue(sum(claims))
+        self.assertFalse(any(table.in_flight))
+
+
+if __name__ == '__main__':
+    unittest.main()
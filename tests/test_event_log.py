@@ -0,0 +1,92 @@
+"""Tests for event_log.CsvEventWriter rotation and retention"""
+
+import csv
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from event_log import CSV_HEADER, CsvEventWriter
+
+ROW = ['2026-03-01 08:00:00', '10.4.0.1', 'Device', 'PING_FAILED', 'OFFLINE', '0.00', 0, False,
+       'Consecutive failed ping']
+
+
+def read_csv(path: str) -> list:
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+
+class CsvRotationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.filename = os.path.join(self.directory, 'ping_log_20260301_080000.csv')
+
+    def write_rows(self, count: int, **options) -> CsvEventWriter:
+        writer = CsvEventWriter(self.filename, flush_rows=10, background_flush=False, rotate_bytes=2000, **options)
+        for n in range(count):
+            writer.write_row(ROW[:6] + [n] + ROW[7:])
+        writer.close()  # also waits for the compressor threads
+        return writer
+
+    def test_rotation_keeps_every_row_in_order(self):
+        writer = self.write_rows(500, compression='gzip')
+        segments = writer.rotated_segments()
+        self.assertEqual(len(segments), writer.rotations)
+        self.assertGreater(writer.rotations, 3)
+        self.assertTrue(all(path.endswith('.csv.gz') for path in segments))
+        rows = []
+        for path in segments + [self.filename]:
+            content = read_csv(path)
+            self.assertEqual(content[0], CSV_HEADER)
+            rows.extend(content[1:])
+        self.assertEqual([int(row[6]) for row in rows], list(range(500)))
+
+    def test_retention_keeps_the_newest_segments(self):
+        writer = self.write_rows(500, compression=None, retain=2)
+        segments = writer.rotated_segments()
+        self.assertEqual(len(segments), 2)
+        last_rows = read_csv(segments[-1])[1:] + read_csv(self.filename)[1:]
+        self.assertEqual(int(last_rows[-1][6]), 499)
+
+    def test_segments_ordered_by_name_not_mtime(self):
+        old = os.path.join(self.directory, 'ping_log_20260301_080000.20260301_090000.csv.gz')
+        new = os.path.join(self.directory, 'ping_log_20260301_080000.20260301_100000_2.csv')
+        for n, path in enumerate((new, old)):
+            with open(path, 'w') as f:
+                f.write('x')
+            os.utime(path, (time.time() - 1000 * (n + 1),) * 2)  # the newer segment looks older on disk
+        writer = CsvEventWriter(self.filename, background_flush=False)
+        writer.close()
+        self.assertEqual(writer.rotated_segments(), [old, new])
+
+    def test_retention_covers_earlier_runs(self):
+        earlier_run = os.path.join(self.directory, 'ping_log_20260201_080000.csv')
+        earlier_segments = [os.path.join(self.directory, f'ping_log_20260201_080000.20260202_0{n}0000.csv.gz')
+                            for n in range(3)]
+        for path in [earlier_run] + earlier_segments:
+            with open(path, 'wb') as f:
+                f.write(gzip.compress(b'x') if path.endswith('.gz') else b'x')
+        writer = self.write_rows(500, compression='gzip', retain=3,
+                                 retain_glob=os.path.join(self.directory, 'ping_log_*.csv*'))
+        self.assertEqual(len(writer.rotated_segments()), 3)
+        self.assertFalse(any(os.path.exists(path) for path in earlier_segments))
+        self.assertTrue(os.path.exists(earlier_run))  # a live log, not a rotated segment
+
+    def test_vanished_segments_are_skipped(self):
+        writer = CsvEventWriter(self.filename, background_flush=False)
+        writer.close()
+        segment = os.path.join(self.directory, 'ping_log_20260301_080000.20260301_090000.csv')
+        with open(segment, 'w') as f:
+            f.write('x')
+        self.assertEqual(writer.rotated_segments(), [segment])
+        os.remove(segment)
+        self.assertEqual(writer.rotated_segments(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
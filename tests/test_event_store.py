@@ -0,0 +1,133 @@
+"""Tests for the binary event store (.pmev)"""
+
+import csv
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from event_log import CSV_HEADER, format_csv_row
+from event_store import BinaryEventStore, EventStoreReader, split_note_args, fill_note_args
+
+
+def sample_events(count: int, seed: int = 9) -> list:
+    """Events with the note shapes the monitor writes: fixed, counted, timed, numeric summaries, free text"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2026, 3, 1, 8, 0, 0)
+    devices = [(f"192.168.1.{i}", f"Device {i}") for i in range(1, 21)]
+    events = []
+    for n in range(count):
+        ip_address, device_name = rng.choice(devices)
+        timestamp = start + datetime.timedelta(seconds=n * 7)
+        kind = n % 7
+        if kind == 0:
+            events.append((timestamp, ip_address, device_name, 'OUTAGE_START', 'OFFLINE', 0.0, 1, False,
+                           "Device became unreachable"))
+        elif kind == 1:
+            failed = rng.randint(2, 500)
+            events.append((timestamp, ip_address, device_name, 'PING_FAILED', 'OFFLINE', 0.0, failed, False,
+                           f"Consecutive failed ping #{failed}"))
+        elif kind == 2:
+            duration = round(rng.uniform(0, 900), 2)
+            events.append((timestamp, ip_address, device_name, 'OUTAGE_END', 'ONLINE', duration, 0, True,
+                           f"Device recovered after {duration:.2f} minutes"))
+        elif kind == 3:
+            events.append((timestamp, ip_address, device_name, 'STATUS_CHECK', 'ONLINE', 0.0, 0, False,
+                           f"Periodic status check; rtt ms ewma {rng.uniform(0, 50):.2f} "
+                           f"p95 {rng.uniform(0, 90):.2f}; loss {rng.uniform(0, 5):.1f}% of {rng.randint(1, 3600)} probes"))
+        elif kind == 4:
+            events.append((timestamp, ip_address, device_name, 'EMAIL_FAILED', 'OFFLINE', 0.0, 3, None,
+                           f"Unique note {rng.random()} with ünïcode"))
+        elif kind == 5:
+            events.append((timestamp, ip_address, device_name, 'MONITOR_START', 'ONLINE', 0.0, 0, False, ""))
+        else:
+            events.append((timestamp, ip_address, device_name, 'CUSTOM_EVENT', 'ONLINE', 0.0, 0, False,
+                           "Email alert queued after 3 failed pings"))
+    return events
+
+
+class EventStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.filename = os.path.join(self.directory, 'events.pmev')
+
+    def read_rows(self) -> list:
+        reader = EventStoreReader(self.filename)
+        try:
+            return [format_csv_row(event) for event in reader.events()]
+        finally:
+            reader.close()
+
+    def test_round_trip(self):
+        events = sample_events(3000)
+        store = BinaryEventStore(self.filename, block_rows=256)
+        for event in events:
+            store.write_event(event)
+        store.close()
+        self.assertEqual(self.read_rows(), [format_csv_row(event) for event in events])
+
+    def test_reopen_appends(self):
+        events = sample_events(1000)
+        for part in (events[:400], events[400:]):
+            store = BinaryEventStore(self.filename, block_rows=128)
+            for event in part:
+                store.write_event(event)
+            store.close()
+        reader = EventStoreReader(self.filename)
+        try:
+            self.assertEqual(reader.count(), len(events))
+        finally:
+            reader.close()
+        self.assertEqual(self.read_rows(), [format_csv_row(event) for event in events])
+
+    def test_torn_tail_is_dropped(self):
+        events = sample_events(600)
+        store = BinaryEventStore(self.filename, block_rows=200)
+        for event in events:
+            store.write_event(event)
+        store.close()
+        with open(self.filename, 'r+b') as f:
+            f.truncate(os.path.getsize(self.filename) - 5)
+        store = BinaryEventStore(self.filename, block_rows=200)
+        store.write_event(events[-1])
+        store.close()
+        rows = self.read_rows()
+        self.assertEqual(rows[:400], [format_csv_row(event) for event in events[:400]])
+        self.assertEqual(rows[-1], format_csv_row(events[-1]))
+
+    def test_plain_blocks_still_read(self):
+        events = sample_events(1000)
+        # An older file continued by a newer writer mixes both kinds of block
+        for part, compress in ((events[:500], False), (events[500:], True)):
+            store = BinaryEventStore(self.filename, block_rows=300, compress_blocks=compress)
+            for event in part:
+                store.write_event(event)
+            store.close()
+        self.assertEqual(self.read_rows(), [format_csv_row(event) for event in events])
+
+    def test_at_least_ten_times_smaller_than_csv(self):
+        events = sample_events(20000)
+        csv_path = os.path.join(self.directory, 'events.csv')
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(format_csv_row(event) for event in events)
+        store = BinaryEventStore(self.filename)
+        for event in events:
+            store.write_event(event)
+        store.close()
+        self.assertGreaterEqual(os.path.getsize(csv_path) / os.path.getsize(self.filename), 10)
+
+    def test_note_args_round_trip(self):
+        for text in ("rtt ms ewma 1.92 p95 3.10; loss 0.0% of 3600 probes", "-4 and 1e5 and v2", "7"):
+            template, args = split_note_args(text)
+            self.assertTrue(args)
+            self.assertEqual(fill_note_args(template, '\x00'.join(args)), text)
+        self.assertEqual(split_note_args("no numbers"), ("no numbers", []))
+
+
+if __name__ == '__main__':
+    unittest.main()
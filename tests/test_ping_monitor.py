@@ -0,0 +1,136 @@
+"""Tests for the PingMonitor state machine"""
+
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import device_state
+import ping_monitor
+
+# Settings pinned for the tests, whatever config.py says
+TEST_SETTINGS = {
+    'EMAIL_ALERT_THRESHOLD': 3,
+    'SEND_RECOVERY_EMAILS': True,
+    'LOG_PERIODIC_STATUS': True,
+    'PERIODIC_LOG_INTERVAL': 0,
+    'DEVICE_PARENTS': {},
+    'ADAPTIVE_INTERVALS': False,
+    'BURST_COUNT': 1,
+    'STATE_CHECKPOINT': None,
+    'ALERT_OUTBOX_DIRECTORY': None,
+    'METRICS_PORT': None,
+    'EVENT_DATABASE': None,
+    'BINARY_EVENT_LOG': False,
+}
+
+
+class StatusTransitionTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, True)
+        settings = mock.patch.multiple(ping_monitor, LOG_DIRECTORY=self.log_dir, **TEST_SETTINGS)
+        settings.start()
+        self.addCleanup(settings.stop)
+        self.devices = {f"10.1.0.{i}": f"device {i}" for i in range(1, 41)}
+
+    def make_monitor(self, parents=None):
+        """Monitor whose log rows and emails are recorded instead of written or sent"""
+        parents = mock.patch.object(ping_monitor, 'DEVICE_PARENTS', parents or {})
+        with contextlib.redirect_stdout(io.StringIO()), parents:
+            monitor = ping_monitor.PingMonitor(dict(self.devices), 1, 1)
+        self.addCleanup(monitor.close_event_log)
+        self.addCleanup(monitor.close_alerts)
+        monitor.recorded = []
+
+        def log_event(ip_address, event_type, status, duration_minutes=0, failed_count=0, email_sent=False,
+                      notes=""):
+            monitor.recorded.append((ip_address, event_type, status, failed_count, email_sent))
+            return True
+
+        def send_email_alert(ip_address, event_type, failed_count=0, duration_minutes=0):
+            monitor.recorded.append((ip_address, 'EMAIL', event_type, failed_count))
+            return True
+
+        monitor.log_event = log_event
+        monitor.send_email_alert = send_email_alert
+        return monitor
+
+    def run_rounds(self, rounds):
+        """Feed the same rounds to one monitor device by device and to another as batches"""
+        single, batched = self.make_monitor(), self.make_monitor()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for results in rounds:
+                for ip_address, is_online in results:
+                    single.check_device_status(ip_address, is_online, 0.001 if is_online else None)
+                claimed = batched.device_state.claim_many([ip_address for ip_address, _ in results])
+                self.assertEqual(len(claimed), len(results))
+                try:
+                    batched.process_cycle_results([(ip_address, is_online, 0.001 if is_online else None, None)
+                                                   for ip_address, is_online in results])
+                finally:
+                    batched.device_state.release_many(claimed)
+        self.assertEqual(batched.recorded, single.recorded)
+        for field in ('online', 'failed', 'email_sent', 'alert_suppressed', 'outages'):
+            self.assertEqual(getattr(batched.device_state, field), getattr(single.device_state, field), field)
+        return batched.recorded
+
+    def random_rounds(self, seed):
+        rng = random.Random(seed)
+        flaky = {ip_address: rng.choice((0.0, 0.3, 0.7, 1.0)) for ip_address in self.devices}
+        return [[(ip_address, rng.random() >= flaky[ip_address]) for ip_address in self.devices]
+                for _ in range(12)]
+
+    def test_batch_matches_single_checks(self):
+        if device_state.numpy is None:
+            self.skipTest("NumPy is not installed")
+        recorded = self.run_rounds(self.random_rounds(1))
+        event_types = {row[1] for row in recorded}
+        self.assertTrue({'OUTAGE_START', 'PING_FAILED', 'OUTAGE_END', 'STATUS_CHECK', 'EMAIL'} <= event_types)
+
+    def test_batch_matches_single_checks_without_numpy(self):
+        with mock.patch.object(device_state, 'numpy', None):
+            self.run_rounds(self.random_rounds(2))
+
+    def test_alert_sent_once_per_outage(self):
+        ip_address = "10.1.0.1"
+        rounds = [[(ip_address, False)]] * 5 + [[(ip_address, True)]]
+        recorded = self.run_rounds(rounds)
+        self.assertEqual([row for row in recorded if row[1] == 'EMAIL'],
+                         [(ip_address, 'EMAIL', 'OUTAGE_ALERT', 3), (ip_address, 'EMAIL', 'RECOVERY_ALERT', 0)])
+
+    def test_late_pooled_result_is_applied_under_its_claim(self):
+        monitor = self.make_monitor({"10.1.0.2": "10.1.0.1"})
+        monitor.ping_interval = 0.1
+        slow_device = "10.1.0.2"
+        finished = threading.Event()
+        claimed_while_applied = []
+
+        def probe_once(ip_address):
+            if ip_address == slow_device:
+                finished.wait(5)
+            return False, None, None
+
+        def apply_probe_result(ip_address, *result):
+            claimed_while_applied.append((ip_address, monitor.device_state.claim(ip_address)))
+            apply(ip_address, *result)
+
+        apply = monitor.apply_probe_result
+        monitor.probe_once = probe_once
+        monitor.apply_probe_result = apply_probe_result
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor.check_devices_pooled(["10.1.0.1", slow_device])
+            self.assertNotIn(slow_device, {row[0] for row in monitor.recorded})
+            finished.set()
+            monitor.worker_pool.shutdown(wait=True, timeout=5)
+        self.assertEqual(claimed_while_applied, [(slow_device, False)])
+        self.assertIn((slow_device, 'OUTAGE_START', 'OFFLINE', 1, False), monitor.recorded)
+        self.assertFalse(monitor.device_state.in_flight[monitor.device_state.index[slow_device]])
+
+
+if __name__ == '__main__':
+    unittest.main()
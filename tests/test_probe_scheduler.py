@@ -0,0 +1,73 @@
+"""Tests for probe_scheduler.ProbeScheduler"""
+
+import unittest
+
+from probe_scheduler import ProbeScheduler
+
+
+class ProbeSchedulerTest(unittest.TestCase):
+    def run_schedule(self, scheduler: ProbeScheduler, until: float, step: float = 0.05) -> dict:
+        """Advance a simulated clock, rescheduling every device as it comes due; returns probe times per device"""
+        probes = {}
+        now = 0.0
+        while now <= until:
+            for key in scheduler.pop_due(now):
+                probes.setdefault(key, []).append(now)
+                scheduler.reschedule(key, now)
+            now = round(now + step, 6)
+        return probes
+
+    def test_pops_in_due_order(self):
+        scheduler = ProbeScheduler(10, clock=lambda: 0.0)
+        for key, first_due in (('c', 3.0), ('a', 1.0), ('b', 2.0), ('d', 9.0)):
+            scheduler.add(key, first_due=first_due)
+        self.assertEqual(scheduler.pop_due(5.0), ['a', 'b', 'c'])
+        self.assertEqual(scheduler.next_due(), 9.0)
+        self.assertEqual(scheduler.pop_due(5.0), [])
+
+    def test_limit_leaves_the_rest_due(self):
+        scheduler = ProbeScheduler(10, clock=lambda: 0.0)
+        for i in range(5):
+            scheduler.add(i, first_due=float(i))
+        self.assertEqual(scheduler.pop_due(10.0, limit=2), [0, 1])
+        self.assertEqual(scheduler.pop_due(10.0), [2, 3, 4])
+
+    def test_jitter_stays_within_bounds_without_drift(self):
+        scheduler = ProbeScheduler(1.0, jitter=0.2, clock=lambda: 0.0, seed=5)
+        scheduler.add('a', first_due=1.0)
+        probes = self.run_schedule(scheduler, 200.0, step=0.01)['a']
+        # Each probe is within +/-20% of its slot on the original 1 s grid, however long it runs
+        self.assertGreaterEqual(len(probes), 198)
+        for n, probe_time in enumerate(probes, start=1):
+            self.assertLessEqual(abs(probe_time - n), 0.2 + 0.011, (n, probe_time))
+        gaps = {round(b - a, 2) for a, b in zip(probes, probes[1:])}
+        self.assertGreater(len(gaps), 5)  # the jitter is actually applied
+
+    def test_intervals_per_device(self):
+        scheduler = ProbeScheduler(5.0, intervals={'fast': 1.0}, clock=lambda: 0.0)
+        scheduler.add('fast', first_due=0.0)
+        scheduler.add('slow', first_due=0.0)
+        probes = self.run_schedule(scheduler, 20.0)
+        self.assertEqual(len(probes['fast']), 21)
+        self.assertEqual(len(probes['slow']), 5)
+
+    def test_remove_and_set_interval(self):
+        scheduler = ProbeScheduler(10.0, clock=lambda: 0.0)
+        scheduler.add('a', first_due=10.0)
+        scheduler.add('b', first_due=10.0)
+        scheduler.remove('a')
+        scheduler.set_interval('b', 2.0, now=0.0)
+        self.assertNotIn('a', scheduler)
+        self.assertEqual(scheduler.next_due(), 2.0)
+        self.assertEqual(scheduler.pop_due(10.0), ['b'])
+
+    def test_late_device_does_not_catch_up(self):
+        scheduler = ProbeScheduler(1.0, clock=lambda: 0.0)
+        scheduler.add('a', first_due=1.0)
+        self.assertEqual(scheduler.pop_due(5.5), ['a'])
+        scheduler.reschedule('a', 5.5)
+        self.assertEqual(scheduler.next_due(), 6.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""Tests for profiling"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from metrics import Timings
+from profiling import ProfileReporter, SamplingProfiler
+
+
+class ProfileReporterTest(unittest.TestCase):
+    def test_close_stops_the_sampler_before_reporting(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        done = threading.Event()
+
+        def busy(depth):
+            while not done.is_set():
+                (lambda n: sum(range(n)))(depth)
+
+        workers = [threading.Thread(target=busy, args=(n + 10,), daemon=True) for n in range(4)]
+        for worker in workers:
+            worker.start()
+        self.addCleanup(done.set)
+
+        sampler = SamplingProfiler(60, interval=0)
+        reporter = ProfileReporter(Timings(), os.path.join(directory, 'profile.txt'), 60, sampler=sampler)
+        reporter.start()
+        time.sleep(0.1)
+        reporter.close()
+        self.assertFalse(sampler.thread.is_alive())
+        self.assertLess(sampler.elapsed, 60)
+        with open(reporter.path, encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn(f"sampling profile: {sampler.samples} thread samples", report)
+        self.assertIn("inclusive %", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Tests for state_checkpoint"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from device_state import DeviceStateTable
+from state_checkpoint import decode_checkpoint, encode_checkpoint, restore_checkpoint, write_checkpoint
+
+
+class Clock:
+    """Settable time source"""
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def __call__(self) -> float:
+        return self.value
+
+
+def outage_table(keys, clock) -> DeviceStateTable:
+    """Table where every other device is in an outage that began 120 seconds ago"""
+    table = DeviceStateTable(keys, clock=clock)
+    for i in range(0, len(keys), 2):
+        table.online[i] = 0
+        table.failed[i] = 5 + i
+        table.email_sent[i] = 1
+        table.outages[i] = 1
+        table.last_change[i] = clock() - 120
+    table.alert_suppressed[len(keys) - 1] = 1
+    return table
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, 'device_state.ckpt')
+        self.keys = [f"10.2.0.{i}" for i in range(1, 12)]
+
+    def test_encode_decode(self):
+        table = outage_table(self.keys, Clock(500.0))
+        written_wall, written_mono, keys, columns = decode_checkpoint(encode_checkpoint(table, Clock(1.7e9)))
+        self.assertEqual((written_wall, written_mono, keys), (1.7e9, 500.0, self.keys))
+        for field in ('online', 'email_sent', 'alert_suppressed', 'failed', 'outages', 'last_change'):
+            self.assertEqual(columns[field], getattr(table, field), field)
+
+    def test_damage_is_detected(self):
+        data = bytearray(encode_checkpoint(outage_table(self.keys, Clock(500.0))))
+        for damaged in (data[:20], data[:-8], data[:-1] + bytes([data[-1] ^ 1]), b'XXXXXXXX' + data[8:]):
+            with self.assertRaises(ValueError):
+                decode_checkpoint(bytes(damaged))
+
+    def test_restore_rebases_onto_new_clock(self):
+        # Written at monotonic 500 / wall 1_000_000; restored 30 s later (wall) by a process
+        # whose monotonic clock restarted at 10, as after a reboot
+        write_checkpoint(self.path, outage_table(self.keys, Clock(500.0)), Clock(1_000_000.0))
+        restored_table = DeviceStateTable(self.keys, clock=Clock(10.0))
+        restored, age = restore_checkpoint(self.path, restored_table, wall_clock=Clock(1_000_030.0))
+        self.assertEqual(restored, self.keys)
+        self.assertEqual(age, 30.0)
+        # The outages began 120 s before the checkpoint, so 150 s before now
+        self.assertAlmostEqual(restored_table.seconds_since_change(self.keys[0]), 150.0)
+        self.assertFalse(restored_table.online[0])
+        self.assertEqual(restored_table.failed[2], 7)
+        self.assertTrue(restored_table.alert_suppressed[len(self.keys) - 1])
+
+    def test_restore_into_changed_device_list(self):
+        write_checkpoint(self.path, outage_table(self.keys, Clock(500.0)), Clock(1_000_000.0))
+        keys = ['10.9.9.9'] + self.keys[::-2]
+        table = DeviceStateTable(keys, clock=Clock(600.0))
+        restored, _ = restore_checkpoint(self.path, table, wall_clock=Clock(1_000_100.0))
+        self.assertEqual(restored, sorted(self.keys[::-2], key=self.keys.index))
+        self.assertTrue(table.online[0])  # new device keeps its initial state
+        self.assertFalse(table.is_online(self.keys[0]))
+        self.assertAlmostEqual(table.seconds_since_change(self.keys[0]), 220.0)
+
+    def test_old_or_missing_checkpoint_is_ignored(self):
+        table = DeviceStateTable(self.keys, clock=Clock(10.0))
+        self.assertEqual(restore_checkpoint(self.path, table), ([], 0.0))
+        write_checkpoint(self.path, outage_table(self.keys, Clock(500.0)), Clock(1_000_000.0))
+        restored, age = restore_checkpoint(self.path, table, max_age=3600, wall_clock=Clock(1_004_000.0))
+        self.assertEqual((restored, age), ([], 4000.0))
+        self.assertEqual(table.online_count(), len(self.keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Simulate adaptive probe intervals against fixed-rate probing.
+
+Runs --hours of one-second monitoring cycles on a simulated clock over
+--devices devices. Most are stable; --flapping of them drop every other
+minute-long stretch, and --jittery answer with a widely varying RTT. Pings
+are simulated; the real probe selection and state machine run unchanged.
+Reports probes sent per hour, the saving against probing every device every
+cycle, and how long outages of flapping devices took to detect.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ping_monitor
+from ping_monitor import PingMonitor
+
+
+def simulate(devices, flapping, jittery, cycles, budget, max_interval, adaptive, seed):
+    ping_monitor.ADAPTIVE_INTERVALS = adaptive
+    ping_monitor.ADAPTIVE_MAX_INTERVAL = max_interval
+    ping_monitor.PROBE_BUDGET = budget
+    ping_monitor.EMAIL_ALERTS_ENABLED = False
+    ping_monitor.LOG_PERIODIC_STATUS = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = PingMonitor(devices, 1, 1)
+    monitor.log_event = lambda *args: None
+    rng = random.Random(seed)
+    ips = list(devices)
+    flapping_ips = set(ips[:flapping])
+    jittery_ips = set(ips[flapping:flapping + jittery])
+
+    probes = 0
+    detection_delays = []
+    outage_started = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cycle in range(cycles):
+            # Flapping devices are down for the second half of every other minute
+            down = (cycle // 30) % 4 == 1
+            for ip_address in flapping_ips:
+                if down and ip_address not in outage_started:
+                    outage_started[ip_address] = cycle
+            targets = monitor.select_probe_targets(monitor.due_devices(now=float(cycle)))
+            probes += len(targets)
+            for ip_address in targets:
+                if ip_address in flapping_ips and down:
+                    was_online = monitor.device_state.is_online(ip_address)
+                    monitor.check_device_status(ip_address, False)
+                    if was_online:
+                        detection_delays.append(cycle - outage_started[ip_address])
+                    continue
+                if ip_address in flapping_ips:
+                    outage_started.pop(ip_address, None)
+                rtt = rng.uniform(0.001, 0.4) if ip_address in jittery_ips else rng.gauss(0.002, 0.0002)
+                monitor.check_device_status(ip_address, True, max(rtt, 0.0001))
+
+    stats = monitor.adaptive_intervals.stats() if monitor.adaptive_intervals else None
+    monitor.close_event_log()
+    monitor.close_alerts()
+    os.remove(monitor.csv_filename)
+    mean_delay = sum(detection_delays) / len(detection_delays) if detection_delays else 0.0
+    return probes, mean_delay, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=1000)
+    parser.add_argument('--flapping', type=int, default=20)
+    parser.add_argument('--jittery', type=int, default=20)
+    parser.add_argument('--hours', type=float, default=1.0)
+    parser.add_argument('--max-interval', type=float, default=60)
+    parser.add_argument('--budget', type=float, default=None, help='probes per second across all devices')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    devices = {f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}": f"Device {i}" for i in range(args.devices)}
+    cycles = int(args.hours * 3600)
+    print(f"{args.devices} devices ({args.flapping} flapping, {args.jittery} jittery), {cycles} one-second cycles")
+    print(f"{'mode':<10} {'probes/hour':>12} {'saved/hour':>11} {'detect s':>9} {'final rate/hour':>16}")
+    fixed = None
+    for label, adaptive in (('fixed', False), ('adaptive', True)):
+        probes, delay, stats = simulate(devices, args.flapping, args.jittery, cycles, args.budget,
+                                        args.max_interval, adaptive, args.seed)
+        per_hour = probes / args.hours
+        fixed = per_hour if fixed is None else fixed
+        final = f"{stats['probes_per_hour']:.0f}" if stats else '-'
+        print(f"{label:<10} {per_hour:>12.0f} {fixed - per_hour:>11.0f} {delay:>9.2f} {final:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare scheduling overhead and memory of the threaded and asyncio monitoring cores.
+
+Pings are replaced by a fixed simulated latency so the numbers isolate the
+cost of fanning a cycle out to every device: per-cycle wall time above the
+simulated latency, peak Python allocations (tracemalloc) and peak thread count.
+
+The threaded core runs on the persistent worker pool (WORKER_POOL_SIZE
+threads, --workers to override), so with a bounded pool its cycle time also
+includes queueing behind busy workers.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ping_monitor
+from ping_monitor import AsyncPingMonitor, PingMonitor
+from worker_pool import ProbeWorkerPool
+
+
+def make_devices(count):
+    return {f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}": f"Device {i}" for i in range(count)}
+
+
+def measure(label, count, cycles, run_cycle, latency):
+    peak_threads = threading.active_count()
+    stop = threading.Event()
+
+    def watch_threads():
+        nonlocal peak_threads
+        while not stop.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.001)
+
+    watcher = threading.Thread(target=watch_threads, daemon=True)
+    watcher.start()
+    tracemalloc.start()
+    durations = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        run_cycle()
+        durations.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stop.set()
+    watcher.join()
+
+    overhead = min(durations) - latency
+    print(f"{label:<9} {count:>7} {overhead * 1000:>13.1f} {overhead / count * 1e6:>15.2f} "
+          f"{peak / 1024 / 1024:>12.1f} {peak_threads - 1:>9}")
+
+
+def bench(count, cycles, latency, workers):
+    devices = make_devices(count)
+
+    # Long interval so run_cycle waits for every check instead of returning at the deadline
+    threaded = PingMonitor(devices, 3600, 1)
+    if workers:
+        threaded.worker_pool = ProbeWorkerPool(workers)
+    threaded.probe_device = lambda ip: time.sleep(latency) or latency
+    measure('threaded', count, cycles, threaded.monitor_all_devices, latency)
+    threaded.worker_pool.shutdown(wait=True)
+    threaded.close_event_log()
+    os.remove(threaded.csv_filename)
+
+    async_monitor = AsyncPingMonitor(devices, 1, 1)
+
+    async def fake_probe(ip):
+        await asyncio.sleep(latency)
+        return latency
+
+    async_monitor.async_probe_device = fake_probe
+    loop = asyncio.new_event_loop()
+    measure('asyncio', count, cycles,
+            lambda: loop.run_until_complete(async_monitor.async_monitor_all_devices()), latency)
+    loop.close()
+    async_monitor.close_event_log()
+    os.remove(async_monitor.csv_filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help='simulated ping latency in seconds')
+    parser.add_argument('--workers', type=int, default=0, help='worker pool size (default WORKER_POOL_SIZE)')
+    args = parser.parse_args()
+
+    # Force the per-device path so the two cores are compared directly
+    ping_monitor.PING_MULTIPLEX = False
+    print(f"{'core':<9} {'devices':>7} {'overhead ms':>13} {'overhead us/dev':>15} "
+          f"{'peak MiB':>12} {'threads':>9}")
+    for size in args.sizes:
+        bench(size, args.cycles, args.latency, args.workers)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Measure the decision phase of a cycle: per-device state machine calls vs one batch.
+
+Simulates --cycles rounds of results for --devices devices, --offline of
+which fail each round (a different set every round, so outages start, fail,
+alert and end). Compares calling status_transition() for every device with
+DeviceStateTable.evaluate_batch() plus status_transition() for the devices
+that produce an event, with NumPy and with the plain-loop fallback. Also
+times the full process_cycle_results() path including latency statistics.
+Logging and console output are discarded.
+"""
+import argparse
+import array
+import contextlib
+import datetime
+import io
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import device_state
+import ping_monitor
+from device_state import OUTAGE_START, PING_FAILED
+
+
+def make_monitor(devices):
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = ping_monitor.PingMonitor(devices, 1, 1)
+    events = []
+    monitor.log_event = lambda *args: events.append(args[1])
+    monitor.send_email_alert = lambda *args: True
+    return monitor, events
+
+
+def close(monitor):
+    monitor.close_event_log()
+    monitor.close_alerts()
+    os.remove(monitor.csv_filename)
+
+
+def per_device(monitor, rounds):
+    current_time = datetime.datetime.now()
+    elapsed = 0.0
+    for results in rounds:
+        start = time.perf_counter()
+        for ip_address, is_online in results:
+            monitor.apply_status_effects(monitor.status_transition(ip_address, is_online, current_time))
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def batched(monitor, rounds):
+    current_time = datetime.datetime.now()
+    state = monitor.device_state
+    elapsed = 0.0
+    for results in rounds:
+        indices = array.array('i', (state.index[ip_address] for ip_address, _ in results))
+        reachable = array.array('B', (is_online for _, is_online in results))
+        start = time.perf_counter()
+        for i, bits in state.evaluate_batch(indices, reachable, None, ping_monitor.EMAIL_ALERT_THRESHOLD):
+            is_online = not bits & (OUTAGE_START | PING_FAILED)
+            monitor.apply_status_effects(monitor.status_transition(state.keys[i], is_online, current_time))
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def full_path(monitor, rounds):
+    start = time.perf_counter()
+    for results in rounds:
+        monitor.process_cycle_results([(ip_address, is_online, 0.001 if is_online else None, None)
+                                       for ip_address, is_online in results])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=50000)
+    parser.add_argument('--offline', type=float, default=0.01, help='fraction of devices failing each round')
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    ping_monitor.EMAIL_ALERTS_ENABLED = False
+    ping_monitor.LOG_PERIODIC_STATUS = False
+    devices = {f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}": f"Device {i}" for i in range(args.devices)}
+    ips = list(devices)
+    rng = random.Random(args.seed)
+    # Outages last a few rounds so every event type occurs
+    rounds = []
+    down = set()
+    for _ in range(args.cycles):
+        down = {ip for ip in down if rng.random() < 0.7}
+        down.update(rng.sample(ips, int(args.devices * args.offline * 0.3)))
+        rounds.append([(ip, ip not in down) for ip in ips])
+
+    numpy_module = device_state.numpy
+    modes = [('status_transition per device', per_device, numpy_module)]
+    if numpy_module is not None:
+        modes.append(('evaluate_batch (NumPy)', batched, numpy_module))
+    modes.append(('evaluate_batch (loop)', batched, None))
+    modes.append(('process_cycle_results', full_path, numpy_module))
+
+    print(f"{args.devices} devices, {args.cycles} rounds, ~{args.offline:.1%} failing per round")
+    print(f"{'decision phase':<30} {'ms/round':>10} {'us/device':>10} {'events':>8}")
+    reference = None
+    for name, function, numpy_for_mode in modes:
+        device_state.numpy = numpy_for_mode
+        monitor, events = make_monitor(devices)
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = function(monitor, rounds)
+        close(monitor)
+        if reference is None:
+            reference = events
+        elif function is not full_path and events != reference:
+            print(f"  ⚠️  {name} logged different events than the per-device path")
+        per_round = elapsed / args.cycles
+        print(f"{name:<30} {per_round * 1000:>10.2f} {per_round / args.devices * 1e6:>10.3f} {len(events):>8}")
+    device_state.numpy = numpy_module
+
+
+if __name__ == '__main__':
+    main()
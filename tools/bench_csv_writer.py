@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Microbenchmark: events per second for the CSV event log.
+
+"legacy" reproduces the original log_event path (exists/getsize check, read
+the first line, reopen the file in append mode for every row); "buffered" is
+CsvEventWriter under each fsync policy; "queued" measures what a ping worker
+pays per event when handing it to EventLogThread from several threads.
+"""
+import argparse
+import csv
+import os
+import sys
+import datetime
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from event_log import CSV_HEADER, CsvEventWriter, EventLogThread
+
+EVENT = (datetime.datetime(2025, 10, 6, 14, 31, 22), '192.168.1.8', 'Main Server', 'PING_FAILED', 'OFFLINE',
+         0.0, 7, False, 'Consecutive failed ping #7')
+ROW = ['2025-10-06 14:31:22', '192.168.1.8', 'Main Server', 'PING_FAILED', 'OFFLINE', '0.00', 7, False,
+       'Consecutive failed ping #7']
+
+
+def legacy_write(filename, row):
+    if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+        with open(filename, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(CSV_HEADER)
+    with open(filename, 'r', encoding='utf-8') as f:
+        f.readline()
+    with open(filename, 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(row)
+
+
+def report(label, count, elapsed):
+    print(f"{label:<16} {count:>8} {count / elapsed:>14.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'writer':<16} {'events':>8} {'events/sec':>14}")
+
+        path = os.path.join(tmp, 'legacy.csv')
+        start = time.perf_counter()
+        for _ in range(args.events):
+            legacy_write(path, ROW)
+        report('legacy', args.events, time.perf_counter() - start)
+
+        for policy in ('never', 'flush', 'row'):
+            # fsync per row is slow; keep that run short
+            count = args.events if policy != 'row' else min(args.events, 1000)
+            writer = CsvEventWriter(os.path.join(tmp, f'{policy}.csv'), fsync=policy)
+            start = time.perf_counter()
+            for _ in range(count):
+                writer.write_row(ROW)
+            writer.close()
+            report(f'buffered/{policy}', count, time.perf_counter() - start)
+
+        threads = 8
+        log = EventLogThread([CsvEventWriter(os.path.join(tmp, 'queued.csv'), background_flush=False)],
+                             max_queue=args.events)
+
+        def produce():
+            for _ in range(args.events // threads):
+                log.put(EVENT)
+
+        producers = [threading.Thread(target=produce) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join()
+        report(f'queued/{threads}thr', args.events // threads * threads, time.perf_counter() - start)
+        log.close()
+        print(f"queue stats: {log.stats()}")
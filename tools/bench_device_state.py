@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Compare DeviceStateTable with the per-field dicts it replaced, at 100k devices.
+
+Memory: tracemalloc size of the state of --devices devices, as the six dicts
+keyed by IP (datetime per device) and as the typed-array table including
+its index. Throughput: one cycle of the online/offline bookkeeping that
+status_transition does for every device, on each layout, followed by a full
+cycle of the real PingMonitor state machine on the table. Pings are
+simulated and logging is discarded.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ping_monitor
+from device_state import DeviceStateTable
+
+
+def dict_state(ips):
+    now = datetime.datetime.now()
+    return {
+        'device_status': {ip: True for ip in ips},
+        'last_status_change': {ip: datetime.datetime.fromtimestamp(now.timestamp() + i % 1000) for i, ip in enumerate(ips)},
+        'failed_ping_count': {ip: 0 for ip in ips},
+        'email_sent_for_outage': {ip: False for ip in ips},
+        'alert_suppressed': {ip: False for ip in ips},
+        'outage_counts': {ip: 0 for ip in ips},
+    }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    state = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return state, size
+
+
+def dict_cycle(state, results, threshold):
+    status, last_change, failed = state['device_status'], state['last_status_change'], state['failed_ping_count']
+    email_sent, suppressed, outages = state['email_sent_for_outage'], state['alert_suppressed'], state['outage_counts']
+    current_time = datetime.datetime.now()
+    for ip, is_online in results:
+        previous = status[ip]
+        if is_online:
+            if not previous:
+                (current_time - last_change[ip]).total_seconds()
+                email_sent[ip] = False
+                last_change[ip] = current_time
+            failed[ip] = 0
+            status[ip] = True
+            suppressed[ip] = False
+            if previous and (current_time - last_change[ip]).total_seconds() >= 3600:
+                last_change[ip] = current_time
+        else:
+            failed[ip] += 1
+            if previous:
+                outages[ip] += 1
+                status[ip] = False
+                last_change[ip] = current_time
+            if failed[ip] == threshold and not email_sent[ip]:
+                email_sent[ip] = True
+
+
+def table_cycle(table, results, threshold):
+    index, online, last_change, failed = table.index, table.online, table.last_change, table.failed
+    email_sent, suppressed, outages = table.email_sent, table.alert_suppressed, table.outages
+    now = table.clock()
+    for ip, is_online in results:
+        i = index[ip]
+        previous = online[i]
+        if is_online:
+            if not previous:
+                now - last_change[i]
+                email_sent[i] = 0
+                last_change[i] = now
+            failed[i] = 0
+            online[i] = 1
+            suppressed[i] = 0
+            if previous and now - last_change[i] >= 3600:
+                last_change[i] = now
+        else:
+            failed[i] += 1
+            if previous:
+                outages[i] += 1
+                online[i] = 0
+                last_change[i] = now
+            if failed[i] == threshold and not email_sent[i]:
+                email_sent[i] = 1
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=100000)
+    parser.add_argument('--offline', type=float, default=0.01, help='fraction of devices failing each cycle')
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    ips = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(args.devices)]
+    rng = random.Random(args.seed)
+    results = [(ip, rng.random() >= args.offline) for ip in ips]
+
+    state, dict_bytes = measure(lambda: dict_state(ips))
+    table, table_bytes = measure(lambda: DeviceStateTable(ips))
+    print(f"devices: {args.devices}")
+    print(f"{'layout':<22} {'memory':>12} {'bytes/device':>13}")
+    print(f"{'per-field dicts':<22} {dict_bytes / 1e6:>10.2f}MB {dict_bytes / args.devices:>13.1f}")
+    print(f"{'DeviceStateTable':<22} {table_bytes / 1e6:>10.2f}MB {table_bytes / args.devices:>13.1f}"
+          f"  (arrays {table.nbytes() / args.devices:.0f} B/device)")
+
+    dict_seconds = min(timed(dict_cycle, state, results, 3) for _ in range(args.cycles))
+    table_seconds = min(timed(table_cycle, table, results, 3) for _ in range(args.cycles))
+    print(f"\n{'bookkeeping cycle':<22} {'seconds':>12} {'us/device':>13}")
+    print(f"{'per-field dicts':<22} {dict_seconds:>12.4f} {dict_seconds / args.devices * 1e6:>13.3f}")
+    print(f"{'DeviceStateTable':<22} {table_seconds:>12.4f} {table_seconds / args.devices * 1e6:>13.3f}")
+
+    # The real state machine, logging and console output discarded
+    ping_monitor.EMAIL_ALERTS_ENABLED = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = ping_monitor.PingMonitor(dict.fromkeys(ips, "bench"), 1, 1)
+    monitor.log_event = lambda *args: None
+    current_time = datetime.datetime.now()
+    seconds = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            for ip, is_online in results:
+                monitor.apply_status_effects(monitor.status_transition(ip, is_online, current_time))
+            seconds.append(time.perf_counter() - start)
+    monitor.close_event_log()
+    monitor.close_alerts()
+    os.remove(monitor.csv_filename)
+    print(f"{'status_transition':<22} {min(seconds):>12.4f} {min(seconds) / args.devices * 1e6:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Measure how much smaller the binary event log (.pmev) is than the CSV log.
+
+Generates --events events in a monitor-like mix (consecutive failed pings,
+periodic status checks with latency summaries, outage starts and ends over
+--devices devices), writes them as CSV and as .pmev with plain and with
+zlib-compressed blocks, and prints the sizes, the reduction ratios and the
+write and read times. Every .pmev file is read back and compared row by row
+with the CSV layout.
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from event_log import CSV_HEADER, format_csv_row
+from event_store import BinaryEventStore, EventStoreReader
+
+
+def make_events(count, devices, seed):
+    rng = random.Random(seed)
+    start = datetime.datetime(2026, 1, 1)
+    events = []
+    for i in range(count):
+        ip_address = f"10.{i % devices // 65536}.{i % devices // 256 % 256}.{i % devices % 256}"
+        name = f"Device {i % devices}"
+        timestamp = start + datetime.timedelta(seconds=i)
+        kind = rng.random()
+        if kind < 0.6:
+            failed = rng.randint(1, 500)
+            events.append((timestamp, ip_address, name, 'PING_FAILED', 'OFFLINE', 0, failed, False,
+                           f"Consecutive failed ping #{failed}"))
+        elif kind < 0.9:
+            events.append((timestamp, ip_address, name, 'STATUS_CHECK', 'ONLINE', 0, 0, False,
+                           f"Periodic status check; rtt ms ewma {rng.uniform(0.5, 20):.2f} "
+                           f"min {rng.uniform(0.2, 1):.2f} max {rng.uniform(10, 90):.2f} "
+                           f"p50 {rng.uniform(1, 5):.2f} p95 {rng.uniform(5, 20):.2f} "
+                           f"p99 {rng.uniform(10, 60):.2f}; loss {rng.uniform(0, 2):.1f}% of 3600 probes"))
+        elif kind < 0.95:
+            events.append((timestamp, ip_address, name, 'OUTAGE_START', 'OFFLINE', 0, 1, False,
+                           "Device became unreachable"))
+        else:
+            duration = rng.randint(1, 99999) / 100
+            events.append((timestamp, ip_address, name, 'OUTAGE_END', 'ONLINE', duration, 0, True,
+                           f"Device recovered after {duration:.2f} minutes"))
+    return events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--block-rows', type=int, default=4096)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    events = make_events(args.events, args.devices, args.seed)
+    rows = [format_csv_row(event) for event in events]
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'events.csv')
+        start = time.perf_counter()
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(rows)
+        csv_seconds = time.perf_counter() - start
+        csv_size = os.path.getsize(csv_path)
+        print(f"events: {args.events} over {args.devices} devices")
+        print(f"csv:              {csv_size / 1e6:8.2f} MB  write {csv_seconds:.2f}s")
+
+        for label, compress in (('pmev (plain)', False), ('pmev (zlib)', True)):
+            path = os.path.join(directory, f'events_{compress}.pmev')
+            start = time.perf_counter()
+            store = BinaryEventStore(path, block_rows=args.block_rows, compress_blocks=compress)
+            for event in events:
+                store.write_event(event)
+            store.close()
+            write_seconds = time.perf_counter() - start
+            size = os.path.getsize(path)
+
+            start = time.perf_counter()
+            reader = EventStoreReader(path)
+            try:
+                back = [format_csv_row(event) for event in reader.events()]
+            finally:
+                reader.close()
+            read_seconds = time.perf_counter() - start
+            print(f"{label + ':':<17} {size / 1e6:8.2f} MB  {csv_size / size:5.1f}x smaller  "
+                  f"write {write_seconds:.2f}s  read {read_seconds:.2f}s  "
+                  f"round trip {'ok' if back == rows else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
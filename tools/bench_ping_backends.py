@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark ping backends against a loopback target.
+
+Reports pings per second and CPU time per ping (this process plus any child
+ping processes) for the in-process ICMP engine and the system ping command.
+With --fanout N it also times multiplexed rounds across N loopback addresses
+(127.x.y.z) served from a single socket, and with --burst K it times
+K-packet burst rounds across the same targets (plus one unreachable address,
+so every round waits out the full reply timeout).
+"""
+import argparse
+import os
+import resource
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from icmp_ping import IcmpPingBackend, SubprocessPingBackend
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(backend, target, count):
+    ok = 0
+    cpu_start = cpu_seconds()
+    wall_start = time.perf_counter()
+    for _ in range(count):
+        if backend.ping(target) is not None:
+            ok += 1
+    wall = time.perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+    print(f"{backend.name:<11} {count:>7} {ok:>7} {count / wall:>12.1f} {cpu / count * 1e6:>14.1f}")
+
+
+def loopback_targets(targets):
+    return [f"127.{i // (254 * 256)}.{(i // 254) % 256}.{i % 254 + 1}" for i in range(targets)]
+
+
+def run_fanout(backend, targets, rounds):
+    ips = loopback_targets(targets)
+    print(f"\nmultiplexed rounds: {targets} targets x {rounds}")
+    for n in range(rounds):
+        cpu_start = cpu_seconds()
+        wall_start = time.perf_counter()
+        results = backend.ping_many(ips)
+        wall = time.perf_counter() - wall_start
+        cpu = cpu_seconds() - cpu_start
+        ok = sum(1 for rtt in results.values() if rtt is not None)
+        print(f"round {n + 1}: {ok}/{len(results)} replies in {wall * 1000:.1f} ms, "
+              f"{cpu / len(results) * 1e6:.1f} cpu us/target, threads={threading.active_count()}")
+
+
+def run_burst(backend, targets, rounds, count, spacing, reply_timeout, unreachable):
+    ips = loopback_targets(targets) + [unreachable]
+    print(f"\nburst rounds: {len(ips)} targets x {count} packets, {spacing * 1000:.0f} ms apart, "
+          f"{reply_timeout * 1000:.0f} ms reply wait")
+    for n in range(rounds):
+        cpu_start = cpu_seconds()
+        wall_start = time.perf_counter()
+        results = backend.burst_many(ips, count, spacing, reply_timeout)
+        wall = time.perf_counter() - wall_start
+        cpu = cpu_seconds() - cpu_start
+        replies = sum(1 for samples in results.values() for rtt in samples if rtt is not None)
+        print(f"round {n + 1}: {replies}/{len(ips) * count} replies in {wall * 1000:.1f} ms, "
+              f"{cpu / (len(ips) * count) * 1e6:.1f} cpu us/packet")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--target', default='127.0.0.1')
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=2)
+    parser.add_argument('--fanout', type=int, default=0, help='targets per multiplexed round')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--burst', type=int, default=0, help='packets per target in burst rounds')
+    parser.add_argument('--spacing', type=float, default=0.1, help='seconds between burst packets')
+    parser.add_argument('--reply-timeout', type=float, default=0.5, help='reply wait after the last burst packet')
+    parser.add_argument('--unreachable', default='10.255.255.1', help='address that never answers')
+    args = parser.parse_args()
+
+    print(f"{'backend':<11} {'pings':>7} {'ok':>7} {'pings/sec':>12} {'cpu us/ping':>14}")
+    for factory in (lambda: IcmpPingBackend(args.timeout), lambda: SubprocessPingBackend(args.timeout)):
+        try:
+            run(factory(), args.target, args.count)
+        except (OSError, FileNotFoundError) as e:
+            print(f"skipped: {e}")
+
+    if args.fanout:
+        run_fanout(IcmpPingBackend(args.timeout), args.fanout, args.rounds)
+    if args.burst:
+        run_burst(IcmpPingBackend(args.timeout), args.fanout or 500, args.rounds, args.burst, args.spacing,
+                  args.reply_timeout, args.unreachable)
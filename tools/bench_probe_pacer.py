@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Measure how the probe pacer spreads a multiplexed ICMP round.
+
+Pings --targets loopback addresses (127.x.y.z, spread over /24 subnets of
+--per-subnet addresses each) from a single socket, unpaced and with each
+--rate limit, and reports the round time, the most packets sent within any
+10 ms window and the pacer's delay counters.
+"""
+import argparse
+import collections
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from icmp_ping import IcmpPingBackend
+from probe_pacer import ProbePacer
+
+
+class RecordingPacer(ProbePacer):
+    """Pacer that remembers when each packet was cleared to leave"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.send_times = []
+
+    def reserve(self, ip_address, packets=1):
+        delay = super().reserve(ip_address, packets)
+        self.send_times.append(time.monotonic() + delay)
+        return delay
+
+
+def peak_per_window(send_times, window=0.01):
+    counts = collections.Counter(int(t / window) for t in send_times)
+    return max(counts.values()) if counts else 0
+
+
+def run(label, ips, rate, subnet_rate, timeout):
+    pacer = RecordingPacer(rate, subnet_rate) if rate or subnet_rate else RecordingPacer(float('inf'))
+    backend = IcmpPingBackend(timeout, pacer=pacer)
+    start = time.perf_counter()
+    results = backend.ping_many(ips)
+    wall = time.perf_counter() - start
+    backend.close()
+    stats = pacer.stats()
+    ok = sum(1 for rtt in results.values() if rtt is not None)
+    print(f"{label:<24} {ok:>5}/{len(ips):<5} {wall * 1000:>9.1f} {peak_per_window(pacer.send_times):>10} "
+          f"{stats['delayed']:>8} {stats['mean_delay'] * 1000:>10.1f} {stats['max_delay'] * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--targets', type=int, default=1000)
+    parser.add_argument('--per-subnet', type=int, default=100)
+    parser.add_argument('--rate', type=float, action='append', help='global packets/s (repeatable)')
+    parser.add_argument('--subnet-rate', type=float, default=200, help='packets/s per /24 for the subnet run')
+    parser.add_argument('--timeout', type=float, default=1)
+    args = parser.parse_args()
+
+    ips = [f"127.0.{i // args.per_subnet}.{i % args.per_subnet + 1}" for i in range(args.targets)]
+    print(f"{args.targets} targets in {-(-args.targets // args.per_subnet)} subnets")
+    print(f"{'pacing':<24} {'replies':>11} {'round ms':>9} {'peak/10ms':>10} {'delayed':>8} "
+          f"{'mean ms':>10} {'max ms':>10}")
+    run('none', ips, None, None, args.timeout)
+    for rate in args.rate or [5000, 2000]:
+        run(f"{rate:g}/s global", ips, rate, None, args.timeout)
+    run(f"{args.subnet_rate:g}/s per /24", ips, None, args.subnet_rate, args.timeout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Measure ProbeScheduler dispatch cost (pop_due + reschedule) as the device count grows.
+
+Uses a simulated clock so the run is not bound by real time. Cost per
+dispatch should grow with log(n), not n.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from probe_scheduler import ProbeScheduler
+
+
+def bench(count, dispatches):
+    now = 0.0
+    scheduler = ProbeScheduler(1.0, jitter=0.1, clock=lambda: now, seed=1)
+    # Mix of fast (1 s) and slow (30 s) devices
+    for i in range(count):
+        scheduler.add(f"10.0.{i // 256}.{i % 256}", interval=1.0 if i % 10 == 0 else 30.0)
+
+    done = 0
+    start = time.perf_counter()
+    while done < dispatches:
+        now = scheduler.next_due()
+        for key in scheduler.pop_due(now):
+            scheduler.reschedule(key, now)
+            done += 1
+    elapsed = time.perf_counter() - start
+    print(f"{count:>8} {done:>10} {elapsed / done * 1e6:>14.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--dispatches', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"{'devices':>8} {'dispatches':>10} {'us/dispatch':>14}")
+    for size in args.sizes:
+        bench(size, args.dispatches)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measure state checkpoint size, write time and warm-restart restore time.
+
+Builds a DeviceStateTable of --devices devices with a share of them in an
+outage, writes --rounds checkpoints to a temporary directory and restores
+the last one into a fresh table, checking every field survived.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from device_state import DeviceStateTable
+from state_checkpoint import COLUMNS, restore_checkpoint, write_checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=100000)
+    parser.add_argument('--offline', type=float, default=0.05)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    ips = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(args.devices)]
+    table = DeviceStateTable(ips)
+    rng = random.Random(args.seed)
+    now = table.clock()
+    for i in range(args.devices):
+        if rng.random() < args.offline:
+            table.online[i] = 0
+            table.failed[i] = rng.randint(1, 50)
+            table.email_sent[i] = 1 if table.failed[i] >= 3 else 0
+            table.outages[i] = rng.randint(1, 5)
+            table.last_change[i] = now - rng.uniform(0, 3600)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'device_state.ckpt')
+        seconds = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            write_checkpoint(path, table)
+            seconds.append(time.perf_counter() - start)
+        size = os.path.getsize(path)
+
+        restart_start = time.perf_counter()
+        fresh = DeviceStateTable(ips)
+        restored, age = restore_checkpoint(path, fresh)
+        restart_seconds = time.perf_counter() - restart_start
+
+    mismatched = [field for field, _ in COLUMNS if field != 'last_change'
+                  and getattr(fresh, field) != getattr(table, field)]
+    drift = max(abs(a - b) for a, b in zip(fresh.last_change, table.last_change))
+    print(f"devices: {args.devices} ({args.offline:.0%} in an outage)")
+    print(f"checkpoint size: {size / 1e6:.2f} MB ({size / args.devices:.1f} B/device)")
+    print(f"write (fsync + rename): median {sorted(seconds)[len(seconds) // 2] * 1000:.1f} ms, "
+          f"max {max(seconds) * 1000:.1f} ms")
+    print(f"restart (new table + restore): {restart_seconds * 1000:.1f} ms for {len(restored)} devices")
+    print(f"fields restored exactly: {'yes' if not mismatched else 'no: ' + ', '.join(mismatched)}; "
+          f"status-change time drift {drift * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Simulate an upstream failure in a synthetic device tree, with and without DEVICE_PARENTS.
+
+Builds a tree of --nodes devices (one core switch, --fanout distribution
+switches below it, then access switches and endpoints), runs --cycles
+one-second monitoring cycles on a simulated clock and takes one distribution
+switch down from cycle --fail-at for --outage cycles. Pings are simulated
+(a device answers unless it or an ancestor is down); the real state machine,
+probe selection and alert decisions run unchanged. Reports probes sent,
+alert emails, log events and the mean time to evaluate one cycle.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ping_monitor
+from ping_monitor import PingMonitor
+
+
+def build_tree(nodes, fanout):
+    """Breadth-first tree: every device gets up to fanout children until nodes are placed"""
+    ips = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(nodes)]
+    parents = {}
+    next_child = 1
+    for ip in ips:
+        for _ in range(fanout):
+            if next_child >= nodes:
+                break
+            parents[ips[next_child]] = ip
+            next_child += 1
+    return {ip: f"Device {i}" for i, ip in enumerate(ips)}, parents
+
+
+def simulate(devices, parents, use_topology, cycles, fail_at, outage, failed_device):
+    ping_monitor.DEVICE_PARENTS = parents if use_topology else {}
+    ping_monitor.EMAIL_ALERTS_ENABLED = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = PingMonitor(devices, 1, 1)
+    counts = {'probes': 0, 'emails': 0, 'events': 0}
+
+    def send_email_alert(*args):
+        counts['emails'] += 1
+        return True
+
+    def log_event(*args):
+        counts['events'] += 1
+
+    monitor.send_email_alert = send_email_alert
+    monitor.log_event = log_event
+
+    # Devices that cannot answer while the failed switch is down
+    cut_off = {failed_device}
+    stack = [failed_device]
+    children = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            cut_off.add(child)
+            stack.append(child)
+
+    evaluation = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cycle in range(cycles):
+            down = fail_at <= cycle < fail_at + outage
+            start = time.perf_counter()
+            targets = monitor.select_probe_targets(devices.keys(), now=float(cycle))
+            counts['probes'] += len(targets)
+            for ip_address in targets:
+                monitor.check_device_status(ip_address, not (down and ip_address in cut_off))
+            evaluation += time.perf_counter() - start
+
+    monitor.close_event_log()
+    monitor.alert_coalescer.close()
+    monitor.alert_dispatcher.close()
+    os.remove(monitor.csv_filename)
+    return counts, evaluation / cycles, len(cut_off)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--cycles', type=int, default=600)
+    parser.add_argument('--fail-at', type=int, default=60)
+    parser.add_argument('--outage', type=int, default=300)
+    args = parser.parse_args()
+
+    devices, parents = build_tree(args.nodes, args.fanout)
+    # Fail the first distribution switch (a direct child of the core)
+    failed_device = list(devices.keys())[1]
+
+    print(f"{args.nodes} devices, fanout {args.fanout}, {args.cycles} cycles, "
+          f"{failed_device} down for {args.outage} cycles")
+    print(f"{'mode':<10} {'cut off':>8} {'probes':>10} {'emails':>8} {'log events':>11} {'ms/cycle':>9}")
+    for label, use_topology in (('flat', False), ('topology', True)):
+        counts, per_cycle, cut_off = simulate(devices, parents, use_topology, args.cycles,
+                                              args.fail_at, args.outage, failed_device)
+        print(f"{label:<10} {cut_off:>8} {counts['probes']:>10} {counts['emails']:>8} "
+              f"{counts['events']:>11} {per_cycle * 1000:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Convert event logs between the CSV layout and the binary .pmev format.
+
+The direction follows the input file extension: a .csv input is written as
+.pmev, anything else is read as .pmev and written as CSV. Prints both sizes
+and the reduction ratio; --verify converts the result back and checks every
+row survives the round trip unchanged.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from event_store import binary_to_csv, csv_to_binary
+
+
+def read_rows(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [row for row in csv.reader(f) if row and row[:2] != ['Timestamp', 'IP Address']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('source')
+    parser.add_argument('destination')
+    parser.add_argument('--verify', action='store_true', help='round-trip the output and compare rows')
+    args = parser.parse_args()
+
+    if os.path.exists(args.destination):
+        sys.exit(f"❌ {args.destination} already exists")
+
+    to_binary = args.source.lower().endswith('.csv')
+    if to_binary:
+        count = csv_to_binary(args.source, args.destination)
+        csv_path, binary_path = args.source, args.destination
+    else:
+        count = binary_to_csv(args.source, args.destination)
+        csv_path, binary_path = args.destination, args.source
+
+    csv_size = os.path.getsize(csv_path)
+    binary_size = os.path.getsize(binary_path)
+    print(f"Converted {count} events: {args.source} -> {args.destination}")
+    print(f"CSV {csv_size:,} bytes, binary {binary_size:,} bytes "
+          f"({csv_size / max(binary_size, 1):.1f}x smaller)")
+
+    if args.verify:
+        with tempfile.TemporaryDirectory() as tmp:
+            if to_binary:
+                restored = os.path.join(tmp, 'restored.csv')
+                binary_to_csv(binary_path, restored)
+            else:
+                restored = os.path.join(tmp, 'restored.pmev')
+                csv_to_binary(csv_path, restored)
+                binary_to_csv(restored, os.path.join(tmp, 'restored.csv'))
+                restored = os.path.join(tmp, 'restored.csv')
+            if read_rows(csv_path) != read_rows(restored):
+                sys.exit("❌ Round trip changed the event rows")
+        print("✅ Round trip verified")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Report outages per device from the SQLite event database (EVENT_DATABASE).
+
+Existing CSV logs can be loaded first with --import, e.g.:
+
+    python tools/query_outages.py logs/events.db --import logs/ping_log_*.csv
+    python tools/query_outages.py logs/events.db --ip 192.168.200.4 --since 2025-09-01 --until 2025-10-01
+"""
+import argparse
+import csv
+import datetime
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from event_db import SqliteEventStore, outage_summary
+from event_store import parse_csv_event
+
+
+def import_csv(database, paths):
+    store = SqliteEventStore(database, batch_rows=5000)
+    total = 0
+    try:
+        for path in sorted(paths):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    if not row or row[:2] == ['Timestamp', 'IP Address']:
+                        continue
+                    store.write_event(parse_csv_event(row))
+                    total += 1
+            print(f"Imported {path}")
+    finally:
+        store.close()
+    print(f"Imported {total} events into {database}")
+
+
+def parse_date(value):
+    return datetime.datetime.fromisoformat(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('database')
+    parser.add_argument('--import', dest='import_paths', nargs='+', metavar='CSV', help='load CSV logs first')
+    parser.add_argument('--ip', help='only this device')
+    parser.add_argument('--since', type=parse_date, help='outages starting at or after this date')
+    parser.add_argument('--until', type=parse_date, help='outages starting before this date')
+    args = parser.parse_args()
+
+    if args.import_paths:
+        import_csv(args.database, args.import_paths)
+
+    rows = outage_summary(args.database, args.ip, args.since, args.until)
+    print(f"{'IP Address':<16} {'Device':<30} {'Outages':>8} {'Downtime (min)':>15}")
+    for ip_address, device_name, count, minutes in rows:
+        print(f"{ip_address:<16} {device_name[:30]:<30} {count:>8} {minutes:>15.2f}")
+    if not rows:
+        print("No outages found")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,8 @@ devices = {'127.0.0.1': 'Localhost'}
 monitor = PingMonitor(devices, ping_interval=1, timeout=2)
 # Log a test event
 monitor.log_event('127.0.0.1', 'SMOKE_TEST', 'ONLINE', 0.0, 0, False, 'Smoke test event')
+# Rows are buffered; close the log so the event is on disk before reading it back
+monitor.close_event_log()
 
 print('CSV file:', monitor.csv_filename)
 print('\nFirst 20 lines of the CSV file:')
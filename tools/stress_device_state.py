@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Stress test: concurrent checks of the same devices never produce duplicate events.
+
+--threads threads call PingMonitor.check_device_status() on randomly chosen
+devices out of --devices for --seconds, far more concurrency per device than
+the monitor ever schedules. Pings are simulated: each takes up to --slow-ms
+and reflects a device that goes down and up every few hundred milliseconds.
+Every log row sleeps --log-delay-ms, like a blocking log queue, to widen the
+window in which two checks of one device could interleave.
+
+Each device's event sequence is then replayed and checked:
+- OUTAGE_START only for an online device, with failure count 1
+- PING_FAILED counts rising by exactly one
+- OUTAGE_END only after an outage
+- at most one OUTAGE_ALERT email per outage
+- the outage counter matching the OUTAGE_START rows
+
+The run is repeated with the per-device claim disabled to show what it
+prevents, and the claim/release cost is measured on its own. With
+--devices well above --threads, checks rarely collide and the two runs
+show the throughput cost of claiming.
+"""
+import argparse
+import collections
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import ping_monitor
+from device_state import DeviceStateTable
+
+
+def run(devices, threads, seconds, slow, log_delay, guarded, seed):
+    ping_monitor.EMAIL_ALERTS_ENABLED = False
+    ping_monitor.LOG_PERIODIC_STATUS = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = ping_monitor.PingMonitor(devices, 1, 1)
+    if not guarded:
+        monitor.device_state.claim = lambda key: True
+        monitor.device_state.release = lambda key: None
+
+    ips = list(devices)
+    started = time.monotonic()
+    record_lock = threading.Lock()
+    events = collections.defaultdict(list)  # ip -> [(event type, failed count, email sent)]
+    emails = collections.Counter()  # ip -> OUTAGE_ALERT emails queued
+    checks = [0]
+
+    def probe_device(ip_address):
+        # Each device flips between up and down on its own schedule
+        time.sleep(random.uniform(0, slow))
+        phase = (time.monotonic() - started) * (1 + ips.index(ip_address) % 5) / 0.3
+        return 0.001 if int(phase) % 3 else None
+
+    def log_event(ip_address, event_type, status, duration_minutes, failed_count, email_sent, notes):
+        with record_lock:
+            events[ip_address].append((event_type, failed_count, email_sent))
+        time.sleep(log_delay)
+
+    def send_email_alert(ip_address, alert_type, *args):
+        if alert_type == "OUTAGE_ALERT":
+            with record_lock:
+                emails[ip_address] += 1
+        return True
+
+    monitor.probe_device = probe_device
+    monitor.log_event = log_event
+    monitor.send_email_alert = send_email_alert
+
+    deadline = time.monotonic() + seconds
+
+    def hammer(worker):
+        rng = random.Random(seed + worker)
+        done = 0
+        while time.monotonic() < deadline:
+            monitor.check_device_status(rng.choice(ips))
+            done += 1
+            time.sleep(0.0005)  # Do not let threads whose device is busy spin on the GIL
+        with record_lock:
+            checks[0] += done
+
+    workers = [threading.Thread(target=hammer, args=(i,)) for i in range(threads)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    violations = []
+    for ip_address in ips:
+        online = True
+        failed = 0
+        outage_emails = 0
+        for event_type, failed_count, email_sent in events[ip_address]:
+            if event_type == "OUTAGE_START":
+                if not online or failed_count != 1:
+                    violations.append(f"{ip_address}: OUTAGE_START while offline or with count {failed_count}")
+                online, failed, outage_emails = False, failed_count, 0
+            elif event_type == "PING_FAILED":
+                if online or failed_count != failed + 1:
+                    violations.append(f"{ip_address}: PING_FAILED #{failed_count} after #{failed}")
+                failed = failed_count
+            elif event_type == "OUTAGE_ALERT":
+                outage_emails += 1 if email_sent else 0
+                if outage_emails > 1:
+                    violations.append(f"{ip_address}: second alert email in one outage")
+            elif event_type == "OUTAGE_END":
+                if online:
+                    violations.append(f"{ip_address}: OUTAGE_END while online")
+                online, failed = True, 0
+        starts = sum(1 for event in events[ip_address] if event[0] == "OUTAGE_START")
+        if monitor.device_state.outages[monitor.device_state.index[ip_address]] != starts:
+            violations.append(f"{ip_address}: outage counter differs from {starts} OUTAGE_START rows")
+
+    skipped = monitor.device_state.contended
+    monitor.close_event_log()
+    monitor.close_alerts()
+    os.remove(monitor.csv_filename)
+    return checks[0], skipped, sum(len(rows) for rows in events.values()), sum(emails.values()), violations
+
+
+def claim_cost(count, rounds):
+    table = DeviceStateTable(range(count))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key in range(count):
+            if table.claim(key):
+                table.release(key)
+    per_claim = (time.perf_counter() - start) / (count * rounds)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        table.release_many(table.claim_many(range(count)))
+    per_batch_claim = (time.perf_counter() - start) / (count * rounds)
+    return per_claim, per_batch_claim
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--slow-ms', type=float, default=20, help='longest simulated ping')
+    parser.add_argument('--log-delay-ms', type=float, default=1, help='time each log row takes')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    devices = {f"10.0.0.{i + 1}": f"Device {i}" for i in range(args.devices)}
+    print(f"{args.threads} threads on {args.devices} devices for {args.seconds:g}s, "
+          f"pings up to {args.slow_ms:g} ms, log rows {args.log_delay_ms:g} ms")
+    print(f"{'mode':<10} {'calls':>8} {'skipped':>8} {'checks/s':>9} {'events':>8} {'emails':>7} {'violations':>11}")
+    failed = False
+    for guarded in (True, False):
+        checks, skipped, events, emails, violations = run(devices, args.threads, args.seconds, args.slow_ms / 1000,
+                                                          args.log_delay_ms / 1000, guarded, args.seed)
+        mode = 'claimed' if guarded else 'unguarded'
+        rate = (checks - skipped) / args.seconds
+        print(f"{mode:<10} {checks:>8} {skipped:>8} {rate:>9.0f} {events:>8} {emails:>7} {len(violations):>11}")
+        for violation in violations[:3]:
+            print(f"           e.g. {violation}")
+        if guarded and violations:
+            failed = True
+
+    per_claim, per_batch_claim = claim_cost(100000, 5)
+    print(f"\nclaim + release: {per_claim * 1e9:.0f} ns per device, "
+          f"{per_batch_claim * 1e9:.0f} ns per device with claim_many/release_many")
+    if failed:
+        print("❌ Duplicate or out-of-order events with per-device claims")
+        sys.exit(1)
+    print("✅ No duplicate or out-of-order events with per-device claims")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Stress test: alert messages per second, one connection per message vs pooled sessions.
+
+Runs a minimal local SMTP stand-in server (EHLO/HELO, NOOP, RSET, MAIL, RCPT,
+DATA, QUIT; no TLS or AUTH). --handshake-delay is added before the greeting of
+every new connection to stand in for the TLS handshake and AUTH round trips a
+real relay costs. The server also drops the connection after every
+--drop-every'th message, so the pooled run exercises reconnecting stale sessions.
+"""
+import argparse
+import os
+import smtplib
+import socketserver
+import sys
+import threading
+import time
+from email.message import EmailMessage
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from smtp_pool import SmtpConnectionPool
+
+
+class StandInSmtpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        time.sleep(server.handshake_delay)
+        with server.lock:
+            server.connections += 1
+        self.reply('220 stand-in ESMTP')
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line in (b'.\r\n', b'.\n'):
+                    in_data = False
+                    with server.lock:
+                        server.messages += 1
+                        drop = server.drop_every and server.messages % server.drop_every == 0
+                    self.reply('250 OK queued')
+                    if drop:
+                        return
+                continue
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.reply('250-stand-in\r\n250 8BITMIME')
+            elif command in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                self.reply('250 OK')
+            elif command == b'DATA':
+                in_data = True
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def reply(self, text):
+        self.wfile.write(text.encode('ascii') + b'\r\n')
+
+
+class StandInSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay, drop_every):
+        super().__init__(('127.0.0.1', 0), StandInSmtpHandler)
+        self.handshake_delay = handshake_delay
+        self.drop_every = drop_every
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+
+def make_message(i):
+    msg = EmailMessage()
+    msg['From'] = 'monitor@example.com'
+    msg['To'] = 'ops@example.com'
+    msg['Subject'] = f"[NETWORK ALERT] Device Outage - Device {i} (10.0.{i // 256}.{i % 256})"
+    msg.set_content(f"The device has failed to respond to 3 consecutive ping attempts. ({i})\n")
+    return msg
+
+
+def run(label, count, senders, send):
+    errors = 0
+    lock = threading.Lock()
+    next_index = iter(range(count))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            try:
+                send(make_message(i))
+            except Exception:
+                with lock:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(senders)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {count:>8} {elapsed:>9.2f} {count / elapsed:>10.1f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--senders', type=int, default=4, help='concurrent sender threads (and pool size)')
+    parser.add_argument('--handshake-delay', type=float, default=0.05,
+                        help='seconds added to each new connection (TLS + AUTH stand-in)')
+    parser.add_argument('--drop-every', type=int, default=50,
+                        help='server drops the connection after every Nth message (0 = never)')
+    args = parser.parse_args()
+
+    server = StandInSmtpServer(args.handshake_delay, args.drop_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    def send_per_message(msg):
+        with smtplib.SMTP(host, port, timeout=10) as smtp:
+            smtp.send_message(msg)
+
+    print(f"{'mode':<22} {'messages':>8} {'seconds':>9} {'msgs/s':>10} {'errors':>7}")
+    run('connection per message', args.messages, args.senders, send_per_message)
+    connections_before = server.connections
+
+    pool = SmtpConnectionPool(host, port, use_tls=False, size=args.senders, timeout=10)
+    run('pooled sessions', args.messages, args.senders, pool.send)
+    stats = pool.stats()
+    pool.close()
+    print(f"\npooled run: {server.connections - connections_before} server connections, "
+          f"{stats['connects']} opened by the pool, {stats['reconnects']} reconnects, {stats['noops']} NOOPs")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
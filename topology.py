@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Device dependency topology for the Network Ping Monitor
+Knows which device sits behind which upstream hop, so an unreachable parent
+can be reported as the root cause instead of alerting on every child
+"""
+
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class DeviceTopology:
+    """
+    Parent/child tree (or forest) of monitored devices
+
+    Built from a {child: parent} mapping. Parents that are not monitored
+    devices are ignored with a warning; a cycle raises ValueError.
+    """
+
+    def __init__(self, parents: Dict[Hashable, Hashable], devices: Iterable[Hashable] = None):
+        """
+        Build the topology
+
+        Args:
+            parents: {child_ip: parent_ip}
+            devices: Monitored devices; parents outside this set are ignored
+        """
+        known = set(devices) if devices is not None else None
+        self.parents = {}
+        for child, parent in parents.items():
+            if known is not None and (child not in known or parent not in known):
+                print(f"⚠️  Ignoring topology link {child} -> {parent}: both devices must be monitored")
+                continue
+            if child == parent:
+                raise ValueError(f"Device {child} cannot be its own parent")
+            self.parents[child] = parent
+
+        self.children = {}
+        for child, parent in self.parents.items():
+            self.children.setdefault(parent, []).append(child)
+
+        self.depths = {}
+        for device in self.parents:
+            self._depth(device)
+
+    def _depth(self, device: Hashable) -> int:
+        """Hops to the root, detecting cycles"""
+        path = []
+        node = device
+        while node in self.parents and node not in self.depths:
+            if node in path:
+                cycle = ' -> '.join(str(n) for n in path[path.index(node):] + [node])
+                raise ValueError(f"Topology cycle: {cycle}")
+            path.append(node)
+            node = self.parents[node]
+        depth = self.depths.get(node, 0)
+        for node in reversed(path):
+            depth += 1
+            self.depths[node] = depth
+        return self.depths.get(device, 0)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def depth(self, device: Hashable) -> int:
+        return self.depths.get(device, 0)
+
+    def ancestors(self, device: Hashable) -> List[Hashable]:
+        """Upstream devices, nearest first"""
+        result = []
+        node = self.parents.get(device)
+        while node is not None:
+            result.append(node)
+            node = self.parents.get(node)
+        return result
+
+    def descendants(self, device: Hashable) -> List[Hashable]:
+        """Every device behind this one"""
+        result = []
+        stack = list(self.children.get(device, ()))
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(self.children.get(node, ()))
+        return result
+
+    def root_cause(self, device: Hashable, is_online: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        """
+        The furthest-upstream unreachable ancestor of a device
+
+        Args:
+            device: Device to look up
+            is_online: Current status of a device
+
+        Returns:
+            The unreachable ancestor closest to the root, or None if every
+            ancestor is reachable
+        """
+        cause = None
+        node = self.parents.get(device)
+        while node is not None:
+            if not is_online(node):
+                cause = node
+            node = self.parents.get(node)
+        return cause
+
+    def sort_upstream_first(self, devices: Iterable[Hashable]) -> List[Hashable]:
+        """Order devices so parents are evaluated before their children"""
+        return sorted(devices, key=self.depth)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Persistent worker pool for the Network Ping Monitor
+Runs per-device checks on a fixed set of long-lived threads instead of
+creating one thread per device every cycle
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+
+class ProbeWorkerPool:
+    """
+    Bounded pool of long-lived worker threads fed by a task queue
+
+    Each key (device IP) has at most one task queued or running at a time.
+    A device whose previous check has not finished is skipped for the cycle
+    rather than queued twice, so a slow target only ever occupies one worker
+    and never delays the checks of other devices.
+    """
+
+    def __init__(self, size: int = 32, name: str = 'probe-worker'):
+        """
+        Initialize the pool (threads are started on first use)
+
+        Args:
+            size: Number of worker threads
+            name: Thread name prefix
+        """
+        self.size = max(1, int(size))
+        self.name = name
+        self.tasks = queue.Queue()
+        self.outstanding = set()  # keys queued or running
+        self.cycle_of = {}  # key -> [tasks left] countdown of the run_cycle() waiting for it
+        self.condition = threading.Condition()
+        self.threads = []
+        self.busy_workers = 0
+        self.timings = None  # optional metrics.Timings receiving 'dispatch' (queue wait) durations
+
+        # Metrics
+        self.completed = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_cycle_seconds = 0.0
+        self.max_cycle_seconds = 0.0
+        self.last_cycle_unfinished = 0
+
+    def start(self):
+        if self.threads:
+            return
+        for i in range(self.size):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{i + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _worker(self):
+        while True:
+            item = self.tasks.get()
+            if item is None:
+                return
+            key, fn, queued_at = item
+            if self.timings is not None:
+                self.timings.observe('dispatch', time.perf_counter() - queued_at)
+            with self.condition:
+                self.busy_workers += 1
+            try:
+                fn(key)
+            except Exception as e:
+                print(f"❌ Error checking {key}: {e}")
+                with self.condition:
+                    self.errors += 1
+            finally:
+                with self.condition:
+                    self.busy_workers -= 1
+                    self.completed += 1
+                    self.outstanding.discard(key)
+                    countdown = self.cycle_of.pop(key, None)
+                    if countdown is not None:
+                        countdown[0] -= 1
+                        if countdown[0] == 0:
+                            self.condition.notify_all()
+
+    def submit(self, key: Hashable, fn: Callable, countdown: list = None) -> bool:
+        """
+        Queue fn(key) unless a task for key is already queued or running
+
+        Args:
+            key: Device key
+            fn: Check function called with the key
+            countdown: One-element list counting a cycle's unfinished tasks; incremented
+                       here and decremented when the task finishes
+
+        Returns:
+            bool: True if the task was queued, False if it was skipped
+        """
+        self.start()
+        with self.condition:
+            if key in self.outstanding:
+                self.skipped += 1
+                return False
+            self.outstanding.add(key)
+            if countdown is not None:
+                countdown[0] += 1
+                self.cycle_of[key] = countdown
+        self.tasks.put((key, fn, time.perf_counter()))
+        return True
+
+    def run_cycle(self, keys: Iterable[Hashable], fn: Callable, timeout: Optional[float]) -> int:
+        """
+        Submit fn(key) for every key and wait up to timeout for them to finish
+
+        Tasks still running when the timeout expires keep running in the
+        background; their devices are skipped in later cycles until done.
+
+        Args:
+            keys: Devices to check this cycle
+            fn: Check function called with the device key
+            timeout: Longest time to wait for this cycle's tasks (None = until all finish)
+
+        Returns:
+            int: Number of this cycle's tasks still unfinished
+        """
+        start = time.perf_counter()
+        # Finished tasks count down instead of the waiter rescanning every key on each wake-up
+        countdown = [0]
+        for key in keys:
+            self.submit(key, fn, countdown)
+        deadline = None if timeout is None else start + timeout
+
+        with self.condition:
+            while True:
+                unfinished = countdown[0]
+                if unfinished == 0:
+                    break
+                if deadline is None:
+                    self.condition.wait()
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            self.last_cycle_seconds = time.perf_counter() - start
+            self.max_cycle_seconds = max(self.max_cycle_seconds, self.last_cycle_seconds)
+            self.last_cycle_unfinished = unfinished
+        return unfinished
+
+    def metrics(self) -> Dict[str, float]:
+        """Snapshot of pool counters: queue depth, busy workers and cycle timings"""
+        with self.condition:
+            return {
+                'workers': len(self.threads),
+                'busy_workers': self.busy_workers,
+                'queue_depth': self.tasks.qsize(),
+                'outstanding': len(self.outstanding),
+                'completed': self.completed,
+                'skipped': self.skipped,
+                'errors': self.errors,
+                'last_cycle_seconds': self.last_cycle_seconds,
+                'max_cycle_seconds': self.max_cycle_seconds,
+                'last_cycle_unfinished': self.last_cycle_unfinished,
+            }
+
+    def cancel_pending(self) -> int:
+        """
+        Drop the tasks still waiting in the queue; tasks already running are unaffected
+
+        Returns:
+            int: Number of queued tasks discarded
+        """
+        cancelled = 0
+        sentinels = 0
+        while True:
+            try:
+                item = self.tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                sentinels += 1
+                continue
+            key = item[0]
+            cancelled += 1
+            with self.condition:
+                self.outstanding.discard(key)
+                countdown = self.cycle_of.pop(key, None)
+                if countdown is not None:
+                    countdown[0] -= 1
+                    if countdown[0] == 0:
+                        self.condition.notify_all()
+        for _ in range(sentinels):
+            self.tasks.put(None)
+        return cancelled
+
+    def shutdown(self, wait: bool = False, timeout: float = None):
+        """
+        Stop the worker threads once they finish their current task
+
+        Args:
+            wait: Join the threads before returning
+            timeout: Longest time to wait for all threads together (None = until all exit)
+        """
+        for _ in self.threads:
+            self.tasks.put(None)
+        if wait:
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            for thread in self.threads:
+                if deadline is None:
+                    thread.join()
+                else:
+                    thread.join(max(0.0, deadline - time.perf_counter()))
+        self.threads = []